@@ -0,0 +1,283 @@
+#api.py (Headless HTTP prediction API: asyncio front end, process pool for simulation and PDF rendering)
+# Usage: python api.py [--host 127.0.0.1] [--port 8080] [--workers N] [--max-pending 256] [--timeout 30]
+#
+# GET  /health              -> {"ok": true, "workers": 4, "pending": 0, ...}
+# POST /v1/forecast         {"client": {...}, "progression": "records"|"columns"|"none"}
+# POST /v1/forecast/batch   {"clients": [{...}, ...], "progression": "records"|"columns"|"none"}
+# POST /v1/report           {"client": {...}}  -> {"ok": true, "report_data": {...}}
+# POST /v1/report/pdf       {"client": {...}}  -> application/pdf
+# Errors come back as {"ok": false, "error": {"type": ..., "message": ...}} with a 4xx/5xx status.
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor
+
+from client_inputs import ClientInputError, normalize_client, client_label, model_args, model_options
+from instrumentation import span
+from worker import PROGRESSION_FORMATS, WorkerRequestError, progression_columns, handle_request
+
+MAX_HEADER_BYTES = 16 * 1024
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 411: 'Length Required', 413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable', 504: 'Gateway Timeout'}
+
+# Raised inside the front end to answer with an error status
+class HTTPError(Exception):
+    def __init__(self, status, message, error_type=None, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.error_type = error_type or STATUS_TEXT.get(status, 'Error').replace(' ', '')
+        self.headers = headers or {}
+
+# ASCII-safe file name plus the client's name, percent-encoded as UTF-8 (RFC 6266 / RFC 5987)
+def _content_disposition(file_name, display_name):
+    return f"attachment; filename=\"{file_name}\"; filename*=UTF-8''{urllib.parse.quote(display_name, safe='')}"
+
+def _error_body(error_type, message, field=None):
+    error = {'type': error_type, 'message': message}
+    if field is not None:
+        error['field'] = field
+    return {'ok': False, 'error': error}
+
+# Pool jobs; they run in worker processes and return plain data. Like worker.handle_request they
+# never raise: failures come back as {"ok": false, "error": {...}}
+def _forecast_job(request):
+    return handle_request(dict(request, op='forecast'))
+
+def _batch_job(clients, progression_format):
+    from batch_engine import predict_weight_loss_batch, batch_client_progression
+    from client_inputs import model_columns
+    results = [None] * len(clients)
+    valid = []
+    for index, row in enumerate(clients):
+        try:
+            if not isinstance(row, dict):
+                raise WorkerRequestError("each client must be an object")
+            valid.append((index, normalize_client(row)))
+        except ClientInputError as error:
+            results[index] = _error_body('ClientInputError', str(error), error.field)
+        except WorkerRequestError as error:
+            results[index] = _error_body('WorkerRequestError', str(error))
+    try:
+        if valid:
+            batch = predict_weight_loss_batch(**model_columns([client for _, client in valid]))
+            for position, (index, client) in enumerate(valid):
+                progression = batch_client_progression(batch, position)
+                entry = {'ok': True, 'final_weight': progression[-1]['weight'], 'final_body_fat_percentage': progression[-1]['body_fat_percentage']}
+                if progression_format == 'records':
+                    entry['progression'] = progression
+                elif progression_format == 'columns':
+                    entry['progression'] = progression_columns(progression)
+                results[index] = entry
+    except Exception as error:
+        return _error_body(type(error).__name__, str(error))
+    return {'ok': True, 'results': results}
+
+def _pdf_job(row):
+    from batch_reports import _file_name
+    from report import build_initial_data, generate_report_data, generate_pdf
+    from weight_loss_model import predict_weight_loss_columns
+    try:
+        client = normalize_client(row)
+        progression = predict_weight_loss_columns(*model_args(client), **model_options(client))
+        report_data = generate_report_data(progression, build_initial_data(progression, client), client['gender'])
+        label = client_label(client)
+        return {'ok': True, 'pdf': generate_pdf(progression, report_data, client['gender'], label), 'file_name': _file_name(label), 'display_name': f"{label}_weight_loss_plan.pdf"}
+    except ClientInputError as error:
+        return _error_body('ClientInputError', str(error), error.field)
+    except Exception as error:
+        return _error_body(type(error).__name__, str(error))
+
+def _init_pool_process(warm):
+    if warm:
+        from warmup import warm_up
+        warm_up(log=None)
+
+# Routes requests to pool jobs; pending work is bounded and every job has a deadline
+class ForecastAPI:
+    def __init__(self, executor, workers, max_pending=256, timeout=30.0, max_body_bytes=8 * 1024 * 1024, max_batch=1000):
+        self.executor = executor
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.max_body_bytes = max_body_bytes
+        self.max_batch = max_batch
+        self.pending = 0
+        self.started = time.time()
+        self.counts = {'requests': 0, 'rejected': 0, 'timed_out': 0}
+
+    # Run a job in the pool; 503 once max_pending jobs are queued or running, 504 past the timeout.
+    # A timed-out job is abandoned, not cancelled: the worker finishes it and the result is dropped.
+    async def run_job(self, function, *args):
+        if self.pending >= self.max_pending:
+            self.counts['rejected'] += 1
+            raise HTTPError(503, f"{self.pending} requests already pending", headers={'Retry-After': '1'})
+        self.pending += 1
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self.counts['timed_out'] += 1
+            raise HTTPError(504, f"no result within {self.timeout:g} s")
+        finally:
+            self.pending -= 1
+
+    def _payload(self, body):
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError as error:
+            raise HTTPError(400, f"request body is not valid JSON: {error}", 'JSONDecodeError')
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "request body must be a JSON object", 'WorkerRequestError')
+        return payload
+
+    # Returns (status, content type, body bytes, extra headers)
+    async def dispatch(self, method, path, body):
+        self.counts['requests'] += 1
+        route = path.split('?', 1)[0].rstrip('/') or '/'
+        if route == '/health':
+            if method != 'GET':
+                raise HTTPError(405, "use GET")
+            return self._json(200, {'ok': True, 'pid': os.getpid(), 'workers': self.workers, 'pending': self.pending, 'max_pending': self.max_pending, 'uptime_seconds': time.time() - self.started, **self.counts})
+        if route not in ('/v1/forecast', '/v1/forecast/batch', '/v1/report', '/v1/report/pdf'):
+            raise HTTPError(404, f"no route {route}")
+        if method != 'POST':
+            raise HTTPError(405, "use POST")
+        payload = self._payload(body)
+
+        with span('api_request', route=route):
+            if route == '/v1/forecast/batch':
+                clients = payload.get('clients')
+                if not isinstance(clients, list):
+                    raise HTTPError(400, "'clients' must be a list of client objects", 'WorkerRequestError')
+                if len(clients) > self.max_batch:
+                    raise HTTPError(413, f"at most {self.max_batch} clients per batch")
+                progression_format = payload.get('progression', 'records')
+                if progression_format not in PROGRESSION_FORMATS:
+                    raise HTTPError(400, f"'progression' must be one of {', '.join(PROGRESSION_FORMATS)}", 'WorkerRequestError')
+                result = await self.run_job(_batch_job, clients, progression_format)
+                return self._json(200 if result['ok'] else 500, result)
+            if not isinstance(payload.get('client'), dict):
+                raise HTTPError(400, "'client' must be an object with the client's fields", 'WorkerRequestError')
+            if route == '/v1/report/pdf':
+                result = await self.run_job(_pdf_job, payload['client'])
+                if not result['ok']:
+                    return self._json(self._error_status(result), result)
+                return 200, 'application/pdf', result['pdf'], {'Content-Disposition': _content_disposition(result['file_name'], result['display_name'])}
+            if route == '/v1/report':
+                request = {'client': payload['client'], 'report': ['data'], 'progression': payload.get('progression', 'none')}
+            else:
+                request = {'client': payload['client'], 'progression': payload.get('progression', 'records')}
+            response = await self.run_job(_forecast_job, request)
+            response.pop('id', None)
+            if response['ok']:
+                return self._json(200, response)
+            return self._json(self._error_status(response), response)
+
+    # Bad client input is the caller's fault (400); anything else failed on our side (500)
+    def _error_status(self, response):
+        return 400 if response['error']['type'] in ('ClientInputError', 'WorkerRequestError') else 500
+
+    def _json(self, status, payload):
+        return status, 'application/json', json.dumps(payload, default=str, separators=(',', ':')).encode('utf-8'), {}
+
+    async def _read_request(self, reader):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPError(413, "request headers too large")
+        lines = head.decode('latin-1').split("\r\n")
+        try:
+            method, target, version = lines[0].split(' ')
+        except ValueError:
+            raise HTTPError(400, "malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            raise HTTPError(411, "chunked bodies are not supported; send Content-Length")
+        length = headers.get('content-length', '0')
+        if not (length.isascii() and length.isdigit()):  # int() would also take '-5', '+5' or '1_000'
+            raise HTTPError(400, "invalid Content-Length")
+        length = int(length)
+        if length > self.max_body_bytes:
+            raise HTTPError(413, f"request body larger than {self.max_body_bytes} bytes")
+        body = await reader.readexactly(length) if length else b''
+        keep_alive = headers.get('connection', '').lower() != 'close' if version == 'HTTP/1.1' else headers.get('connection', '').lower() == 'keep-alive'
+        return method.upper(), target, body, keep_alive
+
+    # Status line and headers; header values must be single-line Latin-1, so anything else raises ValueError
+    def _response_bytes(self, status, content_type, payload, headers, keep_alive):
+        head = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}", f"Content-Type: {content_type}", f"Content-Length: {len(payload)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        for name, value in headers.items():
+            value = str(value)
+            if '\r' in value or '\n' in value:
+                raise ValueError(f"header {name} contains a line break")
+            head.append(f"{name}: {value}")
+        return ("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + payload
+
+    # One connection: HTTP/1.1 keep-alive, requests answered in order
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, target, body, keep_alive = request
+                    status, content_type, payload, headers = await self.dispatch(method, target, body)
+                except HTTPError as error:
+                    status, content_type, payload, headers = self._json(error.status, _error_body(error.error_type, str(error)))
+                    headers = error.headers
+                except Exception as error:
+                    status, content_type, payload, headers = self._json(500, _error_body(type(error).__name__, str(error)))
+                try:
+                    response = self._response_bytes(status, content_type, payload, headers, keep_alive)
+                except ValueError as error:
+                    status, content_type, payload, _ = self._json(500, _error_body(type(error).__name__, str(error)))
+                    response = self._response_bytes(status, content_type, payload, {}, keep_alive)
+                writer.write(response)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start_server(self, host, port):
+        return await asyncio.start_server(self.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+
+async def _serve(args):
+    warm = not args.no_warmup
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_pool_process, initargs=(warm,)) as executor:
+        api = ForecastAPI(executor, args.workers or os.cpu_count(), max_pending=args.max_pending, timeout=args.timeout)
+        server = await api.start_server(args.host, args.port)
+        print(f"api {os.getpid()} listening on http://{args.host}:{args.port} ({api.workers} workers)", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve forecasts, reports and PDFs over HTTP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--max-pending', type=int, default=256, help="queued or running jobs before new requests get 503")
+    parser.add_argument('--timeout', type=float, default=30.0, help="seconds before a request gets 504")
+    parser.add_argument('--no-warmup', action='store_true', help="skip the warm-up in each worker process (see warmup.py)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
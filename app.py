@@ -1,17 +1,16 @@
 import streamlit as st
-import pandas as pd
+import threading
+import time
 from datetime import datetime, timedelta
-from grimore_test import predict_weight_loss, calculate_lean_mass_preservation_scores, get_body_fat_info, estimate_tef, estimate_neat, calculate_metabolic_adaptation
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from io import BytesIO
-
-# Function to calculate age
-def calculate_age(dob, current_date):
-    return current_date.year - dob.year - ((current_date.month, current_date.day) < (dob.month, dob.day))
+from weight_loss_model import PROGRESSION_FIELDS, _iter_weight_loss_rows, calculate_lean_mass_preservation_scores
+from progression import Progression
+from report import generate_pdf, generate_report_data, build_initial_data, CLOSING_MESSAGE
+from concurrent.futures import ThreadPoolExecutor
+from result_cache import ResultCache
+from stage_graph import StageGraph
+from disk_store import store_from_env, dump_progression, load_progression
+from instrumentation import configure_from_env, span
+from warmup import warm_up
 
 # Set page configuration
 st.set_page_config(page_title="Weight Loss Predictor", layout="wide")
@@ -52,312 +51,57 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# PDF generation function using ReportLab
-def generate_pdf(progression, report_data, gender, client_name):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(name='Justify', alignment=1))
-    
-    story = []
-    
-    # Title
-    story.append(Paragraph("YOUR PERSONALIZED WEIGHT LOSS JOURNEY REPORT", styles['Heading1']))
-    story.append(Spacer(1, 12))
-    
-    # Personal Profile
-    story.append(Paragraph("1. PERSONAL PROFILE", styles['Heading2']))
-    data = [[key, value] for key, value in report_data['personal_profile'].items()]
-    t = Table(data)
-    t.setStyle(TableStyle([('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                           ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                           ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                           ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                           ('FONTSIZE', (0, 0), (-1, 0), 14),
-                           ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                           ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                           ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-                           ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                           ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-                           ('FONTSIZE', (0, 0), (-1, -1), 12),
-                           ('TOPPADDING', (0, 0), (-1, -1), 6),
-                           ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-                           ('GRID', (0, 0), (-1, -1), 1, colors.black)]))
-    story.append(t)
-    story.append(Spacer(1, 12))
-
-    # Metabolic Calculations
-    story.append(Paragraph("2. METABOLIC CALCULATIONS", styles['Heading2']))
-    data = [[key, value] for key, value in report_data['metabolic_calculations'].items()]
-    t = Table(data)
-    t.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 14),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 12),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    story.append(t)
-    story.append(Spacer(1, 12))
-    
-    # Workout Analysis
-    story.append(Paragraph("3. WORKOUT ANALYSIS", styles['Heading2']))
-    data = [[key, value] for key, value in report_data['workout_analysis'].items()]
-    t = Table(data)
-    t.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 14),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 12),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    story.append(t)
-    story.append(Spacer(1, 12))
-
-    # Body Composition Adjustments
-    story.append(Paragraph("4. BODY COMPOSITION ADJUSTMENTS", styles['Heading2']))
-    data = [[key, value] for key, value in report_data['body_composition'].items()]
-    t = Table(data)
-    t.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 14),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 12),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    story.append(t)
-    story.append(Spacer(1, 12))
-    
-    # Weekly Progress Summary
-    story.append(Paragraph("5. WEEKLY PROGRESS SUMMARY", styles['Heading2']))
-    data = [
-        ["Week", "Date", "Weight (lbs)", "Body Fat %", "Daily Calories", "TDEE", "Weekly Caloric Output", "Total Weight Lost"]
-    ]
-    for i, entry in enumerate(progression):
-        data.append([str(i), entry['date'], f"{entry['weight']:.1f}", f"{entry['body_fat_percentage']:.1f}", f"{entry['daily_calorie_intake']:.0f}", f"{entry['tdee']:.0f}", f"{entry['weekly_caloric_output']:.1f}", f"{entry['total_weight_lost']:.1f}"])
-    
-    t = Table(data)
-    t.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    story.append(t)
-    story.append(Spacer(1, 12))
-    
-    # Metabolic Adaptation
-    story.append(Paragraph("6. METABOLIC ADAPTATION", styles['Heading2']))
-    data = [[key, value] for key, value in report_data['metabolic_adaptation'].items()]
-    t = Table(data)
-    t.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 14),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 12),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    story.append(t)
-    story.append(Spacer(1, 12))
-    
-    # Final Results
-    story.append(Paragraph("7. FINAL RESULTS", styles['Heading2']))
-    data = [[key, value] for key, value in report_data['final_results'].items()]
-    t = Table(data)
-    t.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 14),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 12),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    story.append(t)
-    story.append(Spacer(1, 12))
-    
-    # Body Fat Category Progression
-    story.append(Paragraph("8. BODY FAT CATEGORY PROGRESSION", styles['Heading2']))
-    data = [[key, value] for key, value in report_data['body_fat_category'].items()]
-    t = Table(data)
-    t.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 14),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 12),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    story.append(t)
-    story.append(Spacer(1, 12))
-    
-    # Insights and Recommendations
-    story.append(Paragraph("9. INSIGHTS AND RECOMMENDATIONS", styles['Heading2']))
-    for recommendation in report_data['insights_recommendations']:
-        story.append(Paragraph(recommendation, styles['Justify']))
-    story.append(Spacer(1, 12))
-    
-    # Next Steps
-    story.append(Paragraph("10. NEXT STEPS", styles['Heading2']))
-    for step in report_data['next_steps']:
-        story.append(Paragraph(step, styles['Justify']))
-    
-    story.append(Spacer(1, 12))
-    story.append(Paragraph("Remember, this journey is a marathon, not a sprint. Celebrate your progress and stay committed to your health and fitness goals!", styles['Justify']))
-    
-    # Build the PDF
-    doc.build(story)
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-    return pdf_bytes
-
-# Function to generate the comprehensive report data
-def generate_report_data(progression, initial_data, gender):
-    initial_entry = progression[0]
-    final_entry = progression[-1]
-    total_weeks = len(progression) - 1
-    total_weight_loss = initial_entry['weight'] - final_entry['weight']
-    total_bf_loss = initial_entry['body_fat_percentage'] - final_entry['body_fat_percentage']
-    avg_weekly_loss = total_weight_loss / total_weeks
-    total_muscle_gain = sum(entry['muscle_gain'] for entry in progression)
-    adaptation_percentage = (1 - final_entry['tdee'] / initial_entry['tdee']) * 100
-    lean_mass_preserved = (final_entry['lean_mass'] / initial_entry['lean_mass']) * 100
-    avg_muscle_gain = total_muscle_gain / total_weeks
-
-    report_data = {
-        "personal_profile": {
-            "Start Date": initial_entry['date'],
-            "End Date": final_entry['date'],
-            "Age": calculate_age(initial_data['dob'], datetime.strptime(initial_entry['date'], '%m%d%y')),
-            "Gender": gender.upper(),
-            "Height": f"{initial_data['height_feet']}'{initial_data['height_inches']}\" ({initial_data['height_cm']:.1f} cm)",
-            "Initial Weight": f"{initial_entry['weight']:.1f} lbs",
-            "Goal Weight": f"{initial_data['goal_weight']:.1f} lbs",
-            "Initial Body Fat": f"{initial_entry['body_fat_percentage']:.1f}%",
-            "Goal Body Fat": f"{initial_data['goal_bf']:.1f}%",
-            "Activity Level": initial_data['activity_level_description'],
-            "Experience Level": initial_data['experience_level']
-        },
-        "metabolic_calculations": {
-            "Initial RMR": f"{initial_data['initial_rmr']:.0f} calories/day",
-            "Initial TDEE": f"{initial_data['initial_tdee']:.0f} calories/day",
-            "TEF": f"{initial_data['tef']:.0f} calories/day",
-            "NEAT": f"{initial_data['neat']:.0f} calories/day",
-            "Initial Daily Calorie Intake": f"{initial_data['initial_daily_calories']:.0f} calories/day"
-        },
-        "workout_analysis": {
-            "Workout Type": initial_data['workout_type'],
-            "Workout Frequency": f"{initial_data['workout_days']} days/week",
-            "Volume Score": f"{initial_data['volume_score']:.2f}",
-            "Intensity Score": f"{initial_data['intensity_score']:.2f}",
-            "Frequency Score": f"{initial_data['frequency_score']:.2f}",
-            "Resistance Training": "Yes" if initial_data['resistance_training'] else "No",
-            "Athlete Status": "Yes" if initial_data['is_athlete'] else "No"
-        },
-        "body_composition": {
-            "Initial Lean Mass": f"{initial_data['initial_lean_mass']:.1f} lbs",
-            "Initial Fat Mass": f"{initial_data['initial_fat_mass']:.1f} lbs",
-            "Estimated Weekly Muscle Gain": f"{initial_data['estimated_muscle_gain']:.3f} lbs"
-        },
-        "metabolic_adaptation": {
-            "Week 1 Metabolic Adaptation": f"{initial_data['week1_adaptation']:.2f}",
-            "Final Week Metabolic Adaptation": f"{initial_data['final_week_adaptation']:.2f}"
-        },
-        "final_results": {
-            "Duration": f"{total_weeks} weeks",
-            "Total Weight Loss": f"{total_weight_loss:.1f} lbs",
-            "Total Body Fat Reduction": f"{total_bf_loss:.1f}%",
-            "Final Weight": f"{final_entry['weight']:.1f} lbs",
-            "Final Body Fat": f"{final_entry['body_fat_percentage']:.1f}%",
-            "Average Weekly Weight Loss": f"{avg_weekly_loss:.2f} lbs",
-            "Total Muscle Gain": f"{total_muscle_gain:.1f} lbs",
-            "Final Daily Calorie Intake": f"{final_entry['daily_calorie_intake']:.0f} calories",
-            "Final TDEE": f"{final_entry['tdee']:.0f} calories",
-            "Final Weekly Caloric Output": f"{final_entry['weekly_caloric_output']:.1f} calories"
-        },
-        "body_fat_category": {
-            "Initial Category": initial_data['initial_bf_category'],
-            "Description": initial_data['initial_bf_description'],
-            "Estimated Time to Six-Pack": initial_data['initial_sixpack_time'],
-            "Final Category": initial_data['final_bf_category'],
-            "Description": initial_data['final_bf_description'],
-            "Estimated Time to Six-Pack": initial_data['final_sixpack_time']
-        },
-        "insights_recommendations": [
-            f"Your metabolic rate adapted by {adaptation_percentage:.1f}% over the course of your journey.",
-            f"You maintained an impressive {lean_mass_preserved:.1f}% of your initial lean mass.",
-            f"Your muscle gain rate averaged {avg_muscle_gain:.3f} lbs per week, which is {'excellent' if avg_muscle_gain > 0.5 else 'good' if avg_muscle_gain > 0.25 else 'moderate'}.",
-            f"Based on your final body fat percentage, you're now in the {initial_data['final_bf_category']} category.",
-            f"To maintain your results, consider a daily calorie intake of {final_entry['tdee']:.0f} calories."
-        ],
-        "next_steps": [
-            initial_data['personalized_recommendation'],
-            f"Consider adjusting your protein intake to {final_entry['weight'] * 0.8:.0f} g/day to support lean mass.",
-            f"Your next ideal body composition goal could be {max(final_entry['body_fat_percentage'] - 2, 5):.1f}% body fat."
-        ]
-    }
-    return report_data
+# Process-wide forecast cache shared by all sessions
+@st.cache_resource
+def get_result_cache():
+    return ResultCache(max_entries=256, max_bytes=64 * 1024 * 1024)
+
+# Content-addressed store shared by every server process on the host, enabled with GRIMORE_STORE_DIR
+@st.cache_resource
+def get_disk_store():
+    return store_from_env()
+
+# Background pool for PDF rendering so ReportLab layout does not hold up the on-screen report
+@st.cache_resource
+def get_pdf_executor():
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix='pdf-render')
+
+# Per-stage timing spans, enabled with GRIMORE_METRICS=1 (see instrumentation.py)
+@st.cache_resource
+def get_metrics_recorder():
+    return configure_from_env()
+
+get_metrics_recorder()
+
+# Warm up once per server process, in the background so the first page load is not held up;
+# set GRIMORE_SKIP_WARMUP=1 to disable (e.g. in tests)
+@st.cache_resource
+def start_warmup():
+    warmup_thread = threading.Thread(target=warm_up, name='warmup', daemon=True)
+    warmup_thread.start()
+    return warmup_thread
+
+start_warmup()
+
+# Runs on the PDF executor so the render span is timed on the worker thread
+def render_pdf(progression, report_data, gender):
+    with span('pdf_render', weeks=len(progression) - 1):
+        return generate_pdf(progression, report_data, gender)
+
+# Seconds between live preview refreshes while a forecast streams in
+PREVIEW_INTERVAL = 0.1
+
+# Headline numbers and the weekly table so far (rows in PROGRESSION_FIELDS order), redrawn into one placeholder
+def render_preview(placeholder, rows):
+    import pandas as pd
+    latest = dict(zip(PROGRESSION_FIELDS, rows[-1]))
+    with placeholder.container():
+        st.subheader(f"Forecasting... week {len(rows) - 1}")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Weight", f"{latest['weight']:.1f} lbs", f"{-latest['total_weight_lost']:.1f} lbs", delta_color="inverse")
+        col2.metric("Body Fat", f"{latest['body_fat_percentage']:.1f}%")
+        col3.metric("Daily Calories", f"{latest['daily_calorie_intake']:.0f}")
+        st.dataframe(pd.DataFrame(rows, columns=PROGRESSION_FIELDS))
 
 # Main app
 st.title("Weight Loss Predictor")
@@ -435,7 +179,24 @@ with col2:
         "Elite (10+ Years)"
     ])
 
-if st.button("Calculate"):
+# Raw widget values; each pipeline stage below declares which of them it reads. The client's name only
+# labels the download, so it stays out of the pipeline and editing it renders nothing again.
+values = {
+    'current_weight': current_weight, 'current_bf': current_bf, 'goal_weight': goal_weight, 'goal_bf': goal_bf,
+    'start_date': start_date, 'end_date': end_date, 'dob': dob, 'gender': gender, 'feet': feet, 'inches': inches,
+    'activity_level': activity_level, 'resistance_training': resistance_training, 'is_athlete': is_athlete,
+    'workout_type': workout_type, 'workout_days': workout_days, 'protein_intake': protein_intake,
+    'job_activity': job_activity, 'leisure_activity': leisure_activity, 'experience_level': experience_level
+}
+
+# Pipeline stages, memoized in the process-wide cache; a rerun only executes stages downstream of edited inputs
+pipeline = StageGraph(get_result_cache(), get_disk_store())
+
+# PDFs are persisted once rendered; the in-flight future itself is not stored
+PDF_CODEC = (lambda value: value if isinstance(value, bytes) else None, bytes)
+
+@pipeline.stage('model_inputs', inputs=['activity_level', 'job_activity', 'leisure_activity', 'workout_type', 'workout_days', 'experience_level'])
+def model_inputs_stage(activity_level, job_activity, leisure_activity, workout_type, workout_days, experience_level):
     # Convert activity level to numeric
     activity_level_map = {
         "Little To No Exercise": 1,
@@ -444,115 +205,154 @@ if st.button("Calculate"):
         "Hard Exercise/Sports 6-7 Days A Week": 4,
         "Very Hard Exercise/Sports & A Physical Job": 5
     }
-    activity_level_num = activity_level_map[activity_level]
-
-    # Convert job and leisure activity to lowercase
-    job_activity_lower = job_activity.split('-')[0].strip().lower()
-    leisure_activity_lower = leisure_activity.split('-')[0].strip().lower()
 
     # Extract workout type
     workout_type_simple = workout_type.split('-')[0].strip()
 
     volume_score, intensity_score, frequency_score = calculate_lean_mass_preservation_scores(workout_days, workout_type_simple)
-    is_bodybuilder = workout_type_simple == "Bodybuilding" and experience_level in ['Intermediate (2-4 Years)', 'Advanced (4-10 Years)', 'Elite (10+ Years)']
-
-    progression = predict_weight_loss(
-        current_weight, current_bf, goal_weight, goal_bf, start_date, end_date,
-        dob, gender.lower(), activity_level_num, height_cm, is_athlete,
-        resistance_training, protein_intake, volume_score, intensity_score,
-        frequency_score, job_activity_lower, leisure_activity_lower,
-        experience_level, is_bodybuilder
-    )
-
-    # Calculate initial RMR and TDEE
-    initial_rmr = progression[0]['rmr']
-    initial_tdee = progression[0]['tdee']
-    initial_daily_calories = progression[0]['daily_calorie_intake']
-
-    # Generate report data
-    report_data = generate_report_data(progression, {
-        'dob': dob,
-        'height_feet': feet,
-        'height_inches': inches,
-        'height_cm': height_cm,
-        'goal_weight': goal_weight,
-        'goal_bf': goal_bf,
-        'activity_level_description': activity_level,
-        'experience_level': experience_level,
-        'initial_rmr': initial_rmr,
-        'initial_tdee': initial_tdee,
-        'tef': estimate_tef(protein_intake),
-        'neat': estimate_neat(job_activity_lower, leisure_activity_lower),
-        'initial_daily_calories': initial_daily_calories,
-        'workout_type': workout_type,
-        'workout_days': workout_days,
+    return {
+        'activity_level': activity_level_map[activity_level],
+        # Convert job and leisure activity to lowercase
+        'job_activity': job_activity.split('-')[0].strip().lower(),
+        'leisure_activity': leisure_activity.split('-')[0].strip().lower(),
         'volume_score': volume_score,
         'intensity_score': intensity_score,
         'frequency_score': frequency_score,
-        'resistance_training': resistance_training,
-        'is_athlete': is_athlete,
-        'initial_lean_mass': progression[0]['lean_mass'],
-        'initial_fat_mass': progression[0]['fat_mass'],
-        'estimated_muscle_gain': progression[0]['muscle_gain'],
-        'week1_adaptation': calculate_metabolic_adaptation(1, progression[0]['body_fat_percentage'], is_bodybuilder),
-        'final_week_adaptation': calculate_metabolic_adaptation(len(progression)-1, progression[-1]['body_fat_percentage'], is_bodybuilder),
-        'initial_bf_category': get_body_fat_info(gender.lower(), progression[0]['body_fat_percentage'])[0],
-        'initial_bf_description': get_body_fat_info(gender.lower(), progression[0]['body_fat_percentage'])[2],
-        'initial_sixpack_time': get_body_fat_info(gender.lower(), progression[0]['body_fat_percentage'])[1],
-        'final_bf_category': get_body_fat_info(gender.lower(), progression[-1]['body_fat_percentage'])[0],
-        'final_bf_description': get_body_fat_info(gender.lower(), progression[-1]['body_fat_percentage'])[2],
-        'final_sixpack_time': get_body_fat_info(gender.lower(), progression[-1]['body_fat_percentage'])[1],
-        'personalized_recommendation': 'Increase resistance training to maximize muscle gain.' if not resistance_training else 'Continue with your current plan.',
-    }, gender.lower())
-
-    # Display results
-    st.header("Your Personalized Weight Loss Journey Report")
-
-    st.subheader("1. Personal Profile")
-    for key, value in report_data['personal_profile'].items():
-        st.write(f"{key}: {value}")
-
-    st.subheader("2. Metabolic Calculations")
-    for key, value in report_data['metabolic_calculations'].items():
-        st.write(f"{key}: {value}")
-
-    st.subheader("3. Workout Analysis")
-    for key, value in report_data['workout_analysis'].items():
-        st.write(f"{key}: {value}")
-
-    st.subheader("4. Body Composition Adjustments")
-    for key, value in report_data['body_composition'].items():
-        st.write(f"{key}: {value}")
-
-    st.subheader("5. Weekly Progress Summary")
-    progress_df = pd.DataFrame(progression)
-    st.dataframe(progress_df)
-
-    st.subheader("6. Metabolic Adaptation")
-    for key, value in report_data['metabolic_adaptation'].items():
-        st.write(f"{key}: {value}")
-
-    st.subheader("7. Final Results")
-    for key, value in report_data['final_results'].items():
-        st.write(f"{key}: {value}")
-
-    st.subheader("8. Body Fat Category Progression")
-    for key, value in report_data['body_fat_category'].items():
-        st.write(f"{key}: {value}")
+        'is_bodybuilder': workout_type_simple == "Bodybuilding" and experience_level in ['Intermediate (2-4 Years)', 'Advanced (4-10 Years)', 'Elite (10+ Years)']
+    }
 
-    st.subheader("9. Insights and Recommendations")
-    for insight in report_data['insights_recommendations']:
-        st.write(f"• {insight}")
+@pipeline.stage('progression', inputs=['current_weight', 'current_bf', 'goal_weight', 'goal_bf', 'start_date', 'end_date', 'dob', 'gender', 'feet', 'inches', 'is_athlete', 'resistance_training', 'protein_intake', 'experience_level'], depends=['model_inputs'], codec=(dump_progression, load_progression))
+def progression_stage(current_weight, current_bf, goal_weight, goal_bf, start_date, end_date, dob, gender, feet, inches, is_athlete, resistance_training, protein_intake, experience_level, model_inputs):
+    # Stream the forecast week by week so long horizons show their first weeks right away
+    live_preview = st.empty()
+    rows = []
+    last_preview = 0
+    with span('simulate', weeks=(end_date - start_date).days // 7, clients=1) as simulation:
+        for row in _iter_weight_loss_rows(
+            current_weight, current_bf, goal_weight, goal_bf, start_date, end_date,
+            dob, gender.lower(), model_inputs['activity_level'], (feet * 12 + inches) * 2.54, is_athlete,
+            resistance_training, protein_intake, model_inputs['volume_score'], model_inputs['intensity_score'],
+            model_inputs['frequency_score'], model_inputs['job_activity'], model_inputs['leisure_activity'],
+            experience_level, model_inputs['is_bodybuilder']
+        ):
+            rows.append(row)
+            if len(rows) == 1 or time.perf_counter() - last_preview >= PREVIEW_INTERVAL:
+                render_preview(live_preview, rows)
+                last_preview = time.perf_counter()
+        simulation.set(weeks_simulated=len(rows) - 1)
+    live_preview.empty()
+    return Progression.from_rows(start_date, rows)
+
+@pipeline.stage('report_data', inputs=['dob', 'gender', 'feet', 'inches', 'goal_weight', 'goal_bf', 'activity_level', 'experience_level', 'protein_intake', 'workout_type', 'workout_days', 'resistance_training', 'is_athlete'], depends=['model_inputs', 'progression'])
+def report_data_stage(dob, gender, feet, inches, goal_weight, goal_bf, activity_level, experience_level, protein_intake, workout_type, workout_days, resistance_training, is_athlete, model_inputs, progression):
+    with span('report_data', weeks=len(progression) - 1):
+        return generate_report_data(progression, build_initial_data(progression, {
+            'dob': dob,
+            'gender': gender.lower(),
+            'height_feet': feet,
+            'height_inches': inches,
+            'height_cm': (feet * 12 + inches) * 2.54,
+            'goal_weight': goal_weight,
+            'goal_bf': goal_bf,
+            'activity_level_description': activity_level,
+            'experience_level': experience_level,
+            'daily_protein_intake': protein_intake,
+            'job_activity': model_inputs['job_activity'],
+            'leisure_activity': model_inputs['leisure_activity'],
+            'workout_type': workout_type,
+            'workout_days': workout_days,
+            'volume_score': model_inputs['volume_score'],
+            'intensity_score': model_inputs['intensity_score'],
+            'frequency_score': model_inputs['frequency_score'],
+            'resistance_training': resistance_training,
+            'is_athlete': is_athlete,
+            'is_bodybuilder': model_inputs['is_bodybuilder']
+        }), gender.lower())
+
+@pipeline.stage('dataframe', depends=['progression'])
+def dataframe_stage(progression):
+    with span('dataframe', weeks=len(progression) - 1):
+        progress_df = progression.to_dataframe()
+        progress_df['date'] = progress_df['date'].dt.strftime("%m%d%y")  # the table has always shown MMDDYY dates
+        return progress_df
+
+# Rendered in the background while the on-screen report is written; the memoized future is
+# swapped for the PDF bytes once collected
+@pipeline.stage('pdf', inputs=['gender'], depends=['progression', 'report_data'], codec=PDF_CODEC)
+def pdf_stage(gender, progression, report_data):
+    return get_pdf_executor().submit(render_pdf, progression, report_data, gender.lower())
+
+# Calculate snapshots the inputs; later reruns (widget edits, the download button) re-show that
+# report with every stage from the cache, and edits only take effect on the next Calculate
+if st.button("Calculate"):
+    st.session_state['report_values'] = dict(values)
 
-    st.subheader("10. Next Steps")
-    for step in report_data['next_steps']:
-        st.write(f"• {step}")
+if 'report_values' in st.session_state:
+    stages = pipeline.run(st.session_state['report_values'])
+    progression = stages['progression']
+    report_data = stages['report_data']
+    client_name = f"{first_name} {last_name}"
 
-    st.write("Remember, this journey is a marathon, not a sprint. Celebrate your progress and stay committed to your health and fitness goals!")
+    # Start rendering the PDF in the background while the on-screen report is written
+    pdf_result = stages['pdf']
+    progress_df = stages['dataframe']
 
-    # Generate PDF
-    client_name = f"{first_name} {last_name}"
-    pdf_bytes = generate_pdf(progression, report_data, gender.lower(), client_name)
+    # Display results
+    with span('display', weeks=len(progression) - 1):
+        st.header("Your Personalized Weight Loss Journey Report")
+
+        st.subheader("1. Personal Profile")
+        for key, value in report_data['personal_profile'].items():
+            st.write(f"{key}: {value}")
+
+        st.subheader("2. Metabolic Calculations")
+        for key, value in report_data['metabolic_calculations'].items():
+            st.write(f"{key}: {value}")
+
+        st.subheader("3. Workout Analysis")
+        for key, value in report_data['workout_analysis'].items():
+            st.write(f"{key}: {value}")
+
+        st.subheader("4. Body Composition Adjustments")
+        for key, value in report_data['body_composition'].items():
+            st.write(f"{key}: {value}")
+
+        st.subheader("5. Weekly Progress Summary")
+        st.dataframe(progress_df)
+
+        st.subheader("6. Metabolic Adaptation")
+        for key, value in report_data['metabolic_adaptation'].items():
+            st.write(f"{key}: {value}")
+
+        st.subheader("7. Final Results")
+        for key, value in report_data['final_results'].items():
+            st.write(f"{key}: {value}")
+
+        st.subheader("8. Body Fat Category Progression")
+        for key, value in report_data['body_fat_category'].items():
+            st.write(f"{key}: {value}")
+
+        st.subheader("9. Insights and Recommendations")
+        for insight in report_data['insights_recommendations']:
+            st.write(f"• {insight}")
+
+        st.subheader("10. Next Steps")
+        for step in report_data['next_steps']:
+            st.write(f"• {step}")
+
+        st.write(CLOSING_MESSAGE)
+
+    # Collect the PDF from the background worker
+    if isinstance(pdf_result, bytes):
+        pdf_bytes = pdf_result
+    else:
+        try:
+            with st.spinner("Preparing PDF report..."), span('pdf_wait'):
+                pdf_bytes = pdf_result.result()
+        except Exception:
+            stages.discard('pdf')  # don't keep serving the failed render for these inputs
+            raise
+        stages.replace('pdf', pdf_bytes)
 
     # Create download button
     st.download_button(
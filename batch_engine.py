@@ -0,0 +1,282 @@
+#batch_engine.py (Vectorized batch version of predict_weight_loss for whole client rosters)
+import datetime
+import numpy as np
+
+from energy_equations import DEFAULT_RMR_EQUATION, RMR_EQUATIONS, get_rmr_equation
+from progression import Progression, PROGRESSION_FIELDS
+from weight_loss_model import ACTIVITY_FACTORS, JOB_FACTORS, LEISURE_FACTORS, GAIN_RATES, PED_EXPERIENCE_LEVELS
+
+# Broadcast a scalar or sequence input to a 1-D array of length n
+def _column(values, n, dtype=float):
+    arr = np.asarray(values, dtype=dtype)
+    if arr.ndim == 0:
+        arr = np.full(n, arr, dtype=dtype)
+    if arr.shape != (n,):
+        raise ValueError(f"Expected {n} values, got shape {arr.shape}.")
+    return arr
+
+# Convert a column of dates (date/datetime objects or datetime64) to datetime64[D]
+def _date_column(values, n):
+    if isinstance(values, (datetime.date, np.datetime64)):
+        values = [values]
+    if isinstance(values, np.ndarray) and np.issubdtype(values.dtype, np.datetime64):
+        arr = values.astype('datetime64[D]')
+    else:
+        epoch = datetime.date(1970, 1, 1).toordinal()
+        arr = np.fromiter((v.toordinal() - epoch for v in values), dtype=np.int64).astype('datetime64[D]')
+    if arr.shape == (1,) and n != 1:
+        arr = np.repeat(arr, n)
+    if arr.shape != (n,):
+        raise ValueError(f"Expected {n} dates, got shape {arr.shape}.")
+    return arr
+
+# Map a column of categorical labels through a lookup dict (with an optional default)
+def _lookup(values, n, table, default=None):
+    labels = np.asarray(values, dtype=object)
+    if labels.ndim == 0:
+        labels = np.full(n, labels.item(), dtype=object)
+    uniques, inverse = np.unique(labels.astype(str), return_inverse=True)
+    mapped = []
+    for label in uniques:
+        if label in table:
+            mapped.append(table[label])
+        elif default is not None:
+            mapped.append(default)
+        else:
+            raise KeyError(label)
+    return np.asarray(mapped, dtype=float)[inverse.reshape(-1)]
+
+# Split a datetime64[D] array into year, month and day integer arrays
+def _ymd(dates):
+    years = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+    months = dates.astype('datetime64[M]').astype(np.int64) % 12 + 1
+    days = (dates - dates.astype('datetime64[M]')).astype(np.int64) + 1
+    return years, months, days
+
+# First date in the given years on which calculate_age counts the birthday as passed
+# (a Feb 29 birthday counts from Mar 1 in non-leap years, as in calculate_age)
+def _birthday_in_year(years, dob_month, dob_day):
+    month_start = ((years - 1970) * 12 + dob_month - 1).astype('datetime64[M]').astype('datetime64[D]')
+    return month_start + (dob_day - 1)
+
+# RMR for every client with each client's equation from energy_equations; equations maps to the index
+# arrays of its clients, or is a single equation shared by all
+def _rmr_by_equation(equations, weight, body_fat, age, is_male, height_cm, is_athlete):
+    if not isinstance(equations, list):
+        return equations.rmr_vec(weight, body_fat, age, is_male, height_cm, is_athlete)
+    rmr = np.empty(weight.shape)
+    for equation, rows in equations:
+        rmr[rows] = equation.rmr_vec(weight[rows], body_fat[rows], age[rows], is_male[rows], height_cm[rows], is_athlete[rows])
+    return rmr
+
+# Vectorized calculate_metabolic_adaptation
+def calculate_metabolic_adaptation_vec(week, current_bf, is_bodybuilder):
+    base_adaptation = np.where(is_bodybuilder, np.maximum(0.80, 1 - (week / 200)), np.maximum(0.85, 1 - (week / 300)))
+    bf_factor = np.maximum(0.9, 1 - (30 - current_bf) / 100)
+    return base_adaptation * bf_factor
+
+# Vectorized distribute_weight_loss
+def distribute_weight_loss_vec(weekly_weight_loss, current_bf, resistance_training, daily_protein_intake, current_weight, is_bodybuilder):
+    fat_loss_ratio = 0.75 + np.where(current_bf > 30, 0.05, np.where(current_bf < 15, -0.05, 0.0))
+    fat_loss_ratio = fat_loss_ratio + np.where(resistance_training, 0.05, 0.0)
+    protein_factor = np.minimum(daily_protein_intake / (current_weight * 0.8), 1)
+    fat_loss_ratio = fat_loss_ratio + protein_factor * 0.05
+    fat_loss_ratio = np.where(is_bodybuilder, np.minimum(fat_loss_ratio + 0.1, 0.95), np.minimum(fat_loss_ratio, 0.9))
+    return weekly_weight_loss * fat_loss_ratio, weekly_weight_loss * (1 - fat_loss_ratio)
+
+# Vectorized estimate_muscle_gain; base_rate and ped_boost come from the experience level lookups
+def estimate_muscle_gain_vec(current_weight, training_frequency, training_volume, intensity, protein_intake, age, is_male, base_rate, ped_boost):
+    age_multiplier = np.where(age < 30, 1.0, np.where(age < 40, 0.8, 0.6))
+    gender_multiplier = np.where(is_male, 1.0, 0.8)
+    frequency_multiplier = np.minimum(training_frequency / 3, 1.25)
+    volume_intensity_multiplier = np.minimum((training_volume * intensity) / (10 * 0.7), 1.25)
+    protein_multiplier = np.minimum(protein_intake / (current_weight * 1.6), 1.25)
+    monthly_gain_percentage = base_rate * age_multiplier * gender_multiplier * frequency_multiplier * volume_intensity_multiplier * protein_multiplier
+    monthly_gain_percentage = np.where(ped_boost, monthly_gain_percentage * 2.5, monthly_gain_percentage)
+    return (monthly_gain_percentage * current_weight) / 4
+
+# Predict weight loss progression for many clients at once. Every argument mirrors
+# predict_weight_loss but may be a column (one value per client) or a scalar shared by all.
+# Returns a dict of (clients, weeks + 1) arrays per progression field, NaN-padded after each
+# client's last week, plus 'start_date' and 'num_weeks' columns describing each client's rows.
+# week_factors, if given, is called with each week number and may return per-client multipliers
+# for 'neat', 'adaptation' (metabolic adaptation) and 'adherence' (eaten / planned intake).
+# rmr_equation is an energy_equations name, or a column of names so clients can use different equations.
+def predict_weight_loss_batch(current_weight, current_bf, goal_weight, goal_bf, start_date, end_date, dob, gender, activity_level, height_cm, is_athlete, resistance_training, daily_protein_intake, volume_score, intensity_score, frequency_score, job_activity, leisure_activity, experience_level, is_bodybuilder, fields=PROGRESSION_FIELDS, week_factors=None, rmr_equation=DEFAULT_RMR_EQUATION):
+    n = max(np.size(value) for value in (current_weight, current_bf, goal_weight, goal_bf, start_date, end_date, dob, gender, activity_level, height_cm, is_athlete, resistance_training, daily_protein_intake, volume_score, intensity_score, frequency_score, job_activity, leisure_activity, experience_level, is_bodybuilder))
+    current_weight = _column(current_weight, n)
+    current_bf = _column(current_bf, n)
+    goal_weight = _column(goal_weight, n)
+    goal_bf = _column(goal_bf, n)
+    start = _date_column(start_date, n)
+    end = _date_column(end_date, n)
+    dob = _date_column(dob, n)
+    is_male = _column(np.asarray(gender, dtype=object) == 'm', n, bool)
+    activity_factor = np.asarray(ACTIVITY_FACTORS)[_column(activity_level, n, int) - 1]
+    height_cm = _column(height_cm, n)
+    is_athlete = _column(is_athlete, n, bool)
+    resistance_training = _column(resistance_training, n, bool)
+    daily_protein_intake = _column(daily_protein_intake, n)
+    training_volume = _column(volume_score, n) * 20
+    intensity_score = _column(intensity_score, n)
+    training_frequency = _column(frequency_score, n) * 3
+    is_bodybuilder = _column(is_bodybuilder, n, bool)
+    tef = daily_protein_intake * 0.3
+    neat = _lookup(job_activity, n, JOB_FACTORS) + _lookup(leisure_activity, n, LEISURE_FACTORS)
+    base_rate = _lookup(experience_level, n, GAIN_RATES, default=0.0075)
+    ped_boost = is_bodybuilder & _lookup(experience_level, n, dict.fromkeys(PED_EXPERIENCE_LEVELS, 1.0), default=0.0).astype(bool)
+    names = np.asarray(rmr_equation, dtype=object)
+    if names.ndim == 0:
+        equations = get_rmr_equation(names.item())
+    else:
+        names, inverse = np.unique(_column(names, n, object).astype(str), return_inverse=True)
+        equations = [(get_rmr_equation(name), np.flatnonzero(inverse == index)) for index, name in enumerate(names)]
+        if len(equations) == 1:
+            equations = equations[0][0]
+
+    weeks = (end - start).astype(np.int64) // 7
+    max_weeks = int(max(weeks.max(initial=0), 0))
+    initial_weight = current_weight.copy()
+
+    # Rows are filled week-major so each week is one contiguous write, then transposed on return
+    columns = {field: np.empty((max_weeks + 1, n)) for field in fields}
+    num_weeks = np.zeros(n, dtype=np.int64)
+
+    def record(week, mask, values):
+        for field in fields:
+            columns[field][week] = np.where(mask, values[field], np.nan)
+
+    # Track age by counting birthdays as each week passes instead of re-deriving it from dates
+    start_year = start.astype('datetime64[Y]').astype(np.int64) + 1970
+    dob_year, dob_month, dob_day = _ymd(dob)
+    next_birthday = _birthday_in_year(start_year, dob_month, dob_day)
+    birthday_passed = next_birthday <= start
+    next_birthday = np.where(birthday_passed, _birthday_in_year(start_year + 1, dob_month, dob_day), next_birthday)
+    age = start_year - dob_year - ~birthday_passed
+
+    # Add initial entry
+    rmr = _rmr_by_equation(equations, current_weight, current_bf, age, is_male, height_cm, is_athlete)
+    tdee = rmr * activity_factor + tef + neat
+    record(0, np.ones(n, dtype=bool), {
+        'weight': current_weight,
+        'body_fat_percentage': current_bf,
+        'daily_calorie_intake': np.minimum(rmr * 0.58, tdee * 0.58),
+        'tdee': tdee,
+        'weekly_caloric_output': np.zeros(n),
+        'total_weight_lost': np.zeros(n),
+        'lean_mass': current_weight * (1 - current_bf / 100),
+        'fat_mass': current_weight * (current_bf / 100),
+        'muscle_gain': np.zeros(n),
+        'rmr': rmr
+    })
+
+    finished = np.zeros(n, dtype=bool)
+    for week in range(1, max_weeks + 1):
+        active = ~finished & (week <= weeks)
+        if not active.any():
+            for field in fields:
+                columns[field][week:] = np.nan
+            break
+
+        week_date = start + np.timedelta64(7 * week, 'D')
+        birthday_passed = week_date >= next_birthday
+        if birthday_passed.any():
+            age = age + birthday_passed
+            next_year = next_birthday.astype('datetime64[Y]').astype(np.int64) + 1971
+            next_birthday = np.where(birthday_passed, _birthday_in_year(next_year, dob_month, dob_day), next_birthday)
+        rmr = _rmr_by_equation(equations, current_weight, current_bf, age, is_male, height_cm, is_athlete)
+        factors = week_factors(week) if week_factors else {}
+        tdee = rmr * activity_factor + tef + (neat * factors['neat'] if 'neat' in factors else neat)
+        metabolic_adaptation = calculate_metabolic_adaptation_vec(week, current_bf, is_bodybuilder)
+        if 'adaptation' in factors:
+            metabolic_adaptation = metabolic_adaptation * factors['adaptation']
+        adapted_tdee = tdee * metabolic_adaptation
+
+        remaining_weeks = np.maximum(1, weeks - week)
+        current_fat_mass = current_weight * (current_bf / 100)
+        current_lean_mass = current_weight - current_fat_mass
+        goal_fat_mass = (goal_bf / 100) * current_lean_mass / (1 - (goal_bf / 100))
+        remaining_fat_to_lose = np.maximum(current_fat_mass - goal_fat_mass, 0)
+        daily_deficit_required = remaining_fat_to_lose / remaining_weeks * 3500 / 7
+        min_calories = np.maximum(adapted_tdee / 3, 1000)
+        daily_calorie_intake = np.maximum(adapted_tdee - daily_deficit_required, min_calories)
+        if 'adherence' in factors:
+            daily_calorie_intake = daily_calorie_intake * factors['adherence']
+
+        weekly_caloric_output = (adapted_tdee - daily_calorie_intake) * 7
+        fat_loss, lean_loss = distribute_weight_loss_vec(weekly_caloric_output / 3500, current_bf, resistance_training, daily_protein_intake, current_weight, is_bodybuilder)
+        muscle_gain = np.where(resistance_training, estimate_muscle_gain_vec(current_weight, training_frequency, training_volume, intensity_score, daily_protein_intake, age, is_male, base_rate, ped_boost), 0.0)
+
+        new_fat_mass = np.maximum(0, current_weight * (current_bf / 100) - fat_loss)
+        new_lean_mass = np.maximum(current_weight * (1 - current_bf / 100) - lean_loss + muscle_gain, current_weight * 0.05)
+        new_weight = new_fat_mass + new_lean_mass
+        new_bf = (new_fat_mass / new_weight) * 100
+
+        # Clients that already finished keep their final state
+        current_weight = np.where(active, new_weight, current_weight)
+        current_bf = np.where(active, new_bf, current_bf)
+
+        record(week, active, {
+            'weight': current_weight,
+            'body_fat_percentage': current_bf,
+            'daily_calorie_intake': daily_calorie_intake,
+            'tdee': adapted_tdee,
+            'weekly_caloric_output': weekly_caloric_output,
+            'total_weight_lost': initial_weight - current_weight,
+            'lean_mass': new_lean_mass,
+            'fat_mass': new_fat_mass,
+            'muscle_gain': muscle_gain,
+            'rmr': rmr
+        })
+        num_weeks[active] = week
+        finished |= active & (current_bf <= goal_bf) & (current_weight <= goal_weight)
+
+    result = {field: columns[field].T for field in fields}
+    result['start_date'] = start
+    result['num_weeks'] = num_weeks
+    return result
+
+# Forecast every client under every RMR equation in one predict_weight_loss_batch run: the clients are
+# repeated once per equation rather than re-simulated equation by equation. columns holds the batch
+# arguments (e.g. client_inputs.model_columns(clients)); equations defaults to every registered one.
+# Returns the batch result with each field shaped (clients, equations, weeks + 1), 'num_weeks' shaped
+# (clients, equations), 'start_date' per client and the 'equations' compared.
+def compare_rmr_equations(columns, equations=None, fields=PROGRESSION_FIELDS):
+    equations = list(RMR_EQUATIONS if equations is None else equations)
+    for name in equations:
+        get_rmr_equation(name)
+    columns = {name: value for name, value in columns.items() if name != 'rmr_equation'}
+    n = max(1 if isinstance(value, (str, datetime.date)) else np.size(value) for value in columns.values())
+    k = len(equations)
+    repeated = {}
+    for name, value in columns.items():
+        if isinstance(value, (str, datetime.date)) or np.ndim(value) == 0:
+            repeated[name] = value
+        else:
+            repeated[name] = np.repeat(np.asarray(value), k)
+    # The batch takes its size from the columns, so one of them must have a row per client and equation
+    repeated['current_weight'] = np.repeat(np.broadcast_to(np.asarray(columns['current_weight'], dtype=float), (n,)), k)
+    result = predict_weight_loss_batch(**repeated, fields=fields, rmr_equation=np.tile(np.asarray(equations, dtype=object), n))
+    compared = {field: result[field].reshape(n, k, -1) for field in fields}
+    compared['num_weeks'] = result['num_weeks'].reshape(n, k)
+    compared['start_date'] = result['start_date'][::k]
+    compared['equations'] = equations
+    return compared
+
+# Rebuild one client's progression from a batch result in the same format predict_weight_loss returns
+def batch_client_progression(result, index):
+    start = result['start_date'][index].astype(datetime.date)
+    progression = []
+    for week in range(int(result['num_weeks'][index]) + 1):
+        entry = {'date': (start + datetime.timedelta(weeks=week)).strftime("%m%d%y")}
+        for field in PROGRESSION_FIELDS:
+            if field in result:
+                entry[field] = float(result[field][index, week])
+        progression.append(entry)
+    return progression
+
+# View one client's rows of a batch result as a Progression without copying the arrays
+def batch_client_columns(result, index):
+    rows = int(result['num_weeks'][index]) + 1
+    columns = {field: result[field][index, :rows] for field in PROGRESSION_FIELDS if field in result}
+    return Progression(result['start_date'][index], columns)
@@ -0,0 +1,129 @@
+#batch_reports.py (Render PDF plans for a whole client roster across a process pool)
+# Usage: python batch_reports.py roster.csv --out-dir reports [--archive plans.zip] [--workers N]
+import argparse
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from batch_engine import predict_weight_loss_batch, batch_client_columns
+from client_inputs import ClientInputError, iter_roster_rows, normalize_client, model_columns, client_label
+from report import build_initial_data, generate_report_data, generate_pdf
+
+# Turn a client label into a safe file name
+def _file_name(label):
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', label).strip('_') + "_weight_loss_plan.pdf"
+
+# File name for the client at index that no earlier client was given; a repeated label gets the
+# index appended, then a counter if that is taken too (another client may be labelled "Ann Lee 2")
+def _unique_file_name(label, index, used_names):
+    file_name = _file_name(label)
+    attempt = 0
+    while file_name in used_names:
+        file_name = _file_name(f"{label}_{index}" if not attempt else f"{label}_{index}_{attempt}")
+        attempt += 1
+    used_names.add(file_name)
+    return file_name
+
+# Worker: build report data and render the PDF for a chunk of clients.
+# Writes each file itself when out_dir is given, otherwise returns the bytes.
+def _render_chunk(jobs, out_dir):
+    results = []
+    for index, client, progression, file_name in jobs:
+        started = time.perf_counter()
+        try:
+            report_data = generate_report_data(progression, build_initial_data(progression, client), client['gender'])
+            pdf_bytes = generate_pdf(progression, report_data, client['gender'], client_label(client, index))
+            if out_dir is not None:
+                with open(os.path.join(out_dir, file_name), 'wb') as pdf_file:
+                    pdf_file.write(pdf_bytes)
+                pdf_bytes = None
+            results.append((index, file_name, time.perf_counter() - started, pdf_bytes, None))
+        except Exception as error:
+            results.append((index, file_name, time.perf_counter() - started, None, f"{type(error).__name__}: {error}"))
+    return results
+
+# Read and validate the roster; invalid rows are reported and skipped
+def load_clients(path, log=sys.stderr):
+    clients = []
+    for row_number, row in enumerate(iter_roster_rows(path), 1):
+        try:
+            clients.append(normalize_client(row))
+        except ClientInputError as error:
+            print(f"row {row_number}: skipped ({error})", file=log)
+    return clients
+
+# Forecast every client in one batch, then render the PDFs in parallel.
+# Returns a summary dict with per-document timings.
+def generate_roster_reports(clients, out_dir=None, archive_path=None, workers=None, chunk_size=4, log=sys.stderr):
+    if out_dir is None and archive_path is None:
+        raise ValueError("Either out_dir or archive_path is required.")
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+
+    started = time.perf_counter()
+    result = predict_weight_loss_batch(**model_columns(clients))
+    forecast_seconds = time.perf_counter() - started
+
+    used_names = set()
+    jobs = []
+    for index, client in enumerate(clients):
+        file_name = _unique_file_name(client_label(client, index), index, used_names)
+        jobs.append((index, client, batch_client_columns(result, index), file_name))
+
+    timings = {}
+    errors = {}
+    archive = zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_STORED) if archive_path else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_render_chunk, jobs[i:i + chunk_size], None if archive else out_dir) for i in range(0, len(jobs), chunk_size)]
+            for future in as_completed(futures):
+                for index, file_name, seconds, pdf_bytes, error in future.result():
+                    if error:
+                        errors[file_name] = error
+                        print(f"[{len(timings) + len(errors)}/{len(jobs)}] {file_name} failed: {error}", file=log)
+                        continue
+                    if archive:
+                        archive.writestr(file_name, pdf_bytes)
+                    timings[file_name] = seconds
+                    print(f"[{len(timings) + len(errors)}/{len(jobs)}] {file_name} {seconds * 1000:.1f} ms", file=log)
+    finally:
+        if archive:
+            archive.close()
+
+    elapsed = time.perf_counter() - started
+    durations = sorted(timings.values())
+    return {
+        'documents': len(timings),
+        'failed': len(errors),
+        'errors': errors,
+        'forecast_seconds': forecast_seconds,
+        'elapsed_seconds': elapsed,
+        'documents_per_second': len(timings) / elapsed if elapsed else 0.0,
+        'mean_render_ms': sum(durations) / len(durations) * 1000 if durations else 0.0,
+        'p95_render_ms': durations[int(len(durations) * 0.95)] * 1000 if durations else 0.0,
+        'timings': timings
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render PDF weight loss plans for every client in a roster.")
+    parser.add_argument('roster', help="CSV, JSONL or JSON roster file")
+    parser.add_argument('--out-dir', help="write one PDF per client into this directory")
+    parser.add_argument('--archive', help="write all PDFs into this zip archive instead")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--chunk-size', type=int, default=4, help="clients per worker task")
+    args = parser.parse_args(argv)
+    if not args.out_dir and not args.archive:
+        parser.error("one of --out-dir or --archive is required")
+
+    clients = load_clients(args.roster)
+    summary = generate_roster_reports(clients, out_dir=None if args.archive else args.out_dir, archive_path=args.archive, workers=args.workers, chunk_size=args.chunk_size)
+    print(f"{summary['documents']} PDFs ({summary['failed']} failed) in {summary['elapsed_seconds']:.2f}s "
+          f"({summary['documents_per_second']:.1f}/s); forecast {summary['forecast_seconds'] * 1000:.1f} ms, "
+          f"render mean {summary['mean_render_ms']:.1f} ms p95 {summary['p95_render_ms']:.1f} ms")
+    return 1 if summary['failed'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#bench_pdf.py (Per-PDF render time and allocations for report.generate_pdf, against per-call styles)
+# Usage: python benchmarks/bench_pdf.py [--iterations N] [--weeks W]
+import argparse
+import datetime
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from client_inputs import normalize_client, model_args
+from weight_loss_model import predict_weight_loss_columns
+from report import PROGRESS_TABLE_HEADER, CLOSING_MESSAGE, build_initial_data, generate_pdf, generate_report_data
+from report_template import _build_styles, _table_style, render_story
+from reportlab.platypus import Paragraph, Spacer, Table
+
+# Representative single-client forecast and report data
+def build_fixture(weeks):
+    start_date = datetime.date(2024, 1, 1)
+    client = normalize_client({
+        'current_weight': 240, 'current_bf': 30, 'goal_weight': 190, 'goal_bf': 12, 'start_date': start_date,
+        'end_date': start_date + datetime.timedelta(weeks=weeks), 'dob': datetime.date(1990, 1, 1), 'gender': 'm',
+        'height_feet': 5, 'height_inches': 11, 'activity_level': 3, 'resistance_training': True, 'daily_protein_intake': 150,
+        'workout_type': 'Bodybuilding', 'workout_days': 5, 'job_activity': 'sedentary', 'leisure_activity': 'light',
+        'experience_level': 'Intermediate (2-4 years)'
+    })
+    progression = predict_weight_loss_columns(*model_args(client))
+    report_data = generate_report_data(progression, build_initial_data(progression, client), 'm')
+    return progression, report_data
+
+# The report as generate_pdf built it before report_template: a fresh style sheet per call and a
+# fresh TableStyle per table. Same story and layout, so the difference is the style setup alone.
+def generate_pdf_per_call_styles(progression, report_data, gender, client_name=None):
+    styles = _build_styles()
+
+    def key_value_section(heading, mapping):
+        table = Table([[key, value] for key, value in mapping.items()])
+        table.setStyle(_table_style(14, 12))
+        return [Paragraph(heading, styles['Heading2']), table, Spacer(1, 12)]
+
+    def paragraph_section(heading, lines):
+        return [Paragraph(heading, styles['Heading2'])] + [Paragraph(line, styles['Justify']) for line in lines] + [Spacer(1, 12)]
+
+    story = [Paragraph("YOUR PERSONALIZED WEIGHT LOSS JOURNEY REPORT", styles['Heading1']), Spacer(1, 12)]
+    story += key_value_section("1. PERSONAL PROFILE", report_data['personal_profile'])
+    story += key_value_section("2. METABOLIC CALCULATIONS", report_data['metabolic_calculations'])
+    story += key_value_section("3. WORKOUT ANALYSIS", report_data['workout_analysis'])
+    story += key_value_section("4. BODY COMPOSITION ADJUSTMENTS", report_data['body_composition'])
+
+    rows = [PROGRESS_TABLE_HEADER]
+    for i, entry in enumerate(progression):
+        rows.append([str(i), entry['date'], f"{entry['weight']:.1f}", f"{entry['body_fat_percentage']:.1f}", f"{entry['daily_calorie_intake']:.0f}", f"{entry['tdee']:.0f}", f"{entry['weekly_caloric_output']:.1f}", f"{entry['total_weight_lost']:.1f}"])
+    table = Table(rows)
+    table.setStyle(_table_style(12, 10))
+    story += [Paragraph("5. WEEKLY PROGRESS SUMMARY", styles['Heading2']), table, Spacer(1, 12)]
+
+    story += key_value_section("6. METABOLIC ADAPTATION", report_data['metabolic_adaptation'])
+    story += key_value_section("7. FINAL RESULTS", report_data['final_results'])
+    story += key_value_section("8. BODY FAT CATEGORY PROGRESSION", report_data['body_fat_category'])
+    story += paragraph_section("9. INSIGHTS AND RECOMMENDATIONS", report_data['insights_recommendations'])
+    story += paragraph_section("10. NEXT STEPS", report_data['next_steps'])
+    story += [Paragraph(CLOSING_MESSAGE, styles['Justify'])]
+    return render_story(story)
+
+# Sorted per-call timings and peak traced memory for one renderer
+def measure(render, progression, report_data, iterations):
+    render(progression, report_data, 'm')  # warm fonts and imports
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        render(progression, report_data, 'm')
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+
+    tracemalloc.start()
+    render(progression, report_data, 'm')
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return timings, peak
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark generate_pdf render time and memory.")
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--weeks', type=int, default=52)
+    args = parser.parse_args()
+
+    progression, report_data = build_fixture(args.weeks)
+    print(f"weeks={len(progression) - 1} iterations={args.iterations}")
+    results = {}
+    for label, render in (('before (styles per call)', generate_pdf_per_call_styles), ('after (shared styles)', generate_pdf)):
+        timings, peak = measure(render, progression, report_data, args.iterations)
+        results[label] = timings[len(timings) // 2]
+        print(f"{label:<25} mean {sum(timings) / len(timings) * 1000:.2f} ms  p50 {timings[len(timings) // 2] * 1000:.2f} ms  min {timings[0] * 1000:.2f} ms  peak {peak / 1024:.1f} KiB")
+    before, after = results.values()
+    print(f"p50 change {(after - before) * 1000:+.2f} ms ({(after / before - 1) * 100:+.1f}%)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+#bench_suite.py (Benchmark suite for the model, report and PDF hot paths with JSON baselines)
+# Usage: python benchmarks/bench_suite.py [--quick] [--only NAME ...] [--save-baseline] [--baseline PATH] [--threshold 0.25]
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_engine import predict_weight_loss_batch
+from client_inputs import normalize_client, model_args, model_columns
+from grimore_test import generate_comprehensive_report
+from report import build_initial_data, generate_pdf, generate_report_data
+from weight_loss_model import predict_weight_loss, predict_weight_loss_columns
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "baseline.json")
+START_DATE = datetime.date(2024, 1, 1)
+
+# Fixture profiles: a bodybuilder that takes the is_bodybuilder branches and a general-fitness client that does not
+PROFILES = {
+    'bodybuilder': {
+        'current_weight': 240, 'current_bf': 30, 'goal_weight': 190, 'goal_bf': 12, 'dob': datetime.date(1990, 1, 1), 'gender': 'm',
+        'height_feet': 5, 'height_inches': 11, 'activity_level': 3, 'resistance_training': True, 'daily_protein_intake': 150,
+        'workout_type': 'Bodybuilding', 'workout_days': 5, 'job_activity': 'sedentary', 'leisure_activity': 'light',
+        'experience_level': 'Intermediate (2-4 years)'
+    },
+    'general': {
+        'current_weight': 180, 'current_bf': 35, 'goal_weight': 150, 'goal_bf': 25, 'dob': datetime.date(1978, 6, 15), 'gender': 'f',
+        'height_feet': 5, 'height_inches': 5, 'activity_level': 2, 'resistance_training': False, 'daily_protein_intake': 90,
+        'workout_type': 'General Fitness', 'workout_days': 3, 'job_activity': 'light', 'leisure_activity': 'moderate',
+        'experience_level': 'Beginner (0-1 year)'
+    }
+}
+
+HORIZONS = {'12w': 12, '3y': 156}
+
+# Cold-import cases: what a fresh worker process pays before it can serve its first request
+IMPORT_CASES = {
+    'import/weight_loss_model': ['weight_loss_model'],
+    'import/report': ['report'],
+    'import/grimore_test': ['grimore_test'],
+    'import/app_modules': ['weight_loss_model', 'progression', 'report', 'result_cache', 'stage_graph', 'disk_store', 'instrumentation'],
+    'import/app_modules_with_streamlit': ['streamlit', 'weight_loss_model', 'progression', 'report', 'result_cache', 'stage_graph', 'disk_store', 'instrumentation']
+}
+
+def build_client(profile, weeks):
+    return normalize_client(dict(PROFILES[profile], start_date=START_DATE, end_date=START_DATE + datetime.timedelta(weeks=weeks)))
+
+# Roster of n clients cycling through both profiles with varied weights and horizons
+def build_roster(n, weeks):
+    clients = []
+    for index in range(n):
+        profile = 'bodybuilder' if index % 2 == 0 else 'general'
+        client = build_client(profile, weeks - index % 8)
+        client['current_weight'] += index % 40
+        clients.append(client)
+    return clients
+
+# Each case is (name, units processed per call, setup returning a zero-argument callable)
+def build_cases(quick=False):
+    cases = []
+    for profile in PROFILES:
+        for horizon, weeks in HORIZONS.items():
+            def setup(profile=profile, weeks=weeks):
+                args = model_args(build_client(profile, weeks))
+                return lambda: predict_weight_loss(*args)
+            cases.append((f"predict_weight_loss/{profile}/{horizon}", 1, setup))
+
+    for horizon, weeks in HORIZONS.items():
+        def setup(weeks=weeks):
+            client = build_client('bodybuilder', weeks)
+            progression = predict_weight_loss(*model_args(client))
+            initial_data = dict(client, protein_intake=client['daily_protein_intake'])
+            return lambda: generate_comprehensive_report(progression, initial_data)
+        cases.append((f"generate_comprehensive_report/{horizon}", 1, setup))
+
+        def setup(weeks=weeks):
+            client = build_client('bodybuilder', weeks)
+            progression = predict_weight_loss_columns(*model_args(client))
+            initial_data = build_initial_data(progression, client)
+            return lambda: generate_report_data(progression, initial_data, client['gender'])
+        cases.append((f"generate_report_data/{horizon}", 1, setup))
+
+        def setup(weeks=weeks):
+            client = build_client('bodybuilder', weeks)
+            progression = predict_weight_loss_columns(*model_args(client))
+            report_data = generate_report_data(progression, build_initial_data(progression, client), client['gender'])
+            return lambda: generate_pdf(progression, report_data, client['gender'], 'Bench Client')
+        cases.append((f"generate_pdf/{horizon}", 1, setup))
+
+    for size in ([1000] if quick else [1000, 10000]):
+        def setup(size=size):
+            columns = model_columns(build_roster(size, 52))
+            return lambda: predict_weight_loss_batch(**columns)
+        cases.append((f"predict_weight_loss_batch/roster_{size}", size, setup))
+    return cases
+
+# Time one callable: repeat until min_time has elapsed (at least min_iterations), then trace one call for peak memory
+def measure(func, units, min_time=0.5, min_iterations=3):
+    func()  # warm caches, fonts and lazy imports
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < min_iterations or time.perf_counter() - started < min_time:
+        call_started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - call_started)
+    timings.sort()
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    mean = sum(timings) / len(timings)
+    return {
+        'iterations': len(timings),
+        'mean_ms': mean * 1000,
+        'p50_ms': timings[len(timings) // 2] * 1000,
+        'min_ms': timings[0] * 1000,
+        'throughput_per_s': units / timings[len(timings) // 2],
+        'peak_kib': peak / 1024
+    }
+
+# Top-level (name, cumulative microseconds) pairs logged by -X importtime for a snippet of code
+def _top_level_imports(code):
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    imports = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name[1:].startswith(' '):  # nested imports are already in their parent's cumulative time
+            imports.append((name.strip(), int(cumulative)))
+    return imports
+
+# Seconds spent importing modules in a fresh interpreter, not counting what interpreter startup imports anyway
+def import_time(modules):
+    startup = {name for name, _ in _top_level_imports('pass')}
+    return sum(cumulative for name, cumulative in _top_level_imports(f"import {', '.join(modules)}") if name not in startup) / 1e6
+
+# Same result shape as measure(); peak memory is not traced for a child process
+def measure_import(modules, runs=5):
+    timings = sorted(import_time(modules) for _ in range(runs))
+    return {
+        'iterations': runs,
+        'mean_ms': sum(timings) / runs * 1000,
+        'p50_ms': timings[runs // 2] * 1000,
+        'min_ms': timings[0] * 1000,
+        'throughput_per_s': 1 / timings[runs // 2],
+        'peak_kib': 0.0
+    }
+
+def run_suite(only=None, quick=False, min_time=0.5, log=sys.stderr):
+    results = {}
+    cases = [(name, lambda units=units, setup=setup: measure(setup(), units, min_time)) for name, units, setup in build_cases(quick)]
+    # Import cases whose modules are not installed (e.g. streamlit on a headless worker) are skipped
+    cases += [(name, lambda modules=modules: measure_import(modules)) for name, modules in IMPORT_CASES.items()
+              if all(importlib.util.find_spec(module) is not None for module in modules)]
+    for name, run_case in cases:
+        if only and not any(pattern in name for pattern in only):
+            continue
+        results[name] = run_case()
+        print(f"{name:<50} p50 {results[name]['p50_ms']:10.2f} ms  {results[name]['throughput_per_s']:12.1f}/s  peak {results[name]['peak_kib']:10.1f} KiB", file=log)
+    return {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results
+    }
+
+# Cases whose p50 time or peak memory grew by more than threshold (a fraction) over the baseline
+def compare_results(baseline, current, threshold=0.25):
+    regressions = []
+    for name, result in current['results'].items():
+        reference = baseline['results'].get(name)
+        if reference is None:
+            continue
+        for metric in ('p50_ms', 'peak_kib'):
+            if reference[metric] > 0 and result[metric] > reference[metric] * (1 + threshold):
+                regressions.append({'case': name, 'metric': metric, 'baseline': reference[metric], 'current': result[metric],
+                                    'change': result[metric] / reference[metric] - 1})
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the forecast, report and PDF paths and compare against a JSON baseline.")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline JSON file to compare against or write")
+    parser.add_argument('--save-baseline', action='store_true', help="write this run as the new baseline instead of comparing")
+    parser.add_argument('--threshold', type=float, default=0.25, help="allowed slowdown or memory growth as a fraction (0.25 = 25%%)")
+    parser.add_argument('--only', nargs='*', help="run only cases whose name contains one of these strings")
+    parser.add_argument('--quick', action='store_true', help="skip the largest roster batch")
+    parser.add_argument('--min-time', type=float, default=0.5, help="seconds to spend timing each case")
+    parser.add_argument('--output', help="also write this run's results to a JSON file")
+    args = parser.parse_args(argv)
+
+    current = run_suite(args.only, args.quick, args.min_time)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(current, output, indent=2)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as output:
+            json.dump(current, output, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+        return 0
+    with open(args.baseline, encoding='utf-8') as baseline_file:
+        baseline = json.load(baseline_file)
+    regressions = compare_results(baseline, current, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression['case']} {regression['metric']}: {regression['baseline']:.2f} -> {regression['current']:.2f} ({regression['change']:+.0%})")
+    if regressions:
+        return 1
+    print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
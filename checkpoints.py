@@ -0,0 +1,96 @@
+#checkpoints.py (Forkable simulation state for what-if branches and re-forecasts from a weigh-in)
+import datetime
+
+import numpy as np
+
+from client_inputs import MODEL_ARGUMENTS, model_options
+from weight_loss_model import _iter_weight_loss_rows
+from progression import Progression, PROGRESSION_FIELDS
+
+# State of a forecast after `week` simulated weeks: current weight and BF%, the starting weight
+# (for total_weight_lost), the model inputs (and rmr_equation) that drive the remaining weeks, and the rows so far.
+# fork() changes inputs from this week on and run() only simulates the weeks after it.
+class SimulationCheckpoint:
+    def __init__(self, inputs, week=0, current_weight=None, current_bf=None, initial_weight=None, history=None):
+        missing = [name for name in MODEL_ARGUMENTS if name not in inputs]
+        if missing:
+            raise ValueError(f"Missing model inputs: {', '.join(missing)}")
+        self.inputs = dict({name: inputs[name] for name in MODEL_ARGUMENTS}, **model_options(inputs))
+        self.week = week
+        self.current_weight = self.inputs['current_weight'] if current_weight is None else current_weight
+        self.current_bf = self.inputs['current_bf'] if current_bf is None else current_bf
+        self.initial_weight = self.current_weight if initial_weight is None else initial_weight
+        self.history = history
+
+    # Week-0 checkpoint from predict_weight_loss's positional arguments
+    @classmethod
+    def from_args(cls, args):
+        return cls(dict(zip(MODEL_ARGUMENTS, args)))
+
+    # Week-0 checkpoint from a normalized client (see client_inputs.normalize_client)
+    @classmethod
+    def from_client(cls, client):
+        return cls(client)
+
+    # Snapshot an existing forecast after `week`, keeping its rows up to that week as history
+    @classmethod
+    def from_progression(cls, inputs, progression, week):
+        if not 0 <= week < len(progression):
+            raise ValueError(f"week {week} is outside the forecast (0-{len(progression) - 1})")
+        history = Progression(progression.start_date.astype(datetime.date), {field: progression[field][:week + 1] for field in PROGRESSION_FIELDS})
+        return cls(inputs, week, float(progression['weight'][week]), float(progression['body_fat_percentage'][week]),
+                   float(progression['weight'][0]), history if week else None)
+
+    @property
+    def date(self):
+        return self.inputs['start_date'] + datetime.timedelta(weeks=self.week)
+
+    @property
+    def fat_mass(self):
+        return self.current_weight * (self.current_bf / 100)
+
+    @property
+    def lean_mass(self):
+        return self.current_weight - self.fat_mass
+
+    # Copy of this checkpoint with some model inputs (or rmr_equation) replaced, e.g. fork(resistance_training=True).
+    # At week 0 the whole forecast depends on the inputs, so current_weight/current_bf may be changed too.
+    def fork(self, **changes):
+        unknown = sorted(set(changes) - set(self.inputs))
+        if unknown:
+            raise ValueError(f"Unknown model inputs: {', '.join(unknown)}")
+        inputs = dict(self.inputs, **changes)
+        if self.week == 0:
+            return SimulationCheckpoint(inputs)
+        return SimulationCheckpoint(inputs, self.week, self.current_weight, self.current_bf, self.initial_weight, self.history)
+
+    # Restart from a measured weigh-in on `date` (default: this checkpoint's date): the forecast up to
+    # that week is kept, its last row takes the measured weight and body fat, and later weeks are re-simulated
+    def rebase(self, weight, body_fat, date=None):
+        if self.history is None:
+            raise ValueError("rebase needs a checkpoint taken from a forecast (SimulationCheckpoint.from_progression)")
+        week = self.week if date is None else (date - self.inputs['start_date']).days // 7
+        if not 0 < week < len(self.history):
+            raise ValueError(f"weigh-in week {week} is outside the forecast history (1-{len(self.history) - 1})")
+        columns = {field: self.history[field][:week + 1].copy() for field in PROGRESSION_FIELDS}
+        columns['weight'][week] = weight
+        columns['body_fat_percentage'][week] = body_fat
+        columns['lean_mass'][week] = weight * (1 - body_fat / 100)
+        columns['fat_mass'][week] = weight * (body_fat / 100)
+        columns['total_weight_lost'][week] = self.initial_weight - weight
+        history = Progression(self.history.start_date.astype(datetime.date), columns)
+        return SimulationCheckpoint(self.inputs, week, weight, body_fat, self.initial_weight, history)
+
+    # Rows (PROGRESSION_FIELDS order) for the weeks after this checkpoint
+    def iter_rows(self):
+        arguments = dict(self.inputs, current_weight=self.current_weight, current_bf=self.current_bf)
+        return _iter_weight_loss_rows(*(arguments[name] for name in MODEL_ARGUMENTS), resume_week=self.week, initial_weight=self.initial_weight, rmr_equation=self.inputs['rmr_equation'])
+
+    # Full forecast: the history up to this checkpoint followed by the newly simulated weeks. Without
+    # history only the new weeks are returned, dated from the first week after the checkpoint.
+    def run(self):
+        rows = list(self.iter_rows())
+        if self.history is None:
+            return Progression.from_rows(self.inputs['start_date'] + datetime.timedelta(weeks=self.week + 1 if self.week else 0), rows)
+        suffix = Progression.from_rows(self.inputs['start_date'], rows)
+        return Progression(self.inputs['start_date'], {field: np.concatenate([self.history[field], suffix[field]]) for field in PROGRESSION_FIELDS})
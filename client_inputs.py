@@ -0,0 +1,220 @@
+#client_inputs.py (Validation and normalization of client records for headless/batch runs)
+import csv
+import datetime
+import json
+
+from energy_equations import DEFAULT_RMR_EQUATION, RMR_EQUATIONS
+from weight_loss_model import calculate_lean_mass_preservation_scores
+
+WORKOUT_TYPES = ["Bodybuilding", "Cardio", "General Fitness"]
+ACTIVITY_LEVELS = ["sedentary", "light", "moderate", "active"]
+EXPERIENCE_LEVELS = ["Beginner (0-1 year)", "Novice (1-2 years)", "Intermediate (2-4 years)", "Advanced (4-10 years)", "Elite (10+ years)"]
+BODYBUILDER_EXPERIENCE_LEVELS = ['Intermediate (2-4 years)', 'Advanced (4-10 years)', 'Elite (10+ years)']
+ACTIVITY_LEVEL_DESCRIPTIONS = ["Little to no exercise", "Light exercise/sports 1-3 days/week", "Moderate exercise/sports 3-5 days/week", "Hard exercise/sports 6-7 days a week", "Very hard exercise/sports & a physical job"]
+
+# Argument order of predict_weight_loss
+MODEL_ARGUMENTS = ['current_weight', 'current_bf', 'goal_weight', 'goal_bf', 'start_date', 'end_date', 'dob', 'gender', 'activity_level', 'height_cm', 'is_athlete', 'resistance_training', 'daily_protein_intake', 'volume_score', 'intensity_score', 'frequency_score', 'job_activity', 'leisure_activity', 'experience_level', 'is_bodybuilder']
+
+DATE_FORMATS = ["%Y-%m-%d", "%m%d%y", "%m/%d/%Y"]
+
+# Longest plan accepted; batch runs allocate (weeks + 1) rows for every client in a chunk, so one
+# far-off end_date would otherwise size the whole chunk
+MAX_HORIZON_WEEKS = 520
+
+# Raised when a roster record is missing a field or holds a value outside the model's vocabulary
+class ClientInputError(ValueError):
+    def __init__(self, field, message):
+        super().__init__(f"{field}: {message}")
+        self.field = field
+
+def _missing(value):
+    return value is None or (isinstance(value, str) and not value.strip()) or (isinstance(value, float) and value != value)
+
+def _get(row, field, default=None, required=True):
+    value = row.get(field)
+    if _missing(value):
+        if required and default is None:
+            raise ClientInputError(field, "value is required")
+        return default
+    return value
+
+def _float(row, field, default=None, minimum=None, maximum=None):
+    value = _get(row, field, default)
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ClientInputError(field, f"expected a number, got {value!r}")
+    if (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+        raise ClientInputError(field, f"{value} is outside {minimum}-{maximum}")
+    return value
+
+def _int(row, field, default=None, minimum=None, maximum=None):
+    value = _float(row, field, default, minimum, maximum)
+    if not value.is_integer():
+        raise ClientInputError(field, f"expected a whole number, got {value}")
+    return int(value)
+
+def _bool(row, field, default=False):
+    value = _get(row, field, default, required=False)
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ('y', 'yes', 'true', '1'):
+        return True
+    if text in ('n', 'no', 'false', '0'):
+        return False
+    raise ClientInputError(field, f"expected yes/no, got {value!r}")
+
+def _date(row, field):
+    value = _get(row, field)
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(str(value).strip(), date_format).date()
+        except ValueError:
+            continue
+    raise ClientInputError(field, f"expected a date (YYYY-MM-DD or MMDDYY), got {value!r}")
+
+# Match a label against a vocabulary, ignoring case and any " - description" suffix used by the app
+def _choice(row, field, choices, default=None):
+    value = str(_get(row, field, default)).strip()
+    for candidate in (value, value.split(' - ')[0].strip()):
+        for choice in choices:
+            if candidate.lower() == choice.lower():
+                return choice
+    raise ClientInputError(field, f"{value!r} is not one of {', '.join(choices)}")
+
+# Validate one raw record (e.g. a CSV row of strings) and return the model inputs plus report fields
+def normalize_client(row):
+    client = {
+        'first_name': str(row.get('first_name') or '').strip(),
+        'last_name': str(row.get('last_name') or '').strip(),
+        'client_id': str(row.get('client_id') or '').strip(),
+        'current_weight': _float(row, 'current_weight', minimum=50, maximum=1000),
+        'current_bf': _float(row, 'current_bf', minimum=1, maximum=75),
+        'goal_weight': _float(row, 'goal_weight', minimum=50, maximum=1000),
+        'goal_bf': _float(row, 'goal_bf', minimum=1, maximum=75),
+        'start_date': _date(row, 'start_date'),
+        'end_date': _date(row, 'end_date'),
+        'dob': _date(row, 'dob'),
+        'gender': _choice(row, 'gender', ['m', 'f']),
+        'is_athlete': _bool(row, 'is_athlete'),
+        'resistance_training': _bool(row, 'resistance_training'),
+        'daily_protein_intake': _float(row, 'daily_protein_intake', minimum=0, maximum=600),
+        'workout_type': _choice(row, 'workout_type', WORKOUT_TYPES),
+        'workout_days': _int(row, 'workout_days', minimum=0, maximum=7),
+        'job_activity': _choice(row, 'job_activity', ACTIVITY_LEVELS),
+        'leisure_activity': _choice(row, 'leisure_activity', ACTIVITY_LEVELS),
+        'experience_level': _choice(row, 'experience_level', EXPERIENCE_LEVELS),
+        'rmr_equation': _choice(row, 'rmr_equation', list(RMR_EQUATIONS), default=DEFAULT_RMR_EQUATION)
+    }
+    if client['end_date'] <= client['start_date']:
+        raise ClientInputError('end_date', "must be after start_date")
+    if (client['end_date'] - client['start_date']).days // 7 > MAX_HORIZON_WEEKS:
+        raise ClientInputError('end_date', f"plans are limited to {MAX_HORIZON_WEEKS} weeks after start_date")
+
+    if not _missing(row.get('height_cm')):
+        client['height_cm'] = _float(row, 'height_cm', minimum=90, maximum=250)
+        total_inches = client['height_cm'] / 2.54
+        client['height_feet'], client['height_inches'] = int(total_inches // 12), int(round(total_inches % 12))
+    else:
+        client['height_feet'] = _int(row, 'height_feet', minimum=3, maximum=8)
+        client['height_inches'] = _int(row, 'height_inches', default=0, minimum=0, maximum=11)
+        client['height_cm'] = (client['height_feet'] * 12 + client['height_inches']) * 2.54
+
+    level = _get(row, 'activity_level')
+    if str(level).strip().isdigit():
+        client['activity_level'] = _int(row, 'activity_level', minimum=1, maximum=5)
+    else:
+        client['activity_level'] = ACTIVITY_LEVEL_DESCRIPTIONS.index(_choice(row, 'activity_level', ACTIVITY_LEVEL_DESCRIPTIONS)) + 1
+    client['activity_level_description'] = ACTIVITY_LEVEL_DESCRIPTIONS[client['activity_level'] - 1]
+
+    client['volume_score'], client['intensity_score'], client['frequency_score'] = calculate_lean_mass_preservation_scores(client['workout_days'], client['workout_type'])
+    client['is_bodybuilder'] = client['workout_type'] == "Bodybuilding" and client['experience_level'] in BODYBUILDER_EXPERIENCE_LEVELS
+    return client
+
+# Positional arguments for predict_weight_loss and friends
+def model_args(client):
+    return [client[name] for name in MODEL_ARGUMENTS]
+
+# Keyword options for predict_weight_loss and friends that are not positional arguments
+def model_options(client):
+    return {'rmr_equation': client.get('rmr_equation', DEFAULT_RMR_EQUATION)}
+
+# Column-per-argument layout for predict_weight_loss_batch, including each client's RMR equation
+def model_columns(clients):
+    columns = {name: [client[name] for client in clients] for name in MODEL_ARGUMENTS}
+    columns['rmr_equation'] = [client.get('rmr_equation', DEFAULT_RMR_EQUATION) for client in clients]
+    return columns
+
+# Display name used for report files
+def client_label(client, index=None):
+    name = f"{client['first_name']} {client['last_name']}".strip()
+    if name:
+        return name
+    if client['client_id']:
+        return client['client_id']
+    return f"client_{index}" if index is not None else "client"
+
+# Yield the elements of a top-level JSON array one at a time, reading the file in blocks
+# so a large .json roster is never held in memory whole
+def _iter_json_array(roster, block_size=1 << 16):
+    decoder = json.JSONDecoder()
+    buffer, position, exhausted = '', 0, False
+
+    # Next non-whitespace character, reading more of the file as needed ('' at the end of the file)
+    def next_char():
+        nonlocal buffer, position, exhausted
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position < len(buffer) or exhausted:
+                return buffer[position:position + 1]
+            buffer, position = roster.read(block_size), 0
+            exhausted = not buffer
+
+    if next_char() != '[':
+        raise ValueError("A .json roster must hold a JSON array of records")
+    position += 1
+    if next_char() == ']':
+        return
+    while True:
+        next_char()  # raw_decode does not skip leading whitespace
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+            complete = end < len(buffer) or exhausted  # a value ending at the buffer's edge may continue
+        except json.JSONDecodeError:
+            if exhausted:
+                raise
+            complete = False
+        if not complete:
+            block = roster.read(block_size)
+            buffer, position, exhausted = buffer[position:] + block, 0, not block
+            continue
+        yield record
+        position = end
+        separator = next_char()
+        if separator == ']':
+            return
+        if separator != ',':
+            raise ValueError(f"Malformed .json roster: expected ',' or ']' after a record, got {separator!r}")
+        position += 1
+
+# Stream raw records from a CSV, JSON Lines or JSON array roster file
+def iter_roster_rows(path):
+    if path.endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as roster:
+            yield from csv.DictReader(roster)
+    elif path.endswith('.jsonl'):
+        with open(path, encoding='utf-8') as roster:
+            for line in roster:
+                if line.strip():
+                    yield json.loads(line)
+    elif path.endswith('.json'):
+        with open(path, encoding='utf-8') as roster:
+            yield from _iter_json_array(roster)
+    else:
+        raise ValueError(f"Unsupported roster format: {path} (expected .csv, .jsonl or .json)")
@@ -0,0 +1,98 @@
+#daily.py (Daily-resolution view of the weekly forecast: day-level calorie targets and mass changes)
+import datetime
+
+import numpy as np
+
+from client_inputs import MODEL_ARGUMENTS, model_options
+from energy_equations import DEFAULT_RMR_EQUATION
+from weight_loss_model import PROGRESSION_FIELDS, _iter_weight_loss_rows
+
+DAILY_FIELDS = ['weight', 'body_fat_percentage', 'lean_mass', 'fat_mass', 'daily_calorie_intake', 'tdee', 'daily_deficit', 'weight_change']
+
+_FIELD_INDEX = {field: index for index, field in enumerate(PROGRESSION_FIELDS)}
+
+# Daily rows for the same forecast as predict_weight_loss. The model still steps once per week; each
+# week's intake and adapted TDEE hold for its seven days, and its lean and fat mass changes are spread
+# evenly over them, so every seventh day equals the weekly row exactly. The days left over after the last
+# full week (which predict_weight_loss drops) are filled from the model's next week, pro rata.
+# Returns 1-D arrays: 'day', 'date', 'week' (the weekly step a day belongs to; day 0 is the start) and DAILY_FIELDS.
+# rmr_equation is as for predict_weight_loss.
+def predict_weight_loss_daily(current_weight, current_bf, goal_weight, goal_bf, start_date, end_date, dob, gender, activity_level, height_cm, is_athlete, resistance_training, daily_protein_intake, volume_score, intensity_score, frequency_score, job_activity, leisure_activity, experience_level, is_bodybuilder, rmr_equation=DEFAULT_RMR_EQUATION):
+    args = [current_weight, current_bf, goal_weight, goal_bf, start_date, end_date, dob, gender, activity_level, height_cm, is_athlete, resistance_training, daily_protein_intake, volume_score, intensity_score, frequency_score, job_activity, leisure_activity, experience_level, is_bodybuilder]
+    rows = list(_iter_weight_loss_rows(*args, rmr_equation=rmr_equation))
+    weeks = (end_date - start_date).days // 7
+    extra_days = (end_date - start_date).days % 7
+    if extra_days and len(rows) == weeks + 1:
+        last = rows[-1]
+        inputs = dict(zip(MODEL_ARGUMENTS, args), current_weight=last[_FIELD_INDEX['weight']], current_bf=last[_FIELD_INDEX['body_fat_percentage']], end_date=start_date + datetime.timedelta(weeks=weeks + 1))
+        if weeks:
+            tail = list(_iter_weight_loss_rows(*(inputs[name] for name in MODEL_ARGUMENTS), resume_week=weeks, initial_weight=current_weight, rmr_equation=rmr_equation))
+        else:  # under a week: resume_week=0 means a fresh run, so take week 1 of one from the start
+            tail = list(_iter_weight_loss_rows(*(inputs[name] for name in MODEL_ARGUMENTS), rmr_equation=rmr_equation))[1:]
+        rows.extend(tail)
+        if not tail:  # the goal was met in the last full week, so there is nothing to extend
+            extra_days = 0
+    else:
+        extra_days = 0
+    return _expand_weekly_rows(start_date, np.array(rows, dtype=float).reshape(-1, len(PROGRESSION_FIELDS)), extra_days)
+
+# Same as predict_weight_loss_daily for a normalized client (see client_inputs.normalize_client)
+def predict_client_daily(client):
+    return predict_weight_loss_daily(*(client[name] for name in MODEL_ARGUMENTS), **model_options(client))
+
+# Spread weekly rows (PROGRESSION_FIELDS order) over days, all weeks at once
+def _expand_weekly_rows(start_date, rows, extra_days=0):
+    num_weeks = len(rows) - 1
+    total_days = 7 * num_weeks - (7 - extra_days if extra_days else 0)
+    day = np.arange(total_days + 1)
+    week = (day + 6) // 7
+    fraction = (day - 7 * (week - 1)) / 7
+    fraction[0] = 0.0
+    previous = np.maximum(week - 1, 0)
+
+    def column(field):
+        return rows[:, _FIELD_INDEX[field]]
+
+    lean_mass = column('lean_mass')[previous] + (column('lean_mass')[week] - column('lean_mass')[previous]) * fraction
+    fat_mass = column('fat_mass')[previous] + (column('fat_mass')[week] - column('fat_mass')[previous]) * fraction
+    weight = lean_mass + fat_mass
+    body_fat_percentage = fat_mass / weight * 100
+
+    # Week-end days take the weekly values as they are, so weekly roll-ups match the weekly forecast exactly
+    week_end = day[day % 7 == 0]
+    for values, field in ((lean_mass, 'lean_mass'), (fat_mass, 'fat_mass'), (weight, 'weight'), (body_fat_percentage, 'body_fat_percentage')):
+        values[week_end] = column(field)[week_end // 7]
+
+    daily = {
+        'day': day,
+        'date': np.datetime64(start_date.date() if isinstance(start_date, datetime.datetime) else start_date, 'D') + day,
+        'week': week,
+        'weight': weight,
+        'body_fat_percentage': body_fat_percentage,
+        'lean_mass': lean_mass,
+        'fat_mass': fat_mass,
+        'daily_calorie_intake': column('daily_calorie_intake')[week],
+        'tdee': column('tdee')[week]
+    }
+    daily['daily_deficit'] = daily['tdee'] - daily['daily_calorie_intake']
+    daily['daily_deficit'][0] = 0.0
+    daily['weight_change'] = np.diff(weight, prepend=weight[0])
+    return daily
+
+# Roll daily rows back up to full weeks: end-of-week weight, BF%, lean and fat mass, the week's intake and
+# adapted TDEE, and weekly_caloric_output as the sum of the week's daily deficits. Row 0 is the start.
+def weekly_rollup(daily):
+    full_weeks = int(daily['day'][-1]) // 7
+    week_end = np.arange(full_weeks + 1) * 7
+    deficits = daily['daily_deficit'][1:7 * full_weeks + 1].reshape(full_weeks, 7).sum(axis=1)
+    return {
+        'week': np.arange(full_weeks + 1),
+        'date': daily['date'][week_end],
+        'weight': daily['weight'][week_end],
+        'body_fat_percentage': daily['body_fat_percentage'][week_end],
+        'lean_mass': daily['lean_mass'][week_end],
+        'fat_mass': daily['fat_mass'][week_end],
+        'daily_calorie_intake': daily['daily_calorie_intake'][week_end],
+        'tdee': daily['tdee'][week_end],
+        'weekly_caloric_output': np.concatenate([[0.0], deficits])
+    }
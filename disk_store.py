@@ -0,0 +1,141 @@
+#disk_store.py (File-backed content-addressed result store shared by every server process on a host)
+import io
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from weight_loss_model import MODEL_VERSION
+from progression import Progression
+
+try:
+    import fcntl
+except ImportError:  # Windows: eviction passes are not serialized across processes
+    fcntl = None
+
+# Blobs live at <root>/v<model_version>/<key[:2]>/<key>. Writes go to a temp file in the same
+# directory and are renamed into place, so readers see either nothing or a complete blob.
+# Reads refresh the file's mtime, and eviction removes the least recently used blobs (any
+# model version) once the total size passes max_bytes.
+class DiskStore:
+    def __init__(self, root, max_bytes=1024 * 1024 * 1024, model_version=MODEL_VERSION):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.directory = os.path.join(root, f"v{model_version}")
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._written_since_scan = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as blob:
+                data = blob.read()
+        except FileNotFoundError:  # never written, or evicted by another process
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(path)  # mark as recently used for eviction
+        except FileNotFoundError:  # evicted after the read; the bytes are still good
+            pass
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key, data):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(descriptor, 'wb') as blob:
+                blob.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        with self._lock:
+            self.writes += 1
+            self._written_since_scan += len(data)
+            scan = self._written_since_scan >= self.max_bytes // 8
+            if scan:
+                self._written_since_scan = 0
+        if scan:
+            self.evict()
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def _blobs(self):
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.startswith('.'):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    status = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield status.st_mtime, status.st_size, path
+
+    # Delete least recently used blobs until the store is under 90% of max_bytes; one process at a time
+    def evict(self):
+        with open(os.path.join(self.root, '.evict.lock'), 'w') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            blobs = sorted(self._blobs())
+            total = sum(size for _, size, _ in blobs)
+            removed = 0
+            for _, size, path in blobs:
+                if total <= self.max_bytes * 0.9:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+        with self._lock:
+            self.evictions += removed
+        return removed
+
+    def size(self):
+        return sum(size for _, size, _ in self._blobs())
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'writes': self.writes,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+# Progression <-> bytes as an .npz of its columns plus the start date (no pickling)
+def dump_progression(progression):
+    buffer = io.BytesIO()
+    np.savez(buffer, start_date=progression.start_date, **progression.columns)
+    return buffer.getvalue()
+
+def load_progression(data):
+    with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+        columns = {name: archive[name] for name in archive.files if name != 'start_date'}
+        return Progression(archive['start_date'].item(), columns)
+
+# Store configured from GRIMORE_STORE_DIR (and optional GRIMORE_STORE_MAX_BYTES), or None when unset
+def store_from_env(environ=os.environ):
+    root = environ.get('GRIMORE_STORE_DIR')
+    if not root:
+        return None
+    return DiskStore(root, int(environ.get('GRIMORE_STORE_MAX_BYTES', 1024 * 1024 * 1024)))
@@ -0,0 +1,92 @@
+#energy_equations.py (Registry of resting metabolic rate equations, each with a scalar and a NumPy-vectorized form)
+# Standard library only at import time; the vectorized forms import NumPy when first called.
+KG_PER_LB = 0.45359237
+
+DEFAULT_RMR_EQUATION = 'mifflin_st_jeor_legacy'
+
+# One RMR equation. `rmr(weight, body_fat, age, gender, height_cm, is_athlete)` takes one client's values
+# (weight in lbs, gender 'm'/'f'); `rmr_vec(weight, body_fat, age, is_male, height_cm, is_athlete)` takes
+# NumPy arrays and must return the same numbers element for element.
+class RmrEquation:
+    __slots__ = ('name', 'description', 'rmr', 'rmr_vec', 'uses_body_fat')
+
+    def __init__(self, name, description, rmr, rmr_vec, uses_body_fat=False):
+        self.name = name
+        self.description = description
+        self.rmr = rmr
+        self.rmr_vec = rmr_vec
+        self.uses_body_fat = uses_body_fat
+
+    def __repr__(self):
+        return f"RmrEquation({self.name!r})"
+
+RMR_EQUATIONS = {}
+
+# Add (or replace) an equation; its name is what clients select with 'rmr_equation'
+def register_rmr_equation(name, description, rmr, rmr_vec, uses_body_fat=False):
+    RMR_EQUATIONS[name] = RmrEquation(name, description, rmr, rmr_vec, uses_body_fat)
+    return RMR_EQUATIONS[name]
+
+def get_rmr_equation(name):
+    try:
+        return RMR_EQUATIONS[name]
+    except KeyError:
+        raise ValueError(f"Unknown RMR equation {name!r}; choose from {', '.join(RMR_EQUATIONS)}.") from None
+
+# Mifflin-St Jeor as the model has always applied it: the lbs weight goes into the kg weight term, which
+# gives about 2.2x the weight term of the published equation. It stays the default so forecasts that
+# do not pick an equation are unchanged. Athletes get a 10% uplift. This is the one implementation of the
+# formula; weight_loss_model's calculate_rmr and ClientProfile call it.
+def mifflin_st_jeor_legacy(weight, body_fat, age, gender, height_cm, is_athlete):
+    if gender == 'm':
+        rmr = 10 * weight + 6.25 * height_cm - 5 * age + 5
+    else:
+        rmr = 10 * weight + 6.25 * height_cm - 5 * age - 161
+    return rmr * 1.1 if is_athlete else rmr
+
+def mifflin_st_jeor_legacy_vec(weight, body_fat, age, is_male, height_cm, is_athlete):
+    import numpy as np
+    rmr = np.where(is_male, 10 * weight + 6.25 * height_cm - 5 * age + 5, 10 * weight + 6.25 * height_cm - 5 * age - 161)
+    return np.where(is_athlete, rmr * 1.1, rmr)
+
+# Mifflin-St Jeor as published, weight converted to kg like the other equations. Same athlete uplift.
+def mifflin_st_jeor(weight, body_fat, age, gender, height_cm, is_athlete):
+    return mifflin_st_jeor_legacy(weight * KG_PER_LB, body_fat, age, gender, height_cm, is_athlete)
+
+def mifflin_st_jeor_vec(weight, body_fat, age, is_male, height_cm, is_athlete):
+    return mifflin_st_jeor_legacy_vec(weight * KG_PER_LB, body_fat, age, is_male, height_cm, is_athlete)
+
+# Revised Harris-Benedict (Roza & Shizgal, 1984), weight converted to kg. Athletes get the same 10% uplift.
+def harris_benedict(weight, body_fat, age, gender, height_cm, is_athlete):
+    weight_kg = weight * KG_PER_LB
+    if gender == 'm':
+        rmr = 88.362 + 13.397 * weight_kg + 4.799 * height_cm - 5.677 * age
+    else:
+        rmr = 447.593 + 9.247 * weight_kg + 3.098 * height_cm - 4.330 * age
+    return rmr * 1.1 if is_athlete else rmr
+
+def harris_benedict_vec(weight, body_fat, age, is_male, height_cm, is_athlete):
+    import numpy as np
+    weight_kg = weight * KG_PER_LB
+    rmr = np.where(is_male, 88.362 + 13.397 * weight_kg + 4.799 * height_cm - 5.677 * age, 447.593 + 9.247 * weight_kg + 3.098 * height_cm - 4.330 * age)
+    return np.where(is_athlete, rmr * 1.1, rmr)
+
+# Katch-McArdle, from lean body mass in kg. Lean mass already reflects an athlete's build, so no uplift.
+def katch_mcardle(weight, body_fat, age, gender, height_cm, is_athlete):
+    return 370 + 21.6 * (weight * (1 - body_fat / 100) * KG_PER_LB)
+
+def katch_mcardle_vec(weight, body_fat, age, is_male, height_cm, is_athlete):
+    return 370 + 21.6 * (weight * (1 - body_fat / 100) * KG_PER_LB)
+
+# Cunningham (1991), from lean body mass in kg; suits lean, trained clients. No athlete uplift.
+def cunningham(weight, body_fat, age, gender, height_cm, is_athlete):
+    return 500 + 22 * (weight * (1 - body_fat / 100) * KG_PER_LB)
+
+def cunningham_vec(weight, body_fat, age, is_male, height_cm, is_athlete):
+    return 500 + 22 * (weight * (1 - body_fat / 100) * KG_PER_LB)
+
+register_rmr_equation('mifflin_st_jeor_legacy', "Mifflin-St Jeor on weight in lbs, as the model has always run it (default)", mifflin_st_jeor_legacy, mifflin_st_jeor_legacy_vec)
+register_rmr_equation('mifflin_st_jeor', "Mifflin-St Jeor (weight in kg, height, age, sex)", mifflin_st_jeor, mifflin_st_jeor_vec)
+register_rmr_equation('harris_benedict', "Revised Harris-Benedict (weight, height, age, sex)", harris_benedict, harris_benedict_vec)
+register_rmr_equation('katch_mcardle', "Katch-McArdle (lean body mass from BF%)", katch_mcardle, katch_mcardle_vec, uses_body_fat=True)
+register_rmr_equation('cunningham', "Cunningham (lean body mass from BF%)", cunningham, cunningham_vec, uses_body_fat=True)
@@ -0,0 +1,55 @@
+#goal_solver.py (Find the shortest plan that reaches goal_bf without hitting the calorie floor)
+import datetime
+
+import numpy as np
+
+from client_inputs import model_args, model_options
+from weight_loss_model import predict_weight_loss_columns
+
+# True when any week's intake was clamped to the min_calories floor used by predict_weight_loss
+def hits_calorie_floor(progression):
+    intake = progression['daily_calorie_intake'][1:]
+    floor = np.maximum(progression['tdee'][1:] / 3, 1000)
+    return bool((intake <= floor).any())
+
+# A plan is feasible when it ends within bf_tolerance of goal_bf and never needed the calorie floor
+def is_feasible(progression, goal_bf, bf_tolerance=0.5):
+    return progression['body_fat_percentage'][-1] <= goal_bf + bf_tolerance and not hits_calorie_floor(progression)
+
+# Search whole-week horizons for the earliest feasible end date.
+# Every week's target deficit depends on the horizon through remaining_weeks, so plans of
+# different lengths share no simulated prefix; the search instead never simulates a horizon
+# twice and returns the memoized winning progression. Galloping (1, 2, 4, ... weeks) brackets
+# the answer and bisection narrows it, assuming longer plans are never less feasible.
+def find_shortest_end_date(client, max_weeks=260, bf_tolerance=0.5):
+    start_date = client['start_date']
+    simulated = {}
+
+    def feasible(weeks):
+        if weeks not in simulated:
+            args = model_args(dict(client, end_date=start_date + datetime.timedelta(weeks=weeks)))
+            progression = predict_weight_loss_columns(*args, **model_options(client))
+            simulated[weeks] = (is_feasible(progression, client['goal_bf'], bf_tolerance), progression)
+        return simulated[weeks][0]
+
+    low, high = 0, 1
+    while not feasible(high):
+        if high >= max_weeks:
+            return {'feasible': False, 'end_date': None, 'weeks': None, 'progression': None, 'simulations': len(simulated)}
+        low, high = high, min(high * 2, max_weeks)
+
+    # Invariant: low is infeasible (or zero), high is feasible
+    while high - low > 1:
+        middle = (low + high) // 2
+        if feasible(middle):
+            high = middle
+        else:
+            low = middle
+
+    return {
+        'feasible': True,
+        'end_date': start_date + datetime.timedelta(weeks=high),
+        'weeks': high,
+        'progression': simulated[high][1],
+        'simulations': len(simulated)
+    }
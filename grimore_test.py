@@ -1,253 +1,19 @@
 #grimore_test.py (Original Code File for Weight Loss Predictor)
 import datetime
 import math
-from tabulate import tabulate
 import unittest
 import sys
 import io
 import logging
 
-# Function to calculate age from date of birth
-def calculate_age(dob, current_date):
-    return current_date.year - dob.year - ((current_date.month, current_date.day) < (dob.month, dob.day))
-
-# Function to calculate lean mass preservation scores based on workout frequency and type
-def calculate_lean_mass_preservation_scores(workout_days, workout_type):
-    workout_intensities = {
-        "Bodybuilding": 0.8,
-        "Cardio": 0.4,
-        "General Fitness": 0.6
-    }
-    workout_volumes = {
-        "Bodybuilding": 20,
-        "Cardio": 10,
-        "General Fitness": 15
-    }
-    if workout_type not in workout_intensities:
-        raise ValueError("Invalid workout type.")
-    volume_score = min(workout_volumes[workout_type] * workout_days / 7 / 20, 1)
-    intensity_score = workout_intensities[workout_type]
-    frequency_score = min(workout_days / 3, 1)
-    return volume_score, intensity_score, frequency_score
-
-# Estimate the thermic effect of food based on protein intake
-def estimate_tef(protein_intake):
-    return protein_intake * 0.3
-
-# Estimate NEAT (Non-Exercise Activity Thermogenesis) based on job and leisure activity levels
-def estimate_neat(job_activity, leisure_activity):
-    job_factors = {'sedentary': 100, 'light': 300, 'moderate': 500, 'active': 700}
-    leisure_factors = {'sedentary': 50, 'light': 150, 'moderate': 250, 'active': 350}
-    return job_factors[job_activity] + leisure_factors[leisure_activity]
-
-# Adjust body composition based on resistance training and protein intake
-def adjust_body_composition(fat_loss, lean_loss, resistance_training, protein_intake, weight):
-    if resistance_training:
-        lean_loss *= 0.8 # Optimize protein and lean retention
-    adjusted_fat_loss = fat_loss * 0.9
-    adjusted_lean_loss = lean_loss * 0.1
-    return adjusted_fat_loss, adjusted_lean_loss
-
-# Calculate resting metabolic rate (RMR) using the Mifflin-St Jeor equation
-def calculate_rmr(weight, age, gender, height_cm, is_athlete):
-    if gender == 'm':
-        rmr = 10 * weight + 6.25 * height_cm - 5 * age + 5
-    else:
-        rmr = 10 * weight + 6.25 * height_cm - 5 * age - 161
-    return rmr * 1.1 if is_athlete else rmr
-
-# Calculate total daily energy expenditure (TDEE) based on activity level
-def calculate_tdee(weight, age, gender, activity_level, height_cm, is_athlete, protein_intake, job_activity, leisure_activity):
-    rmr = calculate_rmr(weight, age, gender, height_cm, is_athlete)
-    activity_factors = [1.2, 1.375, 1.55, 1.725, 1.9]
-    tdee = rmr * activity_factors[activity_level - 1]
-    tdee += estimate_tef(protein_intake) # Add thermic effect of food
-    tdee += estimate_neat(job_activity, leisure_activity) # Add NEAT
-    return tdee
-
-# Calculate the amount of fat loss required to reach the goal body fat percentage
-def calculate_fat_loss_required(current_weight, current_bf, goal_bf):
-    current_fat_mass = current_weight * (current_bf / 100)
-    goal_fat_mass = current_weight * (goal_bf / 100)
-    fat_loss_required = current_fat_mass - goal_fat_mass
-    return fat_loss_required
-
-# Calculate metabolic adaptation
-def calculate_metabolic_adaptation(week, current_bf, is_bodybuilder):
-    # Base adaptation calculation
-    base_adaptation = max(0.85, 1 - (week / 300))
-
-    # Adjust adaptation based on current body fat percentage
-    bf_factor = max(0.9, 1 - (30 - current_bf) / 100)
-
-    # More aggressive adaptation for bodybuilders
-    if is_bodybuilder:
-        base_adaptation = max(0.80, 1 - (week / 200))
-
-    return base_adaptation * bf_factor
-
-# Function to adjust caloric output based on TDEE and daily calorie intake
-def calculate_weekly_caloric_output(tdee, daily_calorie_intake):
-    return (tdee - daily_calorie_intake) * 7
-
-# Distribute weight loss between fat and lean mass
-def distribute_weight_loss(weekly_weight_loss, current_bf, resistance_training, daily_protein_intake, current_weight, goal_bf, is_bodybuilder):
-    # Start with the base FFM rule: 75% fat loss, 25% lean mass loss
-    fat_loss_ratio = 0.75
-
-    # Adjust based on current body fat percentage
-    if current_bf > 30:
-        fat_loss_ratio += 0.05
-    elif current_bf < 15:
-        fat_loss_ratio -= 0.05
-
-    # Adjust for resistance training
-    if resistance_training:
-        fat_loss_ratio += 0.05
-
-    # Adjust for protein intake
-    protein_factor = min(daily_protein_intake / (current_weight * 0.8), 1)
-    fat_loss_ratio += protein_factor * 0.05
-
-    # More aggressive fat loss for bodybuilders
-    if is_bodybuilder:
-        fat_loss_ratio = min(fat_loss_ratio + 0.1, 0.95)
-    else:
-        fat_loss_ratio = min(fat_loss_ratio, 0.9)
-
-    fat_loss = weekly_weight_loss * fat_loss_ratio
-    lean_loss = weekly_weight_loss * (1 - fat_loss_ratio)
-
-    return fat_loss, lean_loss
-
-def calculate_initial_daily_calories(tdee, rmr):
-    # Set initial daily calorie intake to the lesser of 58% of RMR or 58% of adapted TDEE
-    return min(rmr * 0.58, tdee * 0.58)
-
-def estimate_muscle_gain(current_weight, training_frequency, training_volume, intensity, protein_intake, age, gender, experience_level, is_bodybuilder):
-    gain_rates = {
-        'Beginner (0-1 year)': 0.0125,
-        'Novice (1-2 years)': 0.0100,
-        'Intermediate (2-4 years)': 0.0075,
-        'Advanced (4-10 years)': 0.0050,
-        'Elite (10+ years)': 0.0025
-    }
-
-    base_rate = gain_rates.get(experience_level, 0.0075) # Default to intermediate if not specified
-
-    # Adjust rate based on age, gender, etc.
-    age_multiplier = 1.0 if age < 30 else (0.8 if age < 40 else 0.6)
-    gender_multiplier = 1.0 if gender == 'm' else 0.8
-    frequency_multiplier = min(training_frequency / 3, 1.25)
-    volume_intensity_multiplier = min((training_volume * intensity) / (10 * 0.7), 1.25)
-    protein_multiplier = min(protein_intake / (current_weight * 1.6), 1.25)
-
-    monthly_gain_percentage = base_rate * age_multiplier * gender_multiplier * frequency_multiplier * volume_intensity_multiplier * protein_multiplier
-
-    # Increase muscle gain for bodybuilders (simulating PED use)
-    if is_bodybuilder and experience_level in ['Intermediate (2-4 years)', 'Advanced (4-10 years)', 'Elite (10+ years)']:
-        monthly_gain_percentage *= 2.5
-
-    weekly_muscle_gain = (monthly_gain_percentage * current_weight) / 4
-
-    return weekly_muscle_gain
-
-def get_body_fat_info(gender, body_fat_percentage):
-    categories = [
-        {"name": "Very Lean", "men": 10, "women": 18, "time": "3-4 weeks", "description": "Visible abs, vascularity, striations"},
-        {"name": "Lean", "men": 14, "women": 22, "time": "2-3 months", "description": "Some muscle definition, less visible abs"},
-        {"name": "Average", "men": 19, "women": 27, "time": "3-4 months", "description": "Little muscle definition, soft look"},
-        {"name": "Above Average", "men": 24, "women": 32, "time": "4-6 months", "description": "No visible abs, excess fat"},
-        {"name": "High Body Fat", "men": 29, "women": 37, "time": "6-12 months", "description": "Excess fat all around, round physique"},
-        {"name": "Obese", "men": float('inf'), "women": float('inf'), "time": "12+ months", "description": "Significant excess fat all around"}
-    ]
-
-    threshold_key = "men" if gender.lower() == 'm' else "women"
-
-    for category in categories:
-        if body_fat_percentage < category[threshold_key]:
-            return category["name"], category["time"], category["description"]
-
-    return categories[-1]["name"], categories[-1]["time"], categories[-1]["description"]
-
-# Predict weight loss progression over time based on initial parameters
-def predict_weight_loss(current_weight, current_bf, goal_weight, goal_bf, start_date, end_date, dob, gender, activity_level, height_cm, is_athlete, resistance_training, daily_protein_intake, volume_score, intensity_score, frequency_score, job_activity, leisure_activity, experience_level, is_bodybuilder):
-    weeks = (end_date - start_date).days // 7
-    progression = []
-    initial_weight = current_weight
-    initial_bf = current_bf
-
-    # Add initial entry
-    age = calculate_age(dob, start_date)
-    rmr = calculate_rmr(current_weight, age, gender, height_cm, is_athlete)
-    tdee = calculate_tdee(current_weight, age, gender, activity_level, height_cm, is_athlete, daily_protein_intake, job_activity, leisure_activity)
-    initial_daily_calorie_intake = calculate_initial_daily_calories(tdee, rmr)
-    
-    progression.append({
-        'date': start_date.strftime("%m%d%y"),
-        'weight': current_weight,
-        'body_fat_percentage': current_bf,
-        'daily_calorie_intake': initial_daily_calorie_intake,
-        'tdee': tdee,
-        'weekly_caloric_output': 0,
-        'total_weight_lost': 0,
-        'lean_mass': current_weight * (1 - current_bf / 100),
-        'fat_mass': current_weight * (current_bf / 100),
-        'muscle_gain': 0,
-        'rmr': rmr
-    })
-
-    for week in range(1, weeks + 1):
-        age = calculate_age(dob, start_date + datetime.timedelta(weeks=week))
-        rmr = calculate_rmr(current_weight, age, gender, height_cm, is_athlete)
-        tdee = calculate_tdee(current_weight, age, gender, activity_level, height_cm, is_athlete, daily_protein_intake, job_activity, leisure_activity)
-        metabolic_adaptation = calculate_metabolic_adaptation(week, current_bf, is_bodybuilder)
-        adapted_tdee = tdee * metabolic_adaptation
-
-        remaining_weeks = max(1, weeks - week)
-        current_fat_mass = current_weight * (current_bf / 100)
-        current_lean_mass = current_weight - current_fat_mass
-        goal_fat_mass = (goal_bf / 100) * current_lean_mass / (1 - (goal_bf / 100))
-        remaining_fat_to_lose = max(current_fat_mass - goal_fat_mass, 0)
-        weekly_fat_loss_required = remaining_fat_to_lose / remaining_weeks
-        weekly_deficit_required = weekly_fat_loss_required * 3500
-        daily_deficit_required = weekly_deficit_required / 7
-        min_calories = max(adapted_tdee / 3, 1000)  # Ensure not below 1/3 of TDEE or 1000 calories
-        daily_calorie_intake = max(adapted_tdee - daily_deficit_required, min_calories)
-
-        weekly_caloric_output = calculate_weekly_caloric_output(adapted_tdee, daily_calorie_intake)
-        weekly_weight_loss = weekly_caloric_output / 3500
-        fat_loss, lean_loss = distribute_weight_loss(weekly_weight_loss, current_bf, resistance_training, daily_protein_intake, current_weight, goal_bf, is_bodybuilder)
-
-        if resistance_training:
-            muscle_gain = estimate_muscle_gain(current_weight, frequency_score * 3, volume_score * 20, intensity_score, daily_protein_intake, age, gender, experience_level, is_bodybuilder)
-        else:
-            muscle_gain = 0
-
-        current_fat_mass = max(0, current_weight * (current_bf / 100) - fat_loss)
-        current_lean_mass = max(current_weight * (1 - current_bf / 100) - lean_loss + muscle_gain, current_weight * 0.05)
-        current_weight = current_fat_mass + current_lean_mass
-        current_bf = (current_fat_mass / current_weight) * 100
-        total_weight_lost = initial_weight - current_weight
-
-        progression.append({
-            'date': (start_date + datetime.timedelta(weeks=week)).strftime("%m%d%y"),
-            'weight': current_weight,
-            'body_fat_percentage': current_bf,
-            'daily_calorie_intake': daily_calorie_intake,
-            'tdee': adapted_tdee,
-            'weekly_caloric_output': weekly_caloric_output,
-            'total_weight_lost': total_weight_lost,
-            'lean_mass': current_lean_mass,
-            'fat_mass': current_fat_mass,
-            'muscle_gain': muscle_gain,
-            'rmr': rmr
-        })
-
-        if current_bf <= goal_bf and current_weight <= goal_weight:
-            break
-
-    return progression
+# The model lives in weight_loss_model.py; re-exported so existing `from grimore_test import ...` callers keep working
+from weight_loss_model import (
+    MODEL_VERSION, PROGRESSION_FIELDS, calculate_age, calculate_lean_mass_preservation_scores, estimate_tef,
+    estimate_neat, adjust_body_composition, calculate_rmr, calculate_tdee, calculate_fat_loss_required,
+    calculate_metabolic_adaptation, calculate_weekly_caloric_output, distribute_weight_loss,
+    calculate_initial_daily_calories, estimate_muscle_gain, get_body_fat_info, ClientProfile, _iter_weight_loss_rows,
+    iter_weight_loss, predict_weight_loss, predict_weight_loss_columns, predict_weight_loss_adaptive
+)
 
 def get_float_input(prompt):
     while True:
@@ -286,6 +52,7 @@ def get_experience_level_input(prompt):
 
 # Function to generate a comprehensive report
 def generate_comprehensive_report(progression, initial_data):
+    from tabulate import tabulate
     initial_entry = progression[0]
     final_entry = progression[-1]
     total_weeks = len(progression) - 1
@@ -575,6 +342,866 @@ class TestWeightLossPredictor(unittest.TestCase):
         for entry in progression:
             self.assertGreaterEqual(entry['daily_calorie_intake'], 1000)
 
+    def test_client_profile_matches_reference_functions(self):
+        dob = datetime.date(1988, 2, 29)
+        profile = ClientProfile(self.start_date, dob, 'f', self.activity_level, self.height_cm, True, self.protein_intake, self.volume_score, self.intensity_score, self.frequency_score, self.job_activity, self.leisure_activity, self.experience_level, self.is_bodybuilder)
+        for week in range(0, 600, 3):
+            age = profile.age_at_week(week)
+            self.assertEqual(age, calculate_age(dob, self.start_date + datetime.timedelta(weeks=week)))
+            weight = self.current_weight - week / 10
+            self.assertEqual(profile.rmr(weight, age), calculate_rmr(weight, age, 'f', self.height_cm, True))
+            self.assertEqual(profile.tdee(profile.rmr(weight, age)), calculate_tdee(weight, age, 'f', self.activity_level, self.height_cm, True, self.protein_intake, self.job_activity, self.leisure_activity))
+            self.assertEqual(profile.muscle_gain(weight, age), estimate_muscle_gain(weight, self.frequency_score * 3, self.volume_score * 20, self.intensity_score, self.protein_intake, age, 'f', self.experience_level, self.is_bodybuilder))
+
+# Function to execute tests for the column-oriented progression
+class TestProgressionColumns(unittest.TestCase):
+    def setUp(self):
+        self.args = [240, 30, 217, 7, datetime.datetime(2023, 1, 1), datetime.datetime(2024, 6, 1), datetime.datetime(1990, 1, 1), 'm', 3, 180, False, True, 150, 0.5, 0.6, 0.7, "sedentary", "light", "Intermediate (2-4 years)", True]
+
+    def test_rows_match_records(self):
+        from progression import Progression
+        records = predict_weight_loss(*self.args)
+        progression = predict_weight_loss_columns(*self.args)
+        self.assertEqual(len(progression), len(records))
+        self.assertEqual(list(progression), records)
+        self.assertEqual(progression[-1], records[-1])
+        self.assertEqual(Progression.from_records(records)[5], records[5])
+
+    def test_slices_match_record_slices(self):
+        records = predict_weight_loss(*self.args)
+        progression = predict_weight_loss_columns(*self.args)
+        for key in (slice(1, None), slice(None, 3), slice(-4, -1), slice(None, None, 5), slice(None, None, -7), slice(len(records), None)):
+            self.assertEqual(progression[key], records[key])
+
+    def test_dataframe_shares_column_memory(self):
+        import numpy as np
+        progression = predict_weight_loss_columns(*self.args)
+        df = progression.to_dataframe()
+        self.assertEqual(list(df.columns), list(predict_weight_loss(*self.args)[0].keys()))
+        self.assertTrue(np.shares_memory(df['weight'].to_numpy(), progression['weight']))
+        self.assertEqual(df['date'].iloc[1].strftime("%m%d%y"), progression[1]['date'])
+
+# Function to execute tests for the vectorized batch engine
+class TestBatchEngine(unittest.TestCase):
+    def setUp(self):
+        self.clients = [
+            [240, 30, 217, 7, datetime.datetime(2023, 1, 1), datetime.datetime(2023, 4, 1), datetime.datetime(1990, 1, 1), 'm', 3, 180, False, True, 150, 0.5, 0.6, 0.7, "sedentary", "light", "Intermediate (2-4 years)", True],
+            [165, 34, 140, 25, datetime.date(2024, 2, 26), datetime.date(2025, 6, 1), datetime.date(1984, 2, 29), 'f', 1, 162, False, False, 90, 0.3, 0.4, 1.0, "light", "sedentary", "Beginner (0-1 year)", False],
+            [200, 18, 300, 20, datetime.date(2024, 5, 1), datetime.date(2024, 9, 1), datetime.date(2000, 5, 3), 'm', 5, 185, True, True, 220, 1.0, 0.8, 1.0, "active", "moderate", "Elite (10+ Years)", False],
+        ]
+
+    def test_matches_scalar_predictions(self):
+        from batch_engine import predict_weight_loss_batch, batch_client_progression
+        columns = [list(values) for values in zip(*self.clients)]
+        result = predict_weight_loss_batch(*columns)
+        for index, client in enumerate(self.clients):
+            expected = predict_weight_loss(*client)
+            actual = batch_client_progression(result, index)
+            self.assertEqual(len(actual), len(expected), f"Client {index} stopped at a different week")
+            for week, (expected_entry, actual_entry) in enumerate(zip(expected, actual)):
+                self.assertEqual(actual_entry['date'], expected_entry['date'])
+                for key, value in expected_entry.items():
+                    if key != 'date':
+                        self.assertAlmostEqual(actual_entry[key], value, places=6, msg=f"{key} differs for client {index} in week {week}")
+
+    def test_early_termination_pads_with_nan(self):
+        from batch_engine import predict_weight_loss_batch
+        columns = [list(values) for values in zip(*self.clients)]
+        result = predict_weight_loss_batch(*columns)
+        # The third client starts below goal_bf and goal_weight, so it stops after week 1
+        self.assertEqual(result['num_weeks'][2], 1)
+        self.assertTrue(all(math.isnan(value) for value in result['weight'][2, 2:]))
+
+    def test_pads_with_nan_when_every_client_stops_early(self):
+        from batch_engine import predict_weight_loss_batch
+        # Both clients start at goal and stop after week 1 of a 17-week horizon
+        columns = [list(values) for values in zip(self.clients[2], self.clients[2])]
+        result = predict_weight_loss_batch(*columns)
+        self.assertEqual(list(result['num_weeks']), [1, 1])
+        for field in PROGRESSION_FIELDS:
+            self.assertEqual(result[field].shape[1], 18)
+            self.assertTrue(all(math.isnan(value) for value in result[field][:, 2:].ravel()), field)
+
+# Function to execute tests for the forecast result cache
+class TestResultCache(unittest.TestCase):
+    def test_key_ignores_equivalent_representations(self):
+        from result_cache import make_cache_key
+        first = make_cache_key({'current_weight': 200, 'start_date': datetime.date(2024, 1, 1), 'gender': 'M'})
+        second = make_cache_key({'gender': 'M ', 'start_date': datetime.datetime(2024, 1, 1), 'current_weight': 200.0})
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, make_cache_key({'current_weight': 200.5, 'start_date': datetime.date(2024, 1, 1), 'gender': 'M'}))
+
+    def test_lru_eviction_and_counters(self):
+        from result_cache import ResultCache
+        cache = ResultCache(max_entries=2)
+        cache.put('a', {'pdf_bytes': b'1'})
+        cache.put('b', {'pdf_bytes': b'2'})
+        self.assertIsNotNone(cache.get('a'))
+        cache.put('c', {'pdf_bytes': b'3'})
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_memory_cap(self):
+        from result_cache import ResultCache
+        cache = ResultCache(max_entries=10, max_bytes=5000)
+        cache.put('a', {'pdf_bytes': b'x' * 3000})
+        cache.put('b', {'pdf_bytes': b'x' * 3000})
+        self.assertNotIn('a', cache)
+        self.assertLessEqual(cache.stats()['bytes'], 5000)
+        self.assertFalse(cache.put('c', {'pdf_bytes': b'x' * 6000}))
+
+    # The shared cache outlives sessions and its PDF entries are keyed on the forecast alone, which is safe
+    # because the rendered report never contains the client's name
+    def test_cached_pdf_is_the_same_for_any_client_name(self):
+        from reportlab import rl_config
+        from report import generate_pdf
+        from result_cache import ResultCache
+        progression = predict_weight_loss_columns(240, 30, 217, 7, datetime.date(2023, 1, 1), datetime.date(2023, 4, 1), datetime.date(1990, 1, 1), 'm', 3, 180, False, True, 150, 0.5, 0.6, 0.7, "sedentary", "light", "Intermediate (2-4 years)", True)
+        sections = ['personal_profile', 'metabolic_calculations', 'workout_analysis', 'body_composition', 'metabolic_adaptation', 'final_results', 'body_fat_category']
+        report_data = dict({section: {'Key': 'Value'} for section in sections}, insights_recommendations=['Insight'], next_steps=['Step'])
+        invariant = rl_config.invariant
+        rl_config.invariant = 1  # fixed creation date and document ID, so renders can be compared byte for byte
+        try:
+            cache = ResultCache()
+            cache.put('forecast', {'pdf_bytes': generate_pdf(progression, report_data, 'm', 'Alice Smith')})
+            other_client = generate_pdf(progression, report_data, 'm', 'Bob Jones')
+        finally:
+            rl_config.invariant = invariant
+        self.assertEqual(cache.get('forecast')['pdf_bytes'], other_client)
+
+# Function to execute tests for the PDF report template
+class TestReportTemplate(unittest.TestCase):
+    def test_generate_pdf_reuses_shared_styles(self):
+        import report_template
+        from report import generate_pdf
+        progression = predict_weight_loss_columns(240, 30, 217, 7, datetime.date(2023, 1, 1), datetime.date(2023, 4, 1), datetime.date(1990, 1, 1), 'm', 3, 180, False, True, 150, 0.5, 0.6, 0.7, "sedentary", "light", "Intermediate (2-4 years)", True)
+        sections = ['personal_profile', 'metabolic_calculations', 'workout_analysis', 'body_composition', 'metabolic_adaptation', 'final_results', 'body_fat_category']
+        report_data = {section: {'Key': 'Value'} for section in sections}
+        report_data['insights_recommendations'] = ['Insight']
+        report_data['next_steps'] = ['Step']
+        commands = list(report_template.KEY_VALUE_TABLE_STYLE.getCommands())
+        for _ in range(2):
+            self.assertTrue(generate_pdf(progression, report_data, 'm', 'Test Client').startswith(b'%PDF'))
+        self.assertEqual(list(report_template.KEY_VALUE_TABLE_STYLE.getCommands()), commands)
+        self.assertEqual(len([name for name in report_template.STYLES if name == 'Justify']), 1)
+
+# Function to execute tests for roster record normalization and bulk PDF export
+class TestClientInputs(unittest.TestCase):
+    def setUp(self):
+        self.row = {
+            'first_name': 'Ann', 'last_name': 'Lee', 'current_weight': '240', 'current_bf': '30', 'goal_weight': '217', 'goal_bf': '12',
+            'start_date': '2024-01-01', 'end_date': '040124', 'dob': '1990-01-01', 'gender': 'M', 'height_feet': '5', 'height_inches': '11',
+            'activity_level': 'Moderate Exercise/Sports 3-5 Days/Week', 'is_athlete': 'N', 'resistance_training': 'yes', 'daily_protein_intake': '150',
+            'workout_type': 'Bodybuilding - Focused on muscle building and strength training', 'workout_days': '4',
+            'job_activity': 'Sedentary', 'leisure_activity': 'light', 'experience_level': 'Intermediate (2-4 Years)'
+        }
+
+    def test_normalizes_to_model_vocabulary(self):
+        from client_inputs import normalize_client, model_args
+        client = normalize_client(self.row)
+        self.assertEqual(client['gender'], 'm')
+        self.assertEqual(client['activity_level'], 3)
+        self.assertEqual(client['workout_type'], 'Bodybuilding')
+        self.assertEqual(client['job_activity'], 'sedentary')
+        self.assertEqual(client['experience_level'], 'Intermediate (2-4 years)')
+        self.assertTrue(client['is_bodybuilder'])
+        self.assertEqual(client['end_date'], datetime.date(2024, 4, 1))
+        self.assertEqual(len(predict_weight_loss(*model_args(client))), 14)
+
+    def test_rejects_values_outside_vocabulary(self):
+        from client_inputs import normalize_client, ClientInputError
+        with self.assertRaises(ClientInputError) as context:
+            normalize_client(dict(self.row, leisure_activity='extreme'))
+        self.assertEqual(context.exception.field, 'leisure_activity')
+        with self.assertRaises(ClientInputError):
+            normalize_client(dict(self.row, current_weight=''))
+
+    def test_rejects_horizon_past_the_limit(self):
+        from client_inputs import normalize_client, ClientInputError, MAX_HORIZON_WEEKS
+        start_date = datetime.date(2024, 1, 1)
+        self.assertEqual(normalize_client(dict(self.row, end_date=start_date + datetime.timedelta(weeks=MAX_HORIZON_WEEKS)))['end_date'], start_date + datetime.timedelta(weeks=MAX_HORIZON_WEEKS))
+        with self.assertRaises(ClientInputError) as context:
+            normalize_client(dict(self.row, end_date=start_date + datetime.timedelta(weeks=MAX_HORIZON_WEEKS + 1)))
+        self.assertEqual(context.exception.field, 'end_date')
+
+    def test_json_roster_is_read_incrementally(self):
+        import json
+        from client_inputs import _iter_json_array
+        rows = [dict(self.row, client_id=f"C{index}", notes=' ] , [ {' * index) for index in range(40)]
+        text = '\n ' + json.dumps(rows, indent=2) + '\n'
+        for block_size in (1, 7, 64, 1 << 16):
+            self.assertEqual(list(_iter_json_array(io.StringIO(text), block_size)), rows)
+        self.assertEqual(list(_iter_json_array(io.StringIO('[ ]'))), [])
+        for malformed in ('{}', '[{"a": 1} {"b": 2}]', '[{"a": 1},'):
+            with self.assertRaises(ValueError):
+                list(_iter_json_array(io.StringIO(malformed), 4))
+
+    def test_roster_reports_archive(self):
+        import tempfile
+        import zipfile
+        from client_inputs import normalize_client
+        from batch_reports import generate_roster_reports
+        clients = [normalize_client(self.row), normalize_client(dict(self.row, first_name='Bo', gender='f'))]
+        with tempfile.TemporaryDirectory() as directory:
+            archive_path = f"{directory}/plans.zip"
+            summary = generate_roster_reports(clients, archive_path=archive_path, workers=1, log=io.StringIO())
+            self.assertEqual(summary['documents'], 2)
+            self.assertEqual(sorted(zipfile.ZipFile(archive_path).namelist()), ['Ann_Lee_weight_loss_plan.pdf', 'Bo_Lee_weight_loss_plan.pdf'])
+
+    def test_roster_reports_never_reuse_a_file_name(self):
+        import tempfile
+        import zipfile
+        from client_inputs import normalize_client
+        from batch_reports import generate_roster_reports
+        # The repeated "Ann Lee" at index 2 would take the name of the client labelled "Ann Lee 2",
+        # and the label at index 3 matches the name the repeat falls back to
+        clients = [normalize_client(self.row), normalize_client(dict(self.row, last_name='Lee 2')), normalize_client(self.row), normalize_client(dict(self.row, last_name='Lee 2_1'))]
+        with tempfile.TemporaryDirectory() as directory:
+            archive_path = f"{directory}/plans.zip"
+            summary = generate_roster_reports(clients, archive_path=archive_path, workers=1, log=io.StringIO())
+            names = zipfile.ZipFile(archive_path).namelist()
+        self.assertEqual(summary['documents'], 4)
+        self.assertEqual(len(set(names)), 4)
+        self.assertEqual(sorted(names), ['Ann_Lee_2_1_3_weight_loss_plan.pdf', 'Ann_Lee_2_1_weight_loss_plan.pdf', 'Ann_Lee_2_weight_loss_plan.pdf', 'Ann_Lee_weight_loss_plan.pdf'])
+
+    def test_roster_pipeline_writes_chunked_parquet(self):
+        import json
+        import tempfile
+        import pyarrow.parquet as pq
+        from roster_pipeline import run_pipeline
+        with tempfile.TemporaryDirectory() as directory:
+            roster_path = f"{directory}/roster.jsonl"
+            with open(roster_path, 'w') as roster:
+                for index in range(5):
+                    roster.write(json.dumps(dict(self.row, client_id=f"C{index}")) + "\n")
+                roster.write(json.dumps(dict(self.row, gender='x')) + "\n")
+            summary = run_pipeline(roster_path, f"{directory}/out", chunk_size=2, log=io.StringIO())
+            self.assertEqual((summary['clients'], summary['rejected'], len(summary['parts'])), (5, 1, 3))
+            table = pq.read_table(f"{directory}/out")
+            self.assertEqual(table.num_rows, 5 * 14)
+            self.assertEqual(sorted(set(table.column('client_id').to_pylist())), ['C0', 'C1', 'C2', 'C3', 'C4'])
+
+# Function to execute tests for what-if parameter sweeps
+class TestParameterSweep(unittest.TestCase):
+    def setUp(self):
+        from client_inputs import normalize_client
+        self.base = normalize_client({'current_weight': 240, 'current_bf': 30, 'goal_weight': 190, 'goal_bf': 12, 'start_date': '2024-01-01', 'end_date': '2024-06-01', 'dob': '1990-01-01', 'gender': 'm', 'height_feet': 5, 'height_inches': 11, 'activity_level': 3, 'resistance_training': True, 'daily_protein_intake': 150, 'workout_type': 'Bodybuilding', 'workout_days': 5, 'job_activity': 'sedentary', 'leisure_activity': 'light', 'experience_level': 'Intermediate (2-4 years)'})
+
+    def test_grid_matches_scalar_forecasts(self):
+        from client_inputs import model_args
+        from sweep import run_sweep
+        base = self.base
+        grid = {'daily_protein_intake': [100, 180], 'workout_days': [0, 3, 6], 'end_date': [datetime.date(2024, 3, 1), datetime.date(2024, 9, 1)]}
+        results = run_sweep(base, grid, workers=1)
+        self.assertEqual(len(results), 12)
+        for _, point in results.iterrows():
+            client = dict(base, daily_protein_intake=point['daily_protein_intake'], workout_days=int(point['workout_days']), end_date=point['end_date'].date())
+            client['volume_score'], client['intensity_score'], client['frequency_score'] = calculate_lean_mass_preservation_scores(client['workout_days'], 'Bodybuilding')
+            progression = predict_weight_loss(*model_args(client))
+            self.assertAlmostEqual(point['final_weight'], progression[-1]['weight'], places=6)
+            self.assertAlmostEqual(point['final_bf'], progression[-1]['body_fat_percentage'], places=6)
+            self.assertAlmostEqual(point['min_calorie_intake'], min(entry['daily_calorie_intake'] for entry in progression[1:]), places=6)
+
+    def test_point_already_at_goal_ignores_padding(self):
+        from client_inputs import model_args
+        from sweep import run_sweep
+        results = run_sweep(self.base, {'goal_weight': [190, 250], 'goal_bf': [12, 35]}, workers=1)
+        for _, point in results.iterrows():
+            progression = predict_weight_loss(*model_args(dict(self.base, goal_weight=point['goal_weight'], goal_bf=point['goal_bf'])))
+            self.assertAlmostEqual(point['min_calorie_intake'], min(entry['daily_calorie_intake'] for entry in progression[1:]), places=6)
+        self.assertEqual(len(predict_weight_loss(*model_args(dict(self.base, goal_weight=250, goal_bf=35)))), 2)
+
+    def test_horizon_under_a_week_has_no_minimum(self):
+        import warnings
+        from sweep import run_sweep
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            results = run_sweep(self.base, {'end_date': [datetime.date(2024, 1, 3), datetime.date(2024, 1, 5)]}, workers=1)
+        self.assertTrue(results['min_calorie_intake'].isna().all())
+        self.assertEqual(list(results['final_weight']), [240, 240])
+
+# Function to execute tests for the shortest-plan goal solver
+class TestGoalSolver(unittest.TestCase):
+    def test_matches_linear_scan_with_fewer_simulations(self):
+        from client_inputs import normalize_client, model_args
+        from goal_solver import find_shortest_end_date, is_feasible
+        client = normalize_client({'current_weight': 230, 'current_bf': 32, 'goal_weight': 180, 'goal_bf': 15, 'start_date': '2024-01-01', 'end_date': '2024-12-30', 'dob': '1985-01-01', 'gender': 'f', 'height_feet': 5, 'height_inches': 6, 'activity_level': 2, 'resistance_training': True, 'daily_protein_intake': 120, 'workout_type': 'General Fitness', 'workout_days': 3, 'job_activity': 'sedentary', 'leisure_activity': 'light', 'experience_level': 'Novice (1-2 years)'})
+        result = find_shortest_end_date(client, max_weeks=104)
+        linear = next(weeks for weeks in range(1, 105) if is_feasible(predict_weight_loss_columns(*model_args(dict(client, end_date=client['start_date'] + datetime.timedelta(weeks=weeks)))), client['goal_bf']))
+        self.assertTrue(result['feasible'])
+        self.assertEqual(result['weeks'], linear)
+        self.assertEqual(result['end_date'], client['start_date'] + datetime.timedelta(weeks=linear))
+        self.assertLess(result['simulations'], linear)
+
+# Function to execute tests for Monte Carlo uncertainty bands
+class TestMonteCarlo(unittest.TestCase):
+    def setUp(self):
+        from client_inputs import normalize_client
+        self.client = normalize_client({'current_weight': 240, 'current_bf': 30, 'goal_weight': 190, 'goal_bf': 12, 'start_date': '2024-01-01', 'end_date': '2024-07-01', 'dob': '1990-01-01', 'gender': 'm', 'height_feet': 5, 'height_inches': 11, 'activity_level': 3, 'resistance_training': True, 'daily_protein_intake': 150, 'workout_type': 'Bodybuilding', 'workout_days': 5, 'job_activity': 'sedentary', 'leisure_activity': 'light', 'experience_level': 'Intermediate (2-4 years)'})
+
+    def test_seeded_bands_are_reproducible_and_ordered(self):
+        from monte_carlo import simulate_uncertainty
+        first = simulate_uncertainty(self.client, trajectories=500, seed=7)
+        second = simulate_uncertainty(self.client, trajectories=500, seed=7)
+        self.assertEqual(first['weight_p50'].tolist(), second['weight_p50'].tolist())
+        self.assertTrue((first['weight_p10'] <= first['weight_p50']).all() and (first['weight_p50'] <= first['weight_p90']).all())
+        self.assertGreater(first['weight_p90'][10] - first['weight_p10'][10], 0)
+
+    def test_zero_variability_matches_deterministic_forecast(self):
+        from client_inputs import model_args
+        from monte_carlo import simulate_uncertainty
+        bands = simulate_uncertainty(self.client, trajectories=20, seed=1, adherence_sd=0, neat_sd=0, adaptation_sd=0)
+        progression = predict_weight_loss(*model_args(self.client))
+        for week, entry in enumerate(progression):
+            self.assertAlmostEqual(bands['weight_p10'][week], entry['weight'], places=6)
+            self.assertAlmostEqual(bands['lean_mass_p90'][week], entry['lean_mass'], places=6)
+
+# Function to execute tests for benchmark baseline comparison
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_flags_regressions_past_threshold(self):
+        from benchmarks.bench_suite import compare_results
+        baseline = {'results': {'a': {'p50_ms': 10.0, 'peak_kib': 100.0}, 'b': {'p50_ms': 10.0, 'peak_kib': 100.0}}}
+        current = {'results': {'a': {'p50_ms': 12.0, 'peak_kib': 100.0}, 'b': {'p50_ms': 10.0, 'peak_kib': 150.0}, 'new': {'p50_ms': 1.0, 'peak_kib': 1.0}}}
+        regressions = compare_results(baseline, current, threshold=0.25)
+        self.assertEqual([(r['case'], r['metric']) for r in regressions], [('b', 'peak_kib')])
+        self.assertEqual(len(compare_results(baseline, current, threshold=0.1)), 2)
+
+# Function to execute tests for the process warm-up hook
+class TestWarmUp(unittest.TestCase):
+    def test_reports_step_durations_and_can_be_skipped(self):
+        from warmup import warm_up
+        log = io.StringIO()
+        summary = warm_up(log=log, environ={})
+        self.assertEqual(list(summary['steps']), ['forecast', 'report_data', 'dataframe', 'pdf'])
+        self.assertGreaterEqual(summary['seconds'], sum(summary['steps'].values()))
+        self.assertIn("warm-up finished", log.getvalue())
+        self.assertIsNone(warm_up(log=log, environ={'GRIMORE_SKIP_WARMUP': '1'}))
+
+# Function to execute tests for the import-light core model
+class TestCoreModelImports(unittest.TestCase):
+    def test_core_and_report_skip_heavy_dependencies(self):
+        import subprocess
+        code = "import sys, weight_loss_model, report; print(sorted(m for m in ('numpy', 'pandas', 'reportlab', 'tabulate') if m in sys.modules))"
+        completed = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        self.assertEqual(completed.stdout.strip(), "[]")
+
+# Function to execute tests for adaptive multi-week stepping
+class TestAdaptiveStepping(unittest.TestCase):
+    def setUp(self):
+        start_date = datetime.date(2024, 1, 1)
+        # Recomposition: BF% goal almost met, the weight goal out of reach, five-year horizon
+        self.args = [200, 18, 175, 17, start_date, start_date + datetime.timedelta(weeks=260), datetime.date(1990, 6, 1), 'm', 3, 180, False, True, 160, 0.8, 0.8, 0.8, 'sedentary', 'light', 'Intermediate (2-4 years)', False]
+
+    def test_zero_tolerance_matches_weekly(self):
+        adaptive = predict_weight_loss_adaptive(*self.args, tolerance=0)
+        self.assertEqual([entry['step_weeks'] for entry in adaptive[1:]], [1] * 260)
+        self.assertEqual([{key: value for key, value in entry.items() if key not in ('week', 'step_weeks')} for entry in adaptive], predict_weight_loss(*self.args))
+
+    def test_fewer_steps_within_tolerance(self):
+        weekly = predict_weight_loss(*self.args)
+        adaptive = predict_weight_loss_adaptive(*self.args, tolerance=0.1)
+        self.assertLess(len(adaptive), len(weekly) / 5)
+        self.assertEqual(adaptive[-1]['week'], len(weekly) - 1)
+        for entry in adaptive:
+            self.assertEqual(entry['date'], weekly[entry['week']]['date'])
+            self.assertLessEqual(abs(entry['weight'] - weekly[entry['week']]['weight']), 0.1)
+            self.assertLessEqual(abs(entry['body_fat_percentage'] - weekly[entry['week']]['body_fat_percentage']), 0.1)
+
+    def test_stops_on_the_weekly_models_week(self):
+        # BF% creeps down to the goal over many multi-week steps, so the approximate state reaches it a week late
+        args = [220.8, 31.8, 229.1, 29.4, datetime.date(2021, 10, 28), datetime.date(2025, 3, 13), datetime.date(2003, 11, 22), 'f', 1, 183.0, True, True, 161.9, 1.0, 0.8, 0.4, 'sedentary', 'sedentary', 'Elite (10+ years)', True]
+        weekly = predict_weight_loss(*args)
+        adaptive = predict_weight_loss_adaptive(*args)
+        self.assertEqual(len(weekly) - 1, 144)
+        self.assertEqual(adaptive[-1]['week'], len(weekly) - 1)
+        self.assertEqual(adaptive[-1]['weight'], weekly[-1]['weight'])
+        self.assertEqual(adaptive[-1]['body_fat_percentage'], weekly[-1]['body_fat_percentage'])
+
+# Function to execute tests for the daily-resolution forecast
+class TestDailyForecast(unittest.TestCase):
+    def setUp(self):
+        start_date = datetime.date(2024, 1, 1)
+        self.args = [230, 32, 150, 8, start_date, start_date + datetime.timedelta(days=7 * 52 + 4), datetime.date(1985, 3, 9), 'm', 3, 178, False, True, 160, 0.8, 0.8, 0.8, 'sedentary', 'light', 'Advanced (4-10 years)', True]
+
+    def test_weekly_rollup_matches_weekly_forecast(self):
+        from daily import predict_weight_loss_daily, weekly_rollup
+        weekly = predict_weight_loss(*self.args)
+        daily = predict_weight_loss_daily(*self.args)
+        rollup = weekly_rollup(daily)
+        for field in ('weight', 'body_fat_percentage', 'lean_mass', 'fat_mass', 'daily_calorie_intake', 'tdee'):
+            self.assertEqual(list(rollup[field]), [entry[field] for entry in weekly])
+        for rolled, entry in zip(rollup['weekly_caloric_output'], weekly):
+            self.assertAlmostEqual(rolled, entry['weekly_caloric_output'], places=6)
+
+    def test_covers_partial_final_week(self):
+        from daily import predict_weight_loss_daily
+        daily = predict_weight_loss_daily(*self.args)
+        self.assertEqual(len(daily['day']), 7 * 52 + 4 + 1)
+        self.assertEqual(daily['date'][-1].astype(datetime.date), self.args[5])
+        weekly = predict_weight_loss(*self.args)
+        self.assertAlmostEqual(daily['weight_change'][1:8].sum(), weekly[1]['weight'] - weekly[0]['weight'], places=9)
+        self.assertAlmostEqual(daily['weight_change'][1], daily['weight_change'][4], places=9)
+
+    def test_goal_met_in_last_full_week_with_partial_tail(self):
+        from daily import predict_weight_loss_daily, weekly_rollup
+        start_date = datetime.date(2024, 1, 1)
+        args = [230, 32, 200, 20, start_date, start_date + datetime.timedelta(weeks=20, days=1)] + self.args[6:]
+        weekly = predict_weight_loss(*args)
+        self.assertEqual(len(weekly), 21)  # goal reached exactly in week 20, so the run stops there
+        daily = predict_weight_loss_daily(*args)
+        self.assertEqual(daily['day'][-1], 140)
+        self.assertEqual(list(weekly_rollup(daily)['weight']), [entry['weight'] for entry in weekly])
+
+    def test_horizon_under_a_week(self):
+        from daily import predict_weight_loss_daily
+        start_date = datetime.date(2024, 1, 1)
+        daily = predict_weight_loss_daily(*self.args[:4], start_date, start_date + datetime.timedelta(days=4), *self.args[6:])
+        self.assertEqual(list(daily['day']), [0, 1, 2, 3, 4])
+        weekly = predict_weight_loss(*self.args[:4], start_date, start_date + datetime.timedelta(weeks=1), *self.args[6:])
+        self.assertAlmostEqual(daily['weight'][4] - daily['weight'][0], (weekly[1]['weight'] - weekly[0]['weight']) * 4 / 7, places=9)
+
+# Function to execute tests for multi-phase programs
+class TestProgramPhases(unittest.TestCase):
+    def setUp(self):
+        from client_inputs import MODEL_ARGUMENTS
+        start_date = datetime.date(2024, 1, 1)
+        self.start_date = start_date
+        self.args = [230, 32, 150, 12, start_date, start_date + datetime.timedelta(weeks=20), datetime.date(1985, 3, 9), 'm', 3, 178, False, True, 160, 0.8, 0.8, 0.8, 'sedentary', 'light', 'Advanced (4-10 years)', True]
+        self.inputs = dict(zip(MODEL_ARGUMENTS, self.args))
+
+    def test_single_goal_phase_matches_forecast(self):
+        from phases import simulate_program
+        program = simulate_program(self.inputs, [{'name': 'cut', 'end_date': self.args[5]}])
+        self.assertEqual({entry.pop('phase') for entry in program}, {'cut'})
+        self.assertEqual(program, predict_weight_loss(*self.args))
+
+    def test_phases_share_one_week_index(self):
+        from phases import simulate_program
+        program = simulate_program(self.inputs, [
+            {'name': 'cut', 'end_date': self.start_date + datetime.timedelta(weeks=12), 'goal_bf': 20},
+            {'name': 'diet break', 'end_date': self.start_date + datetime.timedelta(weeks=14), 'calories': 'maintain'},
+            {'name': 'lean bulk', 'end_date': self.start_date + datetime.timedelta(weeks=30), 'calories': 250, 'daily_protein_intake': 190}
+        ])
+        self.assertEqual(len(program), 31)
+        self.assertEqual([entry['phase'] for entry in program[12:16]], ['cut', 'diet break', 'diet break', 'lean bulk'])
+        self.assertEqual(program[30]['date'], (self.start_date + datetime.timedelta(weeks=30)).strftime("%m%d%y"))
+        for entry in program[13:15]:
+            self.assertEqual(entry['daily_calorie_intake'], entry['tdee'])
+        self.assertGreater(program[30]['weight'], program[14]['weight'])
+        # Adaptation keeps counting weeks from the program start: week 15's TDEE is below week 14's at the same weight
+        self.assertLess(program[15]['tdee'] / program[15]['rmr'], program[14]['tdee'] / program[14]['rmr'])
+
+    def test_rejects_unknown_settings(self):
+        from phases import simulate_program
+        with self.assertRaises(ValueError):
+            simulate_program(self.inputs, [{'end_date': self.args[5], 'dob': datetime.date(1990, 1, 1)}])
+        with self.assertRaises(ValueError):
+            simulate_program(self.inputs, [{'end_date': self.args[5], 'calories': 'bulk'}])
+
+# Function to execute tests for the RMR equation registry
+class TestEnergyEquations(unittest.TestCase):
+    def setUp(self):
+        start_date = datetime.date(2024, 1, 1)
+        self.clients = [
+            [230, 32, 150, 12, start_date, start_date + datetime.timedelta(weeks=30), datetime.date(1985, 3, 9), 'm', 3, 178, True, True, 160, 0.8, 0.8, 0.8, 'sedentary', 'light', 'Advanced (4-10 years)', True],
+            [165, 34, 140, 22, start_date, start_date + datetime.timedelta(weeks=40), datetime.date(1984, 2, 29), 'f', 1, 162, False, False, 90, 0.3, 0.4, 1.0, 'light', 'sedentary', 'Beginner (0-1 year)', False],
+        ]
+
+    def test_scalar_and_vectorized_forms_agree(self):
+        import numpy as np
+        from energy_equations import RMR_EQUATIONS
+        weight, body_fat, age = np.array([150.0, 230.0, 310.0]), np.array([12.0, 25.0, 41.0]), np.array([22, 47, 63])
+        is_male, height_cm, is_athlete = np.array([True, False, True]), np.array([160.0, 175.5, 191.0]), np.array([False, True, True])
+        for name, equation in RMR_EQUATIONS.items():
+            expected = [equation.rmr(*values[:3], 'm' if values[3] else 'f', *values[4:]) for values in zip(weight, body_fat, age, is_male, height_cm, is_athlete)]
+            self.assertEqual(equation.rmr_vec(weight, body_fat, age, is_male, height_cm, is_athlete).tolist(), expected, name)
+        self.assertEqual(RMR_EQUATIONS['mifflin_st_jeor_legacy'].rmr(180, 20, 35, 'm', 180, True), calculate_rmr(180, 35, 'm', 180, True))
+
+    def test_default_equation_is_unchanged(self):
+        self.assertEqual(predict_weight_loss(*self.clients[0], rmr_equation='mifflin_st_jeor_legacy'), predict_weight_loss(*self.clients[0]))
+
+    # Every equation but the legacy default takes the weight in lbs and converts it, so they agree in scale
+    def test_equations_share_units(self):
+        from energy_equations import RMR_EQUATIONS, KG_PER_LB
+        self.assertEqual(RMR_EQUATIONS['mifflin_st_jeor'].rmr(180, 20, 35, 'f', 165, False), RMR_EQUATIONS['mifflin_st_jeor_legacy'].rmr(180 * KG_PER_LB, 20, 35, 'f', 165, False))
+        for gender, body_fat in (('m', 18), ('f', 28)):
+            values = {name: equation.rmr(180, body_fat, 35, gender, 175, False) for name, equation in RMR_EQUATIONS.items()}
+            legacy = values.pop('mifflin_st_jeor_legacy')
+            self.assertLess(max(values.values()) / min(values.values()), 1.25, values)
+            self.assertGreater(legacy / values['mifflin_st_jeor'], 1.4)
+
+    def test_batch_matches_scalar_per_client_equation(self):
+        from batch_engine import predict_weight_loss_batch, batch_client_progression
+        names = ['katch_mcardle', 'cunningham', 'harris_benedict', 'mifflin_st_jeor', 'mifflin_st_jeor_legacy']
+        clients = [client for client in self.clients for _ in names]
+        result = predict_weight_loss_batch(*[list(values) for values in zip(*clients)], rmr_equation=names * 2)
+        for index, (client, name) in enumerate(zip(clients, names * 2)):
+            self.assertEqual(batch_client_progression(result, index), predict_weight_loss(*client, rmr_equation=name), name)
+
+    def test_compare_equations_in_one_batch(self):
+        from batch_engine import compare_rmr_equations
+        from client_inputs import MODEL_ARGUMENTS
+        columns = {name: list(values) for name, values in zip(MODEL_ARGUMENTS, zip(*self.clients))}
+        compared = compare_rmr_equations(columns, ['cunningham', 'katch_mcardle'])
+        self.assertEqual(compared['weight'].shape[:2], (2, 2))
+        for index, client in enumerate(self.clients):
+            for position, name in enumerate(compared['equations']):
+                expected = predict_weight_loss(*client, rmr_equation=name)
+                self.assertEqual(compared['num_weeks'][index, position], len(expected) - 1)
+                self.assertEqual(compared['rmr'][index, position, :len(expected)].tolist(), [entry['rmr'] for entry in expected])
+
+    def test_unknown_equation(self):
+        with self.assertRaises(ValueError):
+            predict_weight_loss(*self.clients[0], rmr_equation='bmr_guess')
+
+    def _inputs(self, rmr_equation):
+        from client_inputs import MODEL_ARGUMENTS
+        return dict(zip(MODEL_ARGUMENTS, self.clients[0]), rmr_equation=rmr_equation)
+
+    def test_goal_solver_uses_client_equation(self):
+        from goal_solver import find_shortest_end_date
+        default = find_shortest_end_date(self._inputs('mifflin_st_jeor_legacy'))
+        katch = find_shortest_end_date(self._inputs('katch_mcardle'))
+        self.assertEqual(katch['progression']['rmr'][0], predict_weight_loss(*self.clients[0], rmr_equation='katch_mcardle')[0]['rmr'])
+        self.assertNotEqual(katch['weeks'], default['weeks'])
+
+    def test_checkpoints_use_client_equation(self):
+        from checkpoints import SimulationCheckpoint
+        from energy_equations import cunningham
+        expected = predict_weight_loss_columns(*self.clients[0], rmr_equation='cunningham')
+        self.assertEqual(SimulationCheckpoint(self._inputs('cunningham')).run()['rmr'].tolist(), expected['rmr'].tolist())
+        forked = SimulationCheckpoint.from_progression(self._inputs('mifflin_st_jeor_legacy'), predict_weight_loss_columns(*self.clients[0]), 5).fork(rmr_equation='cunningham').run()
+        self.assertEqual(forked['rmr'][6], cunningham(forked['weight'][5], forked['body_fat_percentage'][5], 38, 'm', 178, True))
+        self.assertNotEqual(forked['rmr'][6], predict_weight_loss_columns(*self.clients[0])['rmr'][6])
+
+    def test_phases_use_client_equation(self):
+        from phases import simulate_program
+        program = simulate_program(self._inputs('katch_mcardle'), [{'end_date': self.clients[0][5]}])
+        self.assertEqual([entry['rmr'] for entry in program], [entry['rmr'] for entry in predict_weight_loss(*self.clients[0], rmr_equation='katch_mcardle')])
+        self.assertNotEqual(program[0]['rmr'], predict_weight_loss(*self.clients[0])[0]['rmr'])
+
+    def test_daily_uses_client_equation(self):
+        from daily import predict_client_daily, weekly_rollup
+        daily = predict_client_daily(self._inputs('cunningham'))
+        self.assertEqual(list(weekly_rollup(daily)['tdee']), [entry['tdee'] for entry in predict_weight_loss(*self.clients[0], rmr_equation='cunningham')])
+        self.assertNotEqual(daily['tdee'][0], predict_weight_loss(*self.clients[0])[0]['tdee'])
+
+# Function to execute tests for the streaming forecast generator
+class TestStreamingForecast(unittest.TestCase):
+    def setUp(self):
+        start_date = datetime.date(2024, 1, 1)
+        self.args = [230, 32, 150, 8, start_date, start_date + datetime.timedelta(weeks=260), datetime.date(1985, 3, 9), 'm', 3, 178, False, True, 160, 0.8, 0.8, 0.8, 'sedentary', 'light', 'Advanced (4-10 years)', True]
+
+    def test_yields_same_entries_as_list(self):
+        self.assertEqual(list(iter_weight_loss(*self.args)), predict_weight_loss(*self.args))
+
+    def test_can_stop_early(self):
+        import itertools
+        first_weeks = list(itertools.islice(iter_weight_loss(*self.args), 5))
+        self.assertEqual(first_weeks, predict_weight_loss(*self.args)[:5])
+        crossed = next(entry for entry in iter_weight_loss(*self.args) if entry['body_fat_percentage'] <= 20)
+        self.assertLessEqual(crossed['body_fat_percentage'], 20)
+
+# Function to execute tests for forkable simulation checkpoints
+class TestSimulationCheckpoints(unittest.TestCase):
+    def setUp(self):
+        from client_inputs import MODEL_ARGUMENTS
+        start_date = datetime.date(2024, 1, 1)
+        self.args = [230, 32, 180, 12, start_date, start_date + datetime.timedelta(weeks=52), datetime.date(1985, 3, 9), 'm', 3, 178, False, False, 160, 0.8, 0.8, 0.8, 'sedentary', 'light', 'Advanced (4-10 years)', False]
+        self.inputs = dict(zip(MODEL_ARGUMENTS, self.args))
+        self.baseline = predict_weight_loss_columns(*self.args)
+
+    def test_unchanged_fork_reproduces_forecast(self):
+        from checkpoints import SimulationCheckpoint
+        for week in (0, 8, len(self.baseline) - 1):
+            resumed = SimulationCheckpoint.from_progression(self.inputs, self.baseline, week).fork().run()
+            self.assertEqual(resumed.to_records(), self.baseline.to_records())
+
+    def test_fork_changes_only_later_weeks(self):
+        from checkpoints import SimulationCheckpoint
+        checkpoint = SimulationCheckpoint.from_progression(self.inputs, self.baseline, 8)
+        lifting = checkpoint.fork(resistance_training=True).run()
+        expected = predict_weight_loss_columns(*self.args[:11], True, *self.args[12:])
+        self.assertEqual(lifting.to_records()[:9], self.baseline.to_records()[:9])
+        self.assertGreater(lifting['lean_mass'][-1], self.baseline['lean_mass'][-1])
+        self.assertNotEqual(lifting['lean_mass'][-1], expected['lean_mass'][-1])
+        with self.assertRaises(ValueError):
+            checkpoint.fork(not_an_input=1)
+
+    def test_run_without_history_dates_from_checkpoint_week(self):
+        from checkpoints import SimulationCheckpoint
+        checkpoint = SimulationCheckpoint(self.inputs, 8, float(self.baseline['weight'][8]), float(self.baseline['body_fat_percentage'][8]), 230)
+        self.assertEqual(checkpoint.run().to_records(), self.baseline.to_records()[9:])
+
+    def test_rebase_from_weigh_in(self):
+        from checkpoints import SimulationCheckpoint
+        checkpoint = SimulationCheckpoint.from_progression(self.inputs, self.baseline, 20)
+        reforecast = checkpoint.rebase(215, 28, datetime.date(2024, 1, 1) + datetime.timedelta(weeks=12)).run()
+        self.assertEqual(reforecast['weight'][12], 215)
+        self.assertEqual(reforecast.to_records()[:12], self.baseline.to_records()[:12])
+        self.assertEqual(len(reforecast), len(self.baseline))
+
+# Function to execute tests for the memoized stage graph
+class TestStageGraph(unittest.TestCase):
+    def test_reruns_only_stages_downstream_of_changes(self):
+        from stage_graph import StageGraph
+        graph = StageGraph()
+        graph.stage('total', inputs=['a', 'b'])(lambda a, b: a + b)
+        graph.stage('label', inputs=['name'], depends=['total'])(lambda name, total: f"{name}: {total}")
+        graph.stage('nothing', inputs=['a'])(lambda a: None)
+
+        first = graph.run({'a': 1, 'b': 2, 'name': 'x'})
+        self.assertEqual(first['label'], "x: 3")
+        self.assertEqual(first.computed, ['total', 'label'])
+
+        renamed = graph.run({'a': 1, 'b': 2.0, 'name': 'y'})
+        self.assertEqual(renamed['label'], "y: 3")
+        self.assertEqual(renamed.computed, ['label'])
+
+        self.assertIsNone(first['nothing'])
+        repeated = graph.run({'a': 1, 'b': 2, 'name': 'x'})
+        self.assertIsNone(repeated['nothing'])
+        self.assertEqual(repeated['label'], "x: 3")
+        self.assertEqual(repeated.computed, [])
+
+    def test_failed_computations_are_not_memoized(self):
+        from concurrent.futures import Future
+        from stage_graph import StageGraph
+        graph = StageGraph()
+        attempts = []
+
+        @graph.stage('render', inputs=['a'])
+        def render(a):
+            attempts.append(a)
+            future = Future()
+            if len(attempts) == 1:
+                future.set_exception(RuntimeError("render failed"))
+            else:
+                future.set_result(b"pdf")
+            return future
+
+        @graph.stage('strict', inputs=['a'])
+        def strict(a):
+            attempts.append(a)
+            if len(attempts) == 3:
+                raise RuntimeError("stage failed")
+            return a
+
+        with self.assertRaises(RuntimeError):
+            graph.run({'a': 1})['render'].result()
+        self.assertEqual(graph.run({'a': 1})['render'].result(), b"pdf")
+        with self.assertRaises(RuntimeError):
+            graph.run({'a': 1})['strict']
+        rerun = graph.run({'a': 1})
+        self.assertEqual(rerun['strict'], 1)
+        self.assertEqual(rerun.computed, ['strict'])
+        self.assertEqual(len(attempts), 4)
+
+# Function to execute tests for the shared on-disk result store
+class TestDiskStore(unittest.TestCase):
+    def test_progression_round_trip_and_model_version(self):
+        import tempfile
+        from disk_store import DiskStore, dump_progression, load_progression
+        start_date = datetime.date(2024, 1, 1)
+        progression = predict_weight_loss_columns(200, 25, 180, 15, start_date, start_date + datetime.timedelta(weeks=20), datetime.date(1990, 1, 1), 'm', 3, 180, False, True, 150, 0.8, 0.8, 0.8, 'sedentary', 'light', 'Intermediate (2-4 years)', False)
+        with tempfile.TemporaryDirectory() as directory:
+            store = DiskStore(directory)
+            store.put('ab' * 32, dump_progression(progression))
+            restored = load_progression(DiskStore(directory).get('ab' * 32))
+            self.assertEqual(restored.to_records(), progression.to_records())
+            self.assertIsNone(DiskStore(directory, model_version=MODEL_VERSION + 1).get('ab' * 32))
+
+    def test_evicts_least_recently_used(self):
+        import os
+        import tempfile
+        from disk_store import DiskStore
+        with tempfile.TemporaryDirectory() as directory:
+            store = DiskStore(directory)
+            for index in range(4):
+                store.put(f"{index:064x}", bytes(3000))
+                os.utime(store._path(f"{index:064x}"), (index, index))
+            store.get(f"{0:064x}")
+            store.max_bytes = 10000
+            store.evict()
+            self.assertIn(f"{0:064x}", store)
+            self.assertNotIn(f"{1:064x}", store)
+            self.assertLessEqual(store.size(), 9000)
+
+    def test_get_returns_bytes_evicted_after_read(self):
+        import tempfile
+        from unittest import mock
+        from disk_store import DiskStore
+        with tempfile.TemporaryDirectory() as directory:
+            store = DiskStore(directory)
+            store.put('cd' * 32, b'report')
+            with mock.patch('disk_store.os.utime', side_effect=FileNotFoundError):
+                self.assertEqual(store.get('cd' * 32), b'report')
+            self.assertEqual((store.hits, store.misses), (1, 0))
+
+# Function to execute tests for pipeline instrumentation
+class TestInstrumentation(unittest.TestCase):
+    def tearDown(self):
+        import instrumentation
+        instrumentation.disable()
+
+    def test_disabled_spans_record_nothing(self):
+        import instrumentation
+        instrumentation.disable()
+        with instrumentation.span('simulate', weeks=52) as current:
+            current.set(clients=1)
+        self.assertIs(instrumentation.span('simulate'), instrumentation.span('display'))
+        self.assertIsNone(instrumentation.get_recorder())
+
+    def test_spans_export_quantiles_and_log(self):
+        import json
+        import tempfile
+        import instrumentation
+        with tempfile.TemporaryDirectory() as tmp:
+            span_log = f"{tmp}/spans.jsonl"
+            recorder = instrumentation.enable(span_log=span_log)
+            for weeks in (12, 52, 156):
+                with instrumentation.span('simulate', weeks=weeks):
+                    predict_weight_loss_columns(*self._args(weeks))
+            text = recorder.prometheus_text()
+            self.assertIn('grimore_stage_duration_seconds{stage="simulate",quantile="0.99"}', text)
+            self.assertIn('grimore_stage_duration_seconds_count{stage="simulate"} 3', text)
+            instrumentation.disable()
+            summary = instrumentation.summarize_span_log(span_log)
+            self.assertEqual(summary['simulate']['count'], 3)
+            with open(span_log) as logged:
+                self.assertEqual([json.loads(line)['weeks'] for line in logged], [12, 52, 156])
+
+    def _args(self, weeks):
+        start_date = datetime.date(2024, 1, 1)
+        return [200, 25, 180, 15, start_date, start_date + datetime.timedelta(weeks=weeks), datetime.date(1990, 1, 1), 'm', 3, 180, False, True, 150, 0.8, 0.8, 0.8, 'sedentary', 'light', 'Intermediate (2-4 years)', False]
+
+# Function to execute tests for the line-delimited JSON worker
+class TestWorker(unittest.TestCase):
+    def test_answers_pipelined_requests_in_order(self):
+        import json
+        from warmup import WARMUP_CLIENT
+        from client_inputs import normalize_client, model_args
+        from worker import WorkerStats, serve_stream
+        client = dict(WARMUP_CLIENT, start_date='2024-01-01', end_date='2024-06-01', dob='1990-01-01')
+        requests = [{'id': 1, 'client': client, 'report': ['data']}, {'id': 2, 'client': dict(client, goal_bf=None)}, {'id': 3, 'op': 'ping'}]
+        infile = io.BytesIO(b"".join(json.dumps(request).encode('utf-8') + b"\n" for request in requests) + b"not json\n")
+        outfile = io.BytesIO()
+        stats = WorkerStats()
+        serve_stream(infile, outfile, stats)
+        responses = [json.loads(line) for line in outfile.getvalue().splitlines()]
+        self.assertEqual([response['id'] for response in responses], [1, 2, 3, None])
+        self.assertEqual([response['ok'] for response in responses], [True, False, True, False])
+        self.assertEqual(len(responses[0]['progression']), len(predict_weight_loss(*model_args(normalize_client(client)))))
+        self.assertIn('report_data', responses[0])
+        self.assertEqual(responses[1]['error']['field'], 'goal_bf')
+        self.assertEqual(stats.snapshot()['errors'], 2)
+
+# Function to execute tests for the HTTP prediction API
+class TestForecastAPI(unittest.TestCase):
+    def test_routes_errors_and_bounded_queue(self):
+        import asyncio
+        import json
+        from concurrent.futures import ThreadPoolExecutor
+        from api import ForecastAPI, HTTPError
+        from warmup import WARMUP_CLIENT
+        client = dict(WARMUP_CLIENT, start_date='2024-01-01', end_date='2024-06-01', dob='1990-01-01')
+
+        async def scenario(api):
+            status, content_type, body, _ = await api.dispatch('POST', '/v1/report', json.dumps({'client': client}).encode('utf-8'))
+            self.assertEqual((status, content_type), (200, 'application/json'))
+            self.assertIn('report_data', json.loads(body))
+            status, _, body, _ = await api.dispatch('POST', '/v1/forecast', json.dumps({'client': dict(client, gender='x')}).encode('utf-8'))
+            self.assertEqual((status, json.loads(body)['error']['field']), (400, 'gender'))
+            with self.assertRaises(HTTPError) as raised:
+                await api.dispatch('GET', '/v1/forecast', b'')
+            self.assertEqual(raised.exception.status, 405)
+            api.max_pending = 0
+            with self.assertRaises(HTTPError) as raised:
+                await api.dispatch('POST', '/v1/forecast', json.dumps({'client': client}).encode('utf-8'))
+            self.assertEqual(raised.exception.status, 503)
+
+        with ThreadPoolExecutor(2) as executor:
+            asyncio.run(scenario(ForecastAPI(executor, 2)))
+
+    # Send one request over a real connection and return the raw response
+    def _exchange(self, api, request):
+        import asyncio
+
+        async def scenario():
+            server = await api.start_server('127.0.0.1', 0)
+            async with server:
+                reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+                writer.write(request)
+                response = await reader.read()
+                writer.close()
+                return response
+        return asyncio.run(scenario())
+
+    def test_pdf_file_name_cannot_inject_headers(self):
+        import json
+        import urllib.parse
+        from concurrent.futures import ThreadPoolExecutor
+        from api import ForecastAPI
+        from warmup import WARMUP_CLIENT
+        for first_name in ('Ann "Nan"', 'Ann"\r\nSet-Cookie: pwned=1\r\nX-A: "', '张伟'):
+            client = dict(WARMUP_CLIENT, first_name=first_name, last_name='', start_date='2024-01-01', end_date='2024-03-01', dob='1990-01-01')
+            body = json.dumps({'client': client}).encode('utf-8')
+            with ThreadPoolExecutor(1) as executor:
+                response = self._exchange(ForecastAPI(executor, 1), b"POST /v1/report/pdf HTTP/1.1\r\nConnection: close\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+            head = response.split(b"\r\n\r\n", 1)[0].decode('latin-1').split("\r\n")
+            self.assertEqual(head[0], "HTTP/1.1 200 OK", first_name)
+            headers = dict(line.split(': ', 1) for line in head[1:])
+            self.assertNotIn('Set-Cookie', headers)
+            disposition = headers['Content-Disposition']
+            self.assertRegex(disposition, r'^attachment; filename="[A-Za-z0-9._-]+"; ')
+            self.assertEqual(urllib.parse.unquote(disposition.split("filename*=UTF-8''", 1)[1]), f"{first_name.strip()}_weight_loss_plan.pdf")
+
+    def test_invalid_content_length_gets_400(self):
+        from api import ForecastAPI
+        for length in (b'-5', b'+5', b'1_0', b'abc'):
+            response = self._exchange(ForecastAPI(None, 1), b"POST /v1/forecast HTTP/1.1\r\nConnection: close\r\nContent-Length: " + length + b"\r\n\r\n{}")
+            self.assertTrue(response.startswith(b"HTTP/1.1 400 "), length)
+            self.assertIn(b'invalid Content-Length', response)
+
+    def test_failing_pdf_and_batch_jobs_get_500(self):
+        import asyncio
+        import json
+        from unittest import mock
+        from concurrent.futures import ThreadPoolExecutor
+        from api import ForecastAPI
+        from warmup import WARMUP_CLIENT
+        client = dict(WARMUP_CLIENT, start_date='2024-01-01', end_date='2024-03-01', dob='1990-01-01')
+
+        async def scenario(api):
+            with mock.patch('report.generate_pdf', side_effect=RuntimeError('renderer crashed')):
+                status, _, body, _ = await api.dispatch('POST', '/v1/report/pdf', json.dumps({'client': client}).encode('utf-8'))
+            self.assertEqual((status, json.loads(body)['error']), (500, {'type': 'RuntimeError', 'message': 'renderer crashed'}))
+            status, _, body, _ = await api.dispatch('POST', '/v1/report/pdf', json.dumps({'client': dict(client, gender='x')}).encode('utf-8'))
+            self.assertEqual((status, json.loads(body)['error']['field']), (400, 'gender'))
+            with mock.patch('batch_engine.predict_weight_loss_batch', side_effect=MemoryError('out of memory')):
+                status, _, body, _ = await api.dispatch('POST', '/v1/forecast/batch', json.dumps({'clients': [client]}).encode('utf-8'))
+            self.assertEqual((status, json.loads(body)['error']['type']), (500, 'MemoryError'))
+
+        with ThreadPoolExecutor(1) as executor:
+            asyncio.run(scenario(ForecastAPI(executor, 1)))
+
+    def test_unencodable_response_header_gets_500(self):
+        from api import ForecastAPI
+
+        class BadHeaderAPI(ForecastAPI):
+            async def dispatch(self, method, path, body):
+                return 200, 'text/plain', b'ok', {'X-Name': '张伟'}
+
+        response = self._exchange(BadHeaderAPI(None, 1), b"GET /health HTTP/1.1\r\nConnection: close\r\n\r\n")
+        self.assertTrue(response.startswith(b"HTTP/1.1 500 "))
+        self.assertIn(b'UnicodeEncodeError', response)
+
 if __name__ == "__main__":
+    # --worker: serve line-delimited JSON requests instead of prompting (see worker.py)
+    if '--worker' in sys.argv[1:]:
+        from worker import main as worker_main
+        sys.exit(worker_main([arg for arg in sys.argv[1:] if arg != '--worker']))
     progression, initial_data = run_user_interaction()
     print_summary(progression, initial_data)
\ No newline at end of file
@@ -0,0 +1,188 @@
+#instrumentation.py (Low-overhead timing spans per pipeline stage with JSON-lines and Prometheus text export)
+# Summarize a span log: python instrumentation.py spans.jsonl
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+# Stand-in returned by span() while instrumentation is off: no clock reads, no allocation, no locking
+class _DisabledSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+_DISABLED_SPAN = _DisabledSpan()
+
+# Times one stage; attributes (horizon length, input shape, ...) can be added while it runs
+class _Span:
+    __slots__ = ('recorder', 'stage', 'attributes', 'started')
+
+    def __init__(self, recorder, stage, attributes):
+        self.recorder = recorder
+        self.stage = stage
+        self.attributes = attributes
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.attributes['error'] = exc_type.__name__
+        self.recorder.record(self.stage, time.perf_counter() - self.started, self.attributes)
+        return False
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+# Nearest-rank quantile of an already sorted list
+def _quantile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+# Per-stage span counts, total time and a window of the most recent durations for p50/p99
+class MetricsRecorder:
+    def __init__(self, sample_size=2048, span_log=None):
+        self.sample_size = sample_size
+        self._stages = {}
+        self._lock = threading.Lock()
+        self._span_log = open(span_log, 'a', encoding='utf-8') if span_log else None
+
+    def record(self, stage, seconds, attributes=None):
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = {'count': 0, 'sum': 0.0, 'samples': deque(maxlen=self.sample_size)}
+            entry['count'] += 1
+            entry['sum'] += seconds
+            entry['samples'].append(seconds)
+            if self._span_log is not None:
+                self._span_log.write(json.dumps(dict(attributes or {}, stage=stage, seconds=seconds, time=time.time()), default=str) + "\n")
+                self._span_log.flush()
+
+    def summary(self, quantiles=(0.5, 0.99)):
+        with self._lock:
+            stages = {stage: (entry['count'], entry['sum'], sorted(entry['samples'])) for stage, entry in self._stages.items()}
+        return {
+            stage: dict({'count': count, 'sum': total}, **{f"p{q * 100:g}": _quantile(ordered, q) for q in quantiles})
+            for stage, (count, total, ordered) in stages.items()
+        }
+
+    # Prometheus text exposition format: one summary metric labelled by stage
+    def prometheus_text(self, quantiles=(0.5, 0.9, 0.99)):
+        lines = [
+            "# HELP grimore_stage_duration_seconds Wall time spent in each pipeline stage.",
+            "# TYPE grimore_stage_duration_seconds summary"
+        ]
+        for stage, values in sorted(self.summary(quantiles).items()):
+            for q in quantiles:
+                lines.append(f'grimore_stage_duration_seconds{{stage="{stage}",quantile="{q:g}"}} {values[f"p{q * 100:g}"]:.6f}')
+            lines.append(f'grimore_stage_duration_seconds_sum{{stage="{stage}"}} {values["sum"]:.6f}')
+            lines.append(f'grimore_stage_duration_seconds_count{{stage="{stage}"}} {values["count"]}')
+        return "\n".join(lines) + "\n"
+
+    # Write the Prometheus text atomically, e.g. for node_exporter's textfile collector
+    def write_prometheus(self, path):
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as output:
+            output.write(self.prometheus_text())
+        os.replace(temp_path, path)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    def close(self):
+        if self._span_log is not None:
+            self._span_log.close()
+            self._span_log = None
+
+_recorder = None
+
+def enable(sample_size=2048, span_log=None):
+    global _recorder
+    disable()
+    _recorder = MetricsRecorder(sample_size, span_log)
+    return _recorder
+
+def disable():
+    global _recorder
+    if _recorder is not None:
+        _recorder.close()
+    _recorder = None
+
+def is_enabled():
+    return _recorder is not None
+
+def get_recorder():
+    return _recorder
+
+# Context manager timing one stage: with span('simulate', weeks=52): ...
+def span(stage, **attributes):
+    if _recorder is None:
+        return _DISABLED_SPAN
+    return _Span(_recorder, stage, attributes)
+
+# Serve GET /metrics in Prometheus text format from a daemon thread
+def serve_metrics(port, host='127.0.0.1'):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics' or _recorder is None:
+                self.send_error(404)
+                return
+            body = _recorder.prometheus_text().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    return server
+
+# Enable instrumentation from GRIMORE_METRICS=1, with optional GRIMORE_METRICS_FILE (span log)
+# and GRIMORE_METRICS_PORT (Prometheus endpoint); returns the recorder or None
+def configure_from_env(environ=os.environ):
+    if environ.get('GRIMORE_METRICS', '').strip().lower() not in ('1', 'true', 'yes', 'on'):
+        return None
+    recorder = enable(span_log=environ.get('GRIMORE_METRICS_FILE') or None)
+    if environ.get('GRIMORE_METRICS_PORT'):
+        serve_metrics(int(environ['GRIMORE_METRICS_PORT']), environ.get('GRIMORE_METRICS_HOST', '127.0.0.1'))
+    return recorder
+
+# Rebuild per-stage statistics from a span log written by MetricsRecorder
+def summarize_span_log(path, quantiles=(0.5, 0.99)):
+    recorder = MetricsRecorder(sample_size=None)
+    with open(path, encoding='utf-8') as span_log:
+        for line in span_log:
+            if line.strip():
+                entry = json.loads(line)
+                recorder.record(entry['stage'], entry['seconds'])
+    return recorder.summary(quantiles)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("Usage: python instrumentation.py spans.jsonl")
+        return 2
+    print(f"{'stage':<16}{'count':>8}{'p50 ms':>12}{'p99 ms':>12}{'total s':>12}")
+    for stage, values in sorted(summarize_span_log(argv[0]).items()):
+        print(f"{stage:<16}{values['count']:>8}{values['p50'] * 1000:>12.2f}{values['p99'] * 1000:>12.2f}{values['sum']:>12.2f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+#monte_carlo.py (Seeded Monte Carlo uncertainty bands around the weekly forecast)
+import numpy as np
+
+from batch_engine import predict_weight_loss_batch
+from client_inputs import MODEL_ARGUMENTS, model_options
+
+BAND_FIELDS = ['weight', 'body_fat_percentage', 'lean_mass']
+
+# Run many perturbed copies of one client's forecast as a single batch and summarize them.
+# Every week each trajectory draws its own adherence (eaten / planned intake), NEAT multiplier
+# and metabolic adaptation multiplier from normal distributions with the given spreads.
+# A trajectory that reaches its goal holds its final state for the rest of the horizon.
+# Returns 1-D arrays per week: 'week', 'date' and '<field>_p<percentile>' for each band field.
+def simulate_uncertainty(client, trajectories=10000, seed=None, adherence_mean=1.0, adherence_sd=0.08, neat_sd=0.2, adaptation_sd=0.03, percentiles=(10, 50, 90)):
+    rng = np.random.default_rng(seed)
+
+    def week_factors(week):
+        return {
+            'adherence': rng.normal(adherence_mean, adherence_sd, trajectories),
+            'neat': np.maximum(rng.normal(1.0, neat_sd, trajectories), 0.0),
+            'adaptation': rng.normal(1.0, adaptation_sd, trajectories)
+        }
+
+    inputs = {name: client[name] for name in MODEL_ARGUMENTS}
+    inputs['current_weight'] = np.full(trajectories, float(client['current_weight']))
+    result = predict_weight_loss_batch(**inputs, fields=BAND_FIELDS, week_factors=week_factors, **model_options(client))
+
+    # Hold each trajectory at its last recorded week so every week has all trajectories
+    weeks = np.arange(result['weight'].shape[1])
+    last_recorded = np.minimum(weeks[None, :], result['num_weeks'][:, None])
+    rows = np.arange(trajectories)[:, None]
+
+    bands = {'week': weeks, 'date': result['start_date'][0] + weeks * np.timedelta64(7, 'D')}
+    for field in BAND_FIELDS:
+        values = np.percentile(result[field][rows, last_recorded], percentiles, axis=0)
+        for percentile, band in zip(percentiles, values):
+            bands[f"{field}_p{percentile}"] = band
+    return bands
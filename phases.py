@@ -0,0 +1,63 @@
+#phases.py (Multi-phase programs: cut, diet break, maintenance and lean bulk in one continuous simulation)
+import datetime
+
+from client_inputs import MODEL_ARGUMENTS, model_options
+from weight_loss_model import PROGRESSION_FIELDS, _iter_weight_loss_rows
+
+# Inputs a phase may change; the client's body, dates of birth and start stay fixed for the whole program
+PHASE_INPUTS = ['goal_weight', 'goal_bf', 'activity_level', 'is_athlete', 'resistance_training', 'daily_protein_intake', 'volume_score', 'intensity_score', 'frequency_score', 'job_activity', 'leisure_activity', 'experience_level', 'is_bodybuilder']
+
+# Daily calorie offset from adapted TDEE for a phase's 'calories' setting; None chases the phase goal like predict_weight_loss
+def _calorie_offset(calories):
+    if calories in (None, 'goal'):
+        return None
+    if calories == 'maintain':
+        return 0
+    if isinstance(calories, (int, float)) and not isinstance(calories, bool):
+        return calories
+    raise ValueError(f"calories must be 'goal', 'maintain' or a daily offset in calories, got {calories!r}")
+
+# Run a program of phases back to back as one simulation. `inputs` holds the predict_weight_loss
+# arguments (e.g. a normalized client) and optionally its rmr_equation; its end_date is ignored. Each phase is a dict with:
+#   'end_date'  when the phase ends (required; each after the previous one)
+#   'name'      label copied into every row of the phase (default "phase N")
+#   'calories'  'goal' (default): the deficit that reaches the phase's goal_bf by its end date, ending the
+#               phase early once its goals are met; 'maintain': adapted TDEE; a number: adapted TDEE plus
+#               that many calories a day (negative for a fixed deficit, positive for a surplus)
+#   any of PHASE_INPUTS, overriding `inputs` from this phase on
+# The week index runs on across phases, so metabolic adaptation and age carry over. Each phase builds
+# its own profile from the merged inputs, so every derived factor is recomputed at a phase boundary.
+# Returns predict_weight_loss-style entries with an added 'phase' key.
+def simulate_program(inputs, phases):
+    if not phases:
+        raise ValueError("A program needs at least one phase.")
+    current = {name: inputs[name] for name in MODEL_ARGUMENTS}
+    options = model_options(inputs)
+    start_date = current['start_date']
+    start_ordinal = start_date.toordinal()
+    previous_end = start_date
+    initial_weight = current['current_weight']
+    week = 0
+    progression = []
+    for number, phase in enumerate(phases, 1):
+        unknown = sorted(set(phase) - set(PHASE_INPUTS) - {'name', 'end_date', 'calories'})
+        if unknown:
+            raise ValueError(f"Unknown phase settings: {', '.join(unknown)}")
+        if 'end_date' not in phase:
+            raise ValueError(f"Phase {number} has no end_date.")
+        if (phase['end_date'] - previous_end).days < 7:
+            raise ValueError(f"Phase {number} must end at least a week after {previous_end}.")
+        previous_end = phase['end_date']
+        name = phase.get('name', f"phase {number}")
+        current.update({key: phase[key] for key in PHASE_INPUTS if key in phase}, end_date=phase['end_date'])
+
+        rows = _iter_weight_loss_rows(*(current[argument] for argument in MODEL_ARGUMENTS), resume_week=week, initial_weight=initial_weight, calorie_offset=_calorie_offset(phase.get('calories')), **options)
+        for row in rows:
+            date = datetime.date.fromordinal(start_ordinal + 7 * len(progression))
+            entry = {'date': f"{date.month:02d}{date.day:02d}{date.year % 100:02d}", 'phase': name}
+            entry.update(zip(PROGRESSION_FIELDS, row))
+            progression.append(entry)
+        week = len(progression) - 1
+        current['current_weight'] = progression[-1]['weight']
+        current['current_bf'] = progression[-1]['body_fat_percentage']
+    return progression
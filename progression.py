@@ -0,0 +1,76 @@
+#progression.py (Column-oriented weekly progression returned by predict_weight_loss_columns)
+import datetime
+import numpy as np
+
+from weight_loss_model import PROGRESSION_FIELDS
+
+# Weekly progression stored as one float64 array per field plus the start date.
+# Integer indexing and iteration still give the same dicts predict_weight_loss returns,
+# slicing gives a list of those dicts, and indexing with a field name gives that field's column.
+class Progression:
+    def __init__(self, start_date, columns):
+        if isinstance(start_date, datetime.datetime):
+            start_date = start_date.date()
+        self.start_date = np.datetime64(start_date, 'D')
+        self.columns = {field: np.asarray(columns[field], dtype=float) for field in PROGRESSION_FIELDS if field in columns}
+        lengths = {len(values) for values in self.columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("All progression columns must have the same length.")
+        self._length = lengths.pop() if lengths else 0
+
+    # Build from the per-week row tuples (in PROGRESSION_FIELDS order) produced by the model loop
+    @classmethod
+    def from_rows(cls, start_date, rows):
+        block = np.array(rows, dtype=float).reshape(-1, len(PROGRESSION_FIELDS)).T.copy()
+        return cls(start_date, dict(zip(PROGRESSION_FIELDS, block)))
+
+    # Build from the list-of-dicts format returned by predict_weight_loss
+    @classmethod
+    def from_records(cls, progression):
+        start_date = datetime.datetime.strptime(progression[0]['date'], "%m%d%y").date()
+        return cls.from_rows(start_date, [[entry[field] for field in PROGRESSION_FIELDS] for entry in progression])
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield self._row(index)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.columns[key]
+        if isinstance(key, slice):
+            return [self._row(index) for index in range(*key.indices(self._length))]
+        if key < 0:
+            key += self._length
+        if not 0 <= key < self._length:
+            raise IndexError("progression index out of range")
+        return self._row(key)
+
+    def _row(self, index):
+        entry = {'date': self.date_at(index).strftime("%m%d%y")}
+        for field, values in self.columns.items():
+            entry[field] = float(values[index])
+        return entry
+
+    # Week offset of every row from the start date
+    @property
+    def weeks(self):
+        return np.arange(self._length)
+
+    # Calendar date of every row as datetime64[D]
+    @property
+    def dates(self):
+        return self.start_date + self.weeks * np.timedelta64(7, 'D')
+
+    def date_at(self, index):
+        return (self.start_date + np.timedelta64(7 * index, 'D')).astype(datetime.date)
+
+    # DataFrame over the stored arrays; the numeric columns are not copied
+    def to_dataframe(self):
+        import pandas as pd
+        return pd.DataFrame({'date': self.dates, **self.columns}, copy=False)
+
+    def to_records(self):
+        return list(self)
@@ -0,0 +1,161 @@
+#report.py (Report data assembly and PDF rendering for a single client forecast)
+from datetime import datetime
+
+from weight_loss_model import calculate_age, calculate_metabolic_adaptation, get_body_fat_info, estimate_tef, estimate_neat
+
+PROGRESS_TABLE_HEADER = ["Week", "Date", "Weight (lbs)", "Body Fat %", "Daily Calories", "TDEE", "Weekly Caloric Output", "Total Weight Lost"]
+CLOSING_MESSAGE = "Remember, this journey is a marathon, not a sprint. Celebrate your progress and stay committed to your health and fitness goals!"
+
+# PDF generation function using ReportLab (imported on first use; report data assembly does not need it).
+# The report does not print client_name, so one render serves any client with the same forecast.
+def generate_pdf(progression, report_data, gender, client_name=None):
+    from report_template import STYLES, title_section, key_value_section, table_section, paragraph_section, render_story
+    from reportlab.platypus import Paragraph
+
+    story = title_section("YOUR PERSONALIZED WEIGHT LOSS JOURNEY REPORT")
+    story += key_value_section("1. PERSONAL PROFILE", report_data['personal_profile'])
+    story += key_value_section("2. METABOLIC CALCULATIONS", report_data['metabolic_calculations'])
+    story += key_value_section("3. WORKOUT ANALYSIS", report_data['workout_analysis'])
+    story += key_value_section("4. BODY COMPOSITION ADJUSTMENTS", report_data['body_composition'])
+
+    rows = []
+    for i, entry in enumerate(progression):
+        rows.append([str(i), entry['date'], f"{entry['weight']:.1f}", f"{entry['body_fat_percentage']:.1f}", f"{entry['daily_calorie_intake']:.0f}", f"{entry['tdee']:.0f}", f"{entry['weekly_caloric_output']:.1f}", f"{entry['total_weight_lost']:.1f}"])
+    story += table_section("5. WEEKLY PROGRESS SUMMARY", PROGRESS_TABLE_HEADER, rows)
+
+    story += key_value_section("6. METABOLIC ADAPTATION", report_data['metabolic_adaptation'])
+    story += key_value_section("7. FINAL RESULTS", report_data['final_results'])
+    story += key_value_section("8. BODY FAT CATEGORY PROGRESSION", report_data['body_fat_category'])
+    story += paragraph_section("9. INSIGHTS AND RECOMMENDATIONS", report_data['insights_recommendations'])
+    story += paragraph_section("10. NEXT STEPS", report_data['next_steps'])
+    story += [Paragraph(CLOSING_MESSAGE, STYLES['Justify'])]
+
+    return render_story(story)
+
+# Assemble the initial_data dict generate_report_data expects from a client's inputs and forecast
+def build_initial_data(progression, client):
+    initial_entry = progression[0]
+    final_entry = progression[-1]
+    initial_category, initial_sixpack_time, initial_description = get_body_fat_info(client['gender'], initial_entry['body_fat_percentage'])
+    final_category, final_sixpack_time, final_description = get_body_fat_info(client['gender'], final_entry['body_fat_percentage'])
+    return {
+        'dob': client['dob'],
+        'height_feet': client['height_feet'],
+        'height_inches': client['height_inches'],
+        'height_cm': client['height_cm'],
+        'goal_weight': client['goal_weight'],
+        'goal_bf': client['goal_bf'],
+        'activity_level_description': client['activity_level_description'],
+        'experience_level': client['experience_level'],
+        'initial_rmr': initial_entry['rmr'],
+        'initial_tdee': initial_entry['tdee'],
+        'tef': estimate_tef(client['daily_protein_intake']),
+        'neat': estimate_neat(client['job_activity'], client['leisure_activity']),
+        'initial_daily_calories': initial_entry['daily_calorie_intake'],
+        'workout_type': client['workout_type'],
+        'workout_days': client['workout_days'],
+        'volume_score': client['volume_score'],
+        'intensity_score': client['intensity_score'],
+        'frequency_score': client['frequency_score'],
+        'resistance_training': client['resistance_training'],
+        'is_athlete': client['is_athlete'],
+        'initial_lean_mass': initial_entry['lean_mass'],
+        'initial_fat_mass': initial_entry['fat_mass'],
+        'estimated_muscle_gain': initial_entry['muscle_gain'],
+        'week1_adaptation': calculate_metabolic_adaptation(1, initial_entry['body_fat_percentage'], client['is_bodybuilder']),
+        'final_week_adaptation': calculate_metabolic_adaptation(len(progression) - 1, final_entry['body_fat_percentage'], client['is_bodybuilder']),
+        'initial_bf_category': initial_category,
+        'initial_bf_description': initial_description,
+        'initial_sixpack_time': initial_sixpack_time,
+        'final_bf_category': final_category,
+        'final_bf_description': final_description,
+        'final_sixpack_time': final_sixpack_time,
+        'personalized_recommendation': 'Increase resistance training to maximize muscle gain.' if not client['resistance_training'] else 'Continue with your current plan.',
+    }
+
+# Function to generate the comprehensive report data
+def generate_report_data(progression, initial_data, gender):
+    initial_entry = progression[0]
+    final_entry = progression[-1]
+    total_weeks = len(progression) - 1
+    total_weight_loss = initial_entry['weight'] - final_entry['weight']
+    total_bf_loss = initial_entry['body_fat_percentage'] - final_entry['body_fat_percentage']
+    avg_weekly_loss = total_weight_loss / total_weeks
+    total_muscle_gain = sum(entry['muscle_gain'] for entry in progression)
+    adaptation_percentage = (1 - final_entry['tdee'] / initial_entry['tdee']) * 100
+    lean_mass_preserved = (final_entry['lean_mass'] / initial_entry['lean_mass']) * 100
+    avg_muscle_gain = total_muscle_gain / total_weeks
+
+    report_data = {
+        "personal_profile": {
+            "Start Date": initial_entry['date'],
+            "End Date": final_entry['date'],
+            "Age": calculate_age(initial_data['dob'], datetime.strptime(initial_entry['date'], '%m%d%y')),
+            "Gender": gender.upper(),
+            "Height": f"{initial_data['height_feet']}'{initial_data['height_inches']}\" ({initial_data['height_cm']:.1f} cm)",
+            "Initial Weight": f"{initial_entry['weight']:.1f} lbs",
+            "Goal Weight": f"{initial_data['goal_weight']:.1f} lbs",
+            "Initial Body Fat": f"{initial_entry['body_fat_percentage']:.1f}%",
+            "Goal Body Fat": f"{initial_data['goal_bf']:.1f}%",
+            "Activity Level": initial_data['activity_level_description'],
+            "Experience Level": initial_data['experience_level']
+        },
+        "metabolic_calculations": {
+            "Initial RMR": f"{initial_data['initial_rmr']:.0f} calories/day",
+            "Initial TDEE": f"{initial_data['initial_tdee']:.0f} calories/day",
+            "TEF": f"{initial_data['tef']:.0f} calories/day",
+            "NEAT": f"{initial_data['neat']:.0f} calories/day",
+            "Initial Daily Calorie Intake": f"{initial_data['initial_daily_calories']:.0f} calories/day"
+        },
+        "workout_analysis": {
+            "Workout Type": initial_data['workout_type'],
+            "Workout Frequency": f"{initial_data['workout_days']} days/week",
+            "Volume Score": f"{initial_data['volume_score']:.2f}",
+            "Intensity Score": f"{initial_data['intensity_score']:.2f}",
+            "Frequency Score": f"{initial_data['frequency_score']:.2f}",
+            "Resistance Training": "Yes" if initial_data['resistance_training'] else "No",
+            "Athlete Status": "Yes" if initial_data['is_athlete'] else "No"
+        },
+        "body_composition": {
+            "Initial Lean Mass": f"{initial_data['initial_lean_mass']:.1f} lbs",
+            "Initial Fat Mass": f"{initial_data['initial_fat_mass']:.1f} lbs",
+            "Estimated Weekly Muscle Gain": f"{initial_data['estimated_muscle_gain']:.3f} lbs"
+        },
+        "metabolic_adaptation": {
+            "Week 1 Metabolic Adaptation": f"{initial_data['week1_adaptation']:.2f}",
+            "Final Week Metabolic Adaptation": f"{initial_data['final_week_adaptation']:.2f}"
+        },
+        "final_results": {
+            "Duration": f"{total_weeks} weeks",
+            "Total Weight Loss": f"{total_weight_loss:.1f} lbs",
+            "Total Body Fat Reduction": f"{total_bf_loss:.1f}%",
+            "Final Weight": f"{final_entry['weight']:.1f} lbs",
+            "Final Body Fat": f"{final_entry['body_fat_percentage']:.1f}%",
+            "Average Weekly Weight Loss": f"{avg_weekly_loss:.2f} lbs",
+            "Total Muscle Gain": f"{total_muscle_gain:.1f} lbs",
+            "Final Daily Calorie Intake": f"{final_entry['daily_calorie_intake']:.0f} calories",
+            "Final TDEE": f"{final_entry['tdee']:.0f} calories",
+            "Final Weekly Caloric Output": f"{final_entry['weekly_caloric_output']:.1f} calories"
+        },
+        "body_fat_category": {
+            "Initial Category": initial_data['initial_bf_category'],
+            "Description": initial_data['initial_bf_description'],
+            "Estimated Time to Six-Pack": initial_data['initial_sixpack_time'],
+            "Final Category": initial_data['final_bf_category'],
+            "Description": initial_data['final_bf_description'],
+            "Estimated Time to Six-Pack": initial_data['final_sixpack_time']
+        },
+        "insights_recommendations": [
+            f"Your metabolic rate adapted by {adaptation_percentage:.1f}% over the course of your journey.",
+            f"You maintained an impressive {lean_mass_preserved:.1f}% of your initial lean mass.",
+            f"Your muscle gain rate averaged {avg_muscle_gain:.3f} lbs per week, which is {'excellent' if avg_muscle_gain > 0.5 else 'good' if avg_muscle_gain > 0.25 else 'moderate'}.",
+            f"Based on your final body fat percentage, you're now in the {initial_data['final_bf_category']} category.",
+            f"To maintain your results, consider a daily calorie intake of {final_entry['tdee']:.0f} calories."
+        ],
+        "next_steps": [
+            initial_data['personalized_recommendation'],
+            f"Consider adjusting your protein intake to {final_entry['weight'] * 0.8:.0f} g/day to support lean mass.",
+            f"Your next ideal body composition goal could be {max(final_entry['body_fat_percentage'] - 2, 5):.1f}% body fat."
+        ]
+    }
+    return report_data
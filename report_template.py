@@ -0,0 +1,74 @@
+#report_template.py (Shared ReportLab styles, table styles and section builders for PDF reports)
+from io import BytesIO
+from types import MappingProxyType
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
+# Paragraph styles are built once per process and exposed read-only;
+# ReportLab only reads them while laying out a document
+def _build_styles():
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name='Justify', alignment=1))
+    return MappingProxyType(dict(styles.byName))
+
+STYLES = _build_styles()
+
+# Grey header row, beige body and a black grid, shared by every report table
+def _table_style(header_font_size, body_font_size):
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), header_font_size),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), body_font_size),
+        ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+
+# Table.setStyle only reads the commands, so one instance can style any number of tables
+KEY_VALUE_TABLE_STYLE = _table_style(14, 12)
+PROGRESS_TABLE_STYLE = _table_style(12, 10)
+
+SECTION_GAP = 12
+
+# Report title followed by a gap
+def title_section(title):
+    return [Paragraph(title, STYLES['Heading1']), Spacer(1, SECTION_GAP)]
+
+# Numbered heading with a two-column table of the mapping's items
+def key_value_section(heading, mapping):
+    table = Table([[key, value] for key, value in mapping.items()])
+    table.setStyle(KEY_VALUE_TABLE_STYLE)
+    return [Paragraph(heading, STYLES['Heading2']), table, Spacer(1, SECTION_GAP)]
+
+# Heading with a table whose first row is the header
+def table_section(heading, header, rows, style=PROGRESS_TABLE_STYLE):
+    table = Table([header] + rows)
+    table.setStyle(style)
+    return [Paragraph(heading, STYLES['Heading2']), table, Spacer(1, SECTION_GAP)]
+
+# Heading with one centered paragraph per line of text
+def paragraph_section(heading, lines, gap=True):
+    story = [Paragraph(heading, STYLES['Heading2'])]
+    story.extend(Paragraph(line, STYLES['Justify']) for line in lines)
+    if gap:
+        story.append(Spacer(1, SECTION_GAP))
+    return story
+
+# Lay out a story on letter pages and return the PDF bytes
+def render_story(story, pagesize=letter):
+    buffer = BytesIO()
+    SimpleDocTemplate(buffer, pagesize=pagesize).build(story)
+    pdf_bytes = buffer.getvalue()
+    buffer.close()
+    return pdf_bytes
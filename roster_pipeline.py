@@ -0,0 +1,108 @@
+#roster_pipeline.py (Headless roster forecasting: stream rows in chunks, write weekly progressions to Parquet/Arrow)
+# Usage: python roster_pipeline.py roster.csv --out-dir forecasts [--chunk-size 5000] [--format parquet|arrow]
+import argparse
+import json
+import os
+import sys
+import time
+from itertools import islice
+
+import numpy as np
+
+from batch_engine import predict_weight_loss_batch
+from client_inputs import ClientInputError, iter_roster_rows, normalize_client, model_columns
+from progression import PROGRESSION_FIELDS
+
+# Group the roster into lists of at most chunk_size (row_number, raw_row) pairs without reading it all
+def iter_row_chunks(path, chunk_size):
+    rows = enumerate(iter_roster_rows(path), 1)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+# Validate a chunk; returns the normalized clients, their row numbers and the rejected rows
+def normalize_chunk(chunk):
+    clients, row_numbers, rejects = [], [], []
+    for row_number, row in chunk:
+        try:
+            clients.append(normalize_client(row))
+            row_numbers.append(row_number)
+        except ClientInputError as error:
+            rejects.append({'row': row_number, 'field': error.field, 'error': str(error)})
+    return clients, row_numbers, rejects
+
+# Forecast a chunk and flatten it to one record per client-week as column arrays
+def forecast_chunk(clients, row_numbers):
+    result = predict_weight_loss_batch(**model_columns(clients))
+    week_index = np.arange(result['weight'].shape[1])
+    valid = week_index[None, :] <= result['num_weeks'][:, None]
+    client_index, week = np.nonzero(valid)
+    client_ids = np.array([client['client_id'] or str(row) for client, row in zip(clients, row_numbers)], dtype=object)
+    columns = {
+        'client_id': client_ids[client_index],
+        'row': np.asarray(row_numbers, dtype=np.int64)[client_index],
+        'week': week.astype(np.int32),
+        'date': result['start_date'][client_index] + week * np.timedelta64(7, 'D')
+    }
+    for field in PROGRESSION_FIELDS:
+        columns[field] = result[field][valid]
+    return columns
+
+# Write one chunk's columns as part-NNNNN.parquet (or .arrow) in out_dir
+def write_chunk(columns, out_dir, part, file_format='parquet'):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("pyarrow is required for Parquet/Arrow output (pip install pyarrow).")
+    table = pa.table({name: pa.array(values) for name, values in columns.items()})
+    path = os.path.join(out_dir, f"part-{part:05d}.{file_format}")
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(table, path)
+    elif file_format == 'arrow':
+        import pyarrow.feather as feather
+        feather.write_feather(table, path)
+    else:
+        raise ValueError(f"Unsupported output format: {file_format}")
+    return path
+
+# Stream a roster through validation, batch forecasting and chunked output.
+# Peak memory depends on chunk_size and horizon length (capped by client_inputs.MAX_HORIZON_WEEKS), not on roster size.
+def run_pipeline(roster_path, out_dir, chunk_size=5000, file_format='parquet', log=sys.stderr):
+    os.makedirs(out_dir, exist_ok=True)
+    summary = {'rows': 0, 'clients': 0, 'rejected': 0, 'weekly_rows': 0, 'parts': []}
+    started = time.perf_counter()
+    with open(os.path.join(out_dir, "_rejects.jsonl"), 'w', encoding='utf-8') as rejects_file:
+        for part, chunk in enumerate(iter_row_chunks(roster_path, chunk_size)):
+            clients, row_numbers, rejects = normalize_chunk(chunk)
+            for reject in rejects:
+                rejects_file.write(json.dumps(reject) + "\n")
+            summary['rows'] += len(chunk)
+            summary['rejected'] += len(rejects)
+            if not clients:
+                continue
+            columns = forecast_chunk(clients, row_numbers)
+            summary['parts'].append(write_chunk(columns, out_dir, part, file_format))
+            summary['clients'] += len(clients)
+            summary['weekly_rows'] += len(columns['week'])
+            print(f"chunk {part}: {len(clients)} clients, {len(rejects)} rejected, {len(columns['week'])} weekly rows ({time.perf_counter() - started:.1f}s)", file=log)
+    summary['elapsed_seconds'] = time.perf_counter() - started
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forecast a client roster in bounded-memory chunks and write weekly progressions to Parquet/Arrow files.")
+    parser.add_argument('roster', help="CSV or JSONL roster file")
+    parser.add_argument('--out-dir', required=True, help="directory for part-NNNNN files and _rejects.jsonl")
+    parser.add_argument('--chunk-size', type=int, default=5000, help="roster rows per chunk")
+    parser.add_argument('--format', choices=['parquet', 'arrow'], default='parquet')
+    args = parser.parse_args(argv)
+
+    summary = run_pipeline(args.roster, args.out_dir, args.chunk_size, args.format)
+    print(f"{summary['clients']} clients forecast, {summary['rejected']} rows rejected, "
+          f"{summary['weekly_rows']} weekly rows in {len(summary['parts'])} files ({summary['elapsed_seconds']:.2f}s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
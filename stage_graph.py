@@ -0,0 +1,101 @@
+#stage_graph.py (Dependency graph of pipeline stages with per-stage memoization)
+from concurrent.futures import Future
+
+from result_cache import ResultCache, make_cache_key
+
+# A stage is a function of some raw inputs and the outputs of upstream stages. Its memo key hashes
+# its own name, its raw input values and its upstream stages' keys, so every key is known before
+# anything runs and an edit only invalidates the stages downstream of the inputs it touched.
+# Stages registered with a codec are also persisted in the optional shared store (see disk_store.py).
+class StageGraph:
+    def __init__(self, cache=None, store=None):
+        self.cache = cache if cache is not None else ResultCache()
+        self.store = store
+        self._stages = {}
+        self._codecs = {}
+
+    # Register func(**kwargs) as a stage; kwargs are the named raw inputs and upstream stage outputs.
+    # codec is an (encode, decode) pair to/from bytes; encode may return None for values not worth storing
+    def stage(self, name, inputs=(), depends=(), codec=None):
+        unknown = [dependency for dependency in depends if dependency not in self._stages]
+        if unknown:
+            raise ValueError(f"Stage {name!r} depends on unregistered stages: {', '.join(unknown)}")
+        def register(func):
+            self._stages[name] = (func, tuple(inputs), tuple(depends))
+            if codec is not None:
+                self._codecs[name] = codec
+            return func
+        return register
+
+    def _load(self, name, key):
+        if self.store is None or name not in self._codecs:
+            return None
+        data = self.store.get(key)
+        return None if data is None else (self._codecs[name][1](data),)
+
+    def _save(self, name, key, value):
+        if self.store is None or name not in self._codecs:
+            return
+        data = self._codecs[name][0](value)
+        if data is not None:
+            self.store.put(key, data)
+
+    def run(self, values):
+        return StageRun(self, values)
+
+# A memoized future whose computation raised must not be served again; the stage is recomputed instead
+def _failed(value):
+    return isinstance(value, Future) and value.done() and not value.cancelled() and value.exception() is not None
+
+# One evaluation of the graph against a set of raw input values; stages run lazily on first access
+class StageRun:
+    def __init__(self, graph, values):
+        self.graph = graph
+        self.values = values
+        self.computed = []
+        self._keys = {}
+        self._outputs = {}
+
+    def key(self, name):
+        if name not in self._keys:
+            _, inputs, depends = self.graph._stages[name]
+            self._keys[name] = make_cache_key({
+                'stage': name,
+                'inputs': {input_name: self.values[input_name] for input_name in inputs},
+                'depends': {dependency: self.key(dependency) for dependency in depends}
+            })
+        return self._keys[name]
+
+    def __getitem__(self, name):
+        if name not in self._outputs:
+            key = self.key(name)
+            # Stored as a 1-tuple so a stage may legitimately return None
+            cached = self.graph.cache.get(key)
+            if cached is not None and _failed(cached[0]):
+                self.graph.cache.discard(key)
+                cached = None
+            if cached is None:
+                cached = self.graph._load(name, key)
+                if cached is not None:
+                    self.graph.cache.put(key, cached)
+            if cached is None:
+                func, inputs, depends = self.graph._stages[name]
+                arguments = {input_name: self.values[input_name] for input_name in inputs}
+                arguments.update((dependency, self[dependency]) for dependency in depends)
+                cached = (func(**arguments),)
+                self.graph.cache.put(key, cached)
+                self.graph._save(name, key, cached[0])
+                self.computed.append(name)
+            self._outputs[name] = cached[0]
+        return self._outputs[name]
+
+    # Forget a stage's memoized output, e.g. a future that failed, so the next run computes it again
+    def discard(self, name):
+        self._outputs.pop(name, None)
+        self.graph.cache.discard(self.key(name))
+
+    # Swap a stage's memoized output, e.g. a finished future for the bytes it produced
+    def replace(self, name, value):
+        self._outputs[name] = value
+        self.graph.cache.put(self.key(name), (value,))
+        self.graph._save(name, self.key(name), value)
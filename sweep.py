@@ -0,0 +1,98 @@
+#sweep.py (What-if parameter sweeps: evaluate a Cartesian grid of inputs with the batch engine)
+import datetime
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from batch_engine import predict_weight_loss_batch, _date_column
+from client_inputs import MODEL_ARGUMENTS, BODYBUILDER_EXPERIENCE_LEVELS
+from weight_loss_model import calculate_lean_mass_preservation_scores
+
+# workout_days and workout_type are swept through the scores they feed into; sweeping rmr_equation
+# compares energy_equations entries for the same client within one batch
+SWEEPABLE = MODEL_ARGUMENTS + ['workout_days', 'workout_type', 'rmr_equation']
+DATE_ARGUMENTS = ['start_date', 'end_date', 'dob']
+OUTCOME_FIELDS = ['weight', 'body_fat_percentage', 'lean_mass', 'daily_calorie_intake']
+
+# Turn each grid entry (range, list, array or single value) into a 1-D array
+def _grid_axes(grid):
+    names, axes = [], []
+    for name, values in grid.items():
+        if name not in SWEEPABLE:
+            raise ValueError(f"Cannot sweep {name!r}; choose from {', '.join(SWEEPABLE)}.")
+        if isinstance(values, (str, datetime.date)) or np.ndim(values) == 0:
+            values = [values]
+        if name in DATE_ARGUMENTS:
+            axis = _date_column(list(values), len(values))
+        elif all(isinstance(value, str) for value in values):
+            axis = np.asarray(values, dtype=object)
+        else:
+            axis = np.asarray(values)
+        if axis.size == 0:
+            raise ValueError(f"Grid for {name!r} is empty.")
+        names.append(name)
+        axes.append(axis)
+    return names, axes
+
+# Model input columns for grid points [start, stop); base supplies every argument not being swept
+def _point_columns(base, names, axes, start, stop):
+    indices = np.unravel_index(np.arange(start, stop), [len(axis) for axis in axes])
+    columns = {name: base[name] for name in SWEEPABLE if name in base}
+    for name, axis, index in zip(names, axes, indices):
+        columns[name] = axis[index]
+
+    if {'workout_days', 'workout_type', 'experience_level'} & set(names):
+        n = stop - start
+        workout_days = np.broadcast_to(np.asarray(columns['workout_days']), (n,))
+        workout_type = np.broadcast_to(np.asarray(columns['workout_type'], dtype=object), (n,))
+        scores = {}
+        for days, kind in set(zip(workout_days.tolist(), workout_type.tolist())):
+            scores[(days, kind)] = calculate_lean_mass_preservation_scores(days, kind)
+        volume, intensity, frequency = np.array([scores[key] for key in zip(workout_days.tolist(), workout_type.tolist())]).T
+        columns['volume_score'], columns['intensity_score'], columns['frequency_score'] = volume, intensity, frequency
+        experience_level = np.broadcast_to(np.asarray(columns['experience_level'], dtype=object), (n,))
+        columns['is_bodybuilder'] = (workout_type == "Bodybuilding") & np.isin(experience_level, BODYBUILDER_EXPERIENCE_LEVELS)
+    return {name: columns[name] for name in MODEL_ARGUMENTS + ['rmr_equation'] if name in columns}
+
+# Forecast grid points [start, stop) and reduce each trajectory to the sweep outcomes
+def _evaluate_slice(base, names, axes, start, stop):
+    result = predict_weight_loss_batch(**_point_columns(base, names, axes, start, stop), fields=OUTCOME_FIELDS)
+    rows = np.arange(stop - start)
+    last = result['num_weeks']
+    # Only the simulated weeks count: week 0 is the starting estimate and rows after num_weeks are padding
+    week_index = np.arange(result['daily_calorie_intake'].shape[1])
+    simulated = (week_index[None, :] >= 1) & (week_index[None, :] <= last[:, None])
+    min_calorie_intake = np.where(simulated, result['daily_calorie_intake'], np.inf).min(axis=1, initial=np.inf)
+    min_calorie_intake[~simulated.any(axis=1)] = np.nan  # no simulated weeks (horizon under 7 days)
+    return {
+        'weeks': last,
+        'final_weight': result['weight'][rows, last],
+        'final_bf': result['body_fat_percentage'][rows, last],
+        'lean_mass_preserved': result['lean_mass'][rows, last] / result['lean_mass'][:, 0] * 100,
+        'min_calorie_intake': min_calorie_intake
+    }
+
+# Evaluate every combination of the grid values for one base client.
+# base holds all model inputs (e.g. from client_inputs.normalize_client), grid maps input names
+# to the values to try. Batches of grid points run across worker processes; the result is a
+# DataFrame with one row per combination: the swept inputs followed by the outcomes.
+def run_sweep(base, grid, workers=None, batch_size=20000):
+    import pandas as pd
+    names, axes = _grid_axes(grid)
+    total = int(np.prod([len(axis) for axis in axes]))
+    bounds = [(start, min(start + batch_size, total)) for start in range(0, total, batch_size)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(bounds) == 1:
+        parts = [_evaluate_slice(base, names, axes, start, stop) for start, stop in bounds]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(bounds))) as executor:
+            futures = [executor.submit(_evaluate_slice, base, names, axes, start, stop) for start, stop in bounds]
+            parts = [future.result() for future in futures]
+
+    indices = np.unravel_index(np.arange(total), [len(axis) for axis in axes])
+    table = {name: axis[index] for name, axis, index in zip(names, axes, indices)}
+    for outcome in parts[0]:
+        table[outcome] = np.concatenate([part[outcome] for part in parts])
+    return pd.DataFrame(table)
@@ -0,0 +1,56 @@
+#warmup.py (Process warm-up: exercise the forecast, report and PDF paths once before real traffic)
+# Usage: python warmup.py   (prints the per-step timings)
+import datetime
+import os
+import sys
+import time
+
+from client_inputs import normalize_client, model_args
+from instrumentation import span
+from report import build_initial_data, generate_pdf, generate_report_data
+from weight_loss_model import predict_weight_loss_columns
+
+# Synthetic client; a bodybuilder so the is_bodybuilder branches are exercised too
+WARMUP_CLIENT = {
+    'current_weight': 220, 'current_bf': 28, 'goal_weight': 190, 'goal_bf': 15, 'start_date': datetime.date(2024, 1, 1),
+    'end_date': datetime.date(2024, 6, 1), 'dob': datetime.date(1990, 1, 1), 'gender': 'm', 'height_feet': 5, 'height_inches': 10,
+    'activity_level': 3, 'resistance_training': True, 'daily_protein_intake': 160, 'workout_type': 'Bodybuilding',
+    'workout_days': 4, 'job_activity': 'sedentary', 'leisure_activity': 'light', 'experience_level': 'Intermediate (2-4 years)'
+}
+
+def skip_requested(environ=os.environ):
+    return environ.get('GRIMORE_SKIP_WARMUP', '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+# Run a synthetic forecast through every stage a Calculate request touches: first-call costs in the
+# model, the pandas import, and ReportLab's font and stylesheet setup plus its layout code.
+# Returns {'seconds': total, 'steps': {step: seconds}}, or None when GRIMORE_SKIP_WARMUP is set.
+def warm_up(log=sys.stderr, environ=os.environ):
+    if skip_requested(environ):
+        return None
+    steps = {}
+    started = time.perf_counter()
+    with span('warmup'):
+        step_started = time.perf_counter()
+        client = normalize_client(WARMUP_CLIENT)
+        progression = predict_weight_loss_columns(*model_args(client))
+        steps['forecast'] = time.perf_counter() - step_started
+
+        step_started = time.perf_counter()
+        report_data = generate_report_data(progression, build_initial_data(progression, client), client['gender'])
+        steps['report_data'] = time.perf_counter() - step_started
+
+        step_started = time.perf_counter()
+        progression.to_dataframe()
+        steps['dataframe'] = time.perf_counter() - step_started
+
+        step_started = time.perf_counter()
+        generate_pdf(progression, report_data, client['gender'], "Warm Up")
+        steps['pdf'] = time.perf_counter() - step_started
+    summary = {'seconds': time.perf_counter() - started, 'steps': steps}
+    if log is not None:
+        details = ", ".join(f"{step} {seconds * 1000:.0f} ms" for step, seconds in steps.items())
+        print(f"warm-up finished in {summary['seconds'] * 1000:.0f} ms ({details})", file=log)
+    return summary
+
+if __name__ == "__main__":
+    warm_up(log=sys.stdout)
@@ -0,0 +1,469 @@
+#weight_loss_model.py (Core forecast model: pure-Python, standard library only, cheap to import)
+import datetime
+import itertools
+
+from energy_equations import DEFAULT_RMR_EQUATION, get_rmr_equation, mifflin_st_jeor_legacy
+
+PROGRESSION_FIELDS = ['weight', 'body_fat_percentage', 'daily_calorie_intake', 'tdee', 'weekly_caloric_output', 'total_weight_lost', 'lean_mass', 'fat_mass', 'muscle_gain', 'rmr']
+
+# Bump whenever a change alters forecast numbers so persisted results (see disk_store.py) are not reused
+MODEL_VERSION = 1
+
+# Lookup tables shared with the vectorized engine (batch_engine.py)
+ACTIVITY_FACTORS = [1.2, 1.375, 1.55, 1.725, 1.9]
+JOB_FACTORS = {'sedentary': 100, 'light': 300, 'moderate': 500, 'active': 700}
+LEISURE_FACTORS = {'sedentary': 50, 'light': 150, 'moderate': 250, 'active': 350}
+GAIN_RATES = {
+    'Beginner (0-1 year)': 0.0125,
+    'Novice (1-2 years)': 0.0100,
+    'Intermediate (2-4 years)': 0.0075,
+    'Advanced (4-10 years)': 0.0050,
+    'Elite (10+ years)': 0.0025
+}
+PED_EXPERIENCE_LEVELS = ['Intermediate (2-4 years)', 'Advanced (4-10 years)', 'Elite (10+ years)']
+
+# Function to calculate age from date of birth
+def calculate_age(dob, current_date):
+    return current_date.year - dob.year - ((current_date.month, current_date.day) < (dob.month, dob.day))
+
+# Function to calculate lean mass preservation scores based on workout frequency and type
+def calculate_lean_mass_preservation_scores(workout_days, workout_type):
+    workout_intensities = {
+        "Bodybuilding": 0.8,
+        "Cardio": 0.4,
+        "General Fitness": 0.6
+    }
+    workout_volumes = {
+        "Bodybuilding": 20,
+        "Cardio": 10,
+        "General Fitness": 15
+    }
+    if workout_type not in workout_intensities:
+        raise ValueError("Invalid workout type.")
+    volume_score = min(workout_volumes[workout_type] * workout_days / 7 / 20, 1)
+    intensity_score = workout_intensities[workout_type]
+    frequency_score = min(workout_days / 3, 1)
+    return volume_score, intensity_score, frequency_score
+
+# Estimate the thermic effect of food based on protein intake
+def estimate_tef(protein_intake):
+    return protein_intake * 0.3
+
+# Estimate NEAT (Non-Exercise Activity Thermogenesis) based on job and leisure activity levels
+def estimate_neat(job_activity, leisure_activity):
+    return JOB_FACTORS[job_activity] + LEISURE_FACTORS[leisure_activity]
+
+# Adjust body composition based on resistance training and protein intake
+def adjust_body_composition(fat_loss, lean_loss, resistance_training, protein_intake, weight):
+    if resistance_training:
+        lean_loss *= 0.8 # Optimize protein and lean retention
+    adjusted_fat_loss = fat_loss * 0.9
+    adjusted_lean_loss = lean_loss * 0.1
+    return adjusted_fat_loss, adjusted_lean_loss
+
+# Calculate resting metabolic rate (RMR) using the Mifflin-St Jeor equation as the model has always applied it
+def calculate_rmr(weight, age, gender, height_cm, is_athlete):
+    return mifflin_st_jeor_legacy(weight, None, age, gender, height_cm, is_athlete)
+
+# Calculate total daily energy expenditure (TDEE) based on activity level
+def calculate_tdee(weight, age, gender, activity_level, height_cm, is_athlete, protein_intake, job_activity, leisure_activity):
+    rmr = calculate_rmr(weight, age, gender, height_cm, is_athlete)
+    tdee = rmr * ACTIVITY_FACTORS[activity_level - 1]
+    tdee += estimate_tef(protein_intake) # Add thermic effect of food
+    tdee += estimate_neat(job_activity, leisure_activity) # Add NEAT
+    return tdee
+
+# Calculate the amount of fat loss required to reach the goal body fat percentage
+def calculate_fat_loss_required(current_weight, current_bf, goal_bf):
+    current_fat_mass = current_weight * (current_bf / 100)
+    goal_fat_mass = current_weight * (goal_bf / 100)
+    fat_loss_required = current_fat_mass - goal_fat_mass
+    return fat_loss_required
+
+# Calculate metabolic adaptation
+def calculate_metabolic_adaptation(week, current_bf, is_bodybuilder):
+    # Base adaptation calculation
+    base_adaptation = max(0.85, 1 - (week / 300))
+
+    # Adjust adaptation based on current body fat percentage
+    bf_factor = max(0.9, 1 - (30 - current_bf) / 100)
+
+    # More aggressive adaptation for bodybuilders
+    if is_bodybuilder:
+        base_adaptation = max(0.80, 1 - (week / 200))
+
+    return base_adaptation * bf_factor
+
+# Function to adjust caloric output based on TDEE and daily calorie intake
+def calculate_weekly_caloric_output(tdee, daily_calorie_intake):
+    return (tdee - daily_calorie_intake) * 7
+
+# Distribute weight loss between fat and lean mass
+def distribute_weight_loss(weekly_weight_loss, current_bf, resistance_training, daily_protein_intake, current_weight, goal_bf, is_bodybuilder):
+    # Start with the base FFM rule: 75% fat loss, 25% lean mass loss
+    fat_loss_ratio = 0.75
+
+    # Adjust based on current body fat percentage
+    if current_bf > 30:
+        fat_loss_ratio += 0.05
+    elif current_bf < 15:
+        fat_loss_ratio -= 0.05
+
+    # Adjust for resistance training
+    if resistance_training:
+        fat_loss_ratio += 0.05
+
+    # Adjust for protein intake
+    protein_factor = min(daily_protein_intake / (current_weight * 0.8), 1)
+    fat_loss_ratio += protein_factor * 0.05
+
+    # More aggressive fat loss for bodybuilders
+    if is_bodybuilder:
+        fat_loss_ratio = min(fat_loss_ratio + 0.1, 0.95)
+    else:
+        fat_loss_ratio = min(fat_loss_ratio, 0.9)
+
+    fat_loss = weekly_weight_loss * fat_loss_ratio
+    lean_loss = weekly_weight_loss * (1 - fat_loss_ratio)
+
+    return fat_loss, lean_loss
+
+def calculate_initial_daily_calories(tdee, rmr):
+    # Set initial daily calorie intake to the lesser of 58% of RMR or 58% of adapted TDEE
+    return min(rmr * 0.58, tdee * 0.58)
+
+def estimate_muscle_gain(current_weight, training_frequency, training_volume, intensity, protein_intake, age, gender, experience_level, is_bodybuilder):
+    base_rate = GAIN_RATES.get(experience_level, 0.0075) # Default to intermediate if not specified
+
+    # Adjust rate based on age, gender, etc.
+    age_multiplier = 1.0 if age < 30 else (0.8 if age < 40 else 0.6)
+    gender_multiplier = 1.0 if gender == 'm' else 0.8
+    frequency_multiplier = min(training_frequency / 3, 1.25)
+    volume_intensity_multiplier = min((training_volume * intensity) / (10 * 0.7), 1.25)
+    protein_multiplier = min(protein_intake / (current_weight * 1.6), 1.25)
+
+    monthly_gain_percentage = base_rate * age_multiplier * gender_multiplier * frequency_multiplier * volume_intensity_multiplier * protein_multiplier
+
+    # Increase muscle gain for bodybuilders (simulating PED use)
+    if is_bodybuilder and experience_level in PED_EXPERIENCE_LEVELS:
+        monthly_gain_percentage *= 2.5
+
+    weekly_muscle_gain = (monthly_gain_percentage * current_weight) / 4
+
+    return weekly_muscle_gain
+
+def get_body_fat_info(gender, body_fat_percentage):
+    categories = [
+        {"name": "Very Lean", "men": 10, "women": 18, "time": "3-4 weeks", "description": "Visible abs, vascularity, striations"},
+        {"name": "Lean", "men": 14, "women": 22, "time": "2-3 months", "description": "Some muscle definition, less visible abs"},
+        {"name": "Average", "men": 19, "women": 27, "time": "3-4 months", "description": "Little muscle definition, soft look"},
+        {"name": "Above Average", "men": 24, "women": 32, "time": "4-6 months", "description": "No visible abs, excess fat"},
+        {"name": "High Body Fat", "men": 29, "women": 37, "time": "6-12 months", "description": "Excess fat all around, round physique"},
+        {"name": "Obese", "men": float('inf'), "women": float('inf'), "time": "12+ months", "description": "Significant excess fat all around"}
+    ]
+
+    threshold_key = "men" if gender.lower() == 'm' else "women"
+
+    for category in categories:
+        if body_fat_percentage < category[threshold_key]:
+            return category["name"], category["time"], category["description"]
+
+    return categories[-1]["name"], categories[-1]["time"], categories[-1]["description"]
+
+# Everything in a forecast that does not change from week to week, computed once per run.
+# Each method repeats the arithmetic of the function it stands in for (calculate_tdee, calculate_age,
+# estimate_muscle_gain) in the same order, so the results are bit-for-bit identical.
+# rmr_equation names an energy_equations entry, whose scalar form computes the RMR.
+class ClientProfile:
+    __slots__ = ('start_ordinal', 'dob', 'age', 'next_birthday_ordinal', 'is_athlete', 'gender', 'height_cm', 'rmr_function',
+                 'activity_factor', 'tef', 'neat', 'muscle_gain_age', 'muscle_gain_terms', 'gain_rate', 'gender_multiplier',
+                 'frequency_multiplier', 'volume_intensity_multiplier', 'protein_intake', 'ped_boost')
+
+    def __init__(self, start_date, dob, gender, activity_level, height_cm, is_athlete, daily_protein_intake, volume_score, intensity_score, frequency_score, job_activity, leisure_activity, experience_level, is_bodybuilder, rmr_equation=DEFAULT_RMR_EQUATION):
+        self.start_ordinal = start_date.toordinal()
+        self.dob = dob
+        self.age = calculate_age(dob, start_date)
+        self.next_birthday_ordinal = self._birthday_ordinal(start_date.year)
+        if self.next_birthday_ordinal <= self.start_ordinal:
+            self.next_birthday_ordinal = self._birthday_ordinal(start_date.year + 1)
+        self.is_athlete = is_athlete
+        self.gender = gender
+        self.height_cm = height_cm
+        self.rmr_function = get_rmr_equation(rmr_equation).rmr
+        self.activity_factor = ACTIVITY_FACTORS[activity_level - 1]
+        self.tef = estimate_tef(daily_protein_intake)
+        self.neat = estimate_neat(job_activity, leisure_activity)
+
+        # estimate_muscle_gain's factors that do not depend on weight or age
+        self.gain_rate = GAIN_RATES.get(experience_level, 0.0075)
+        self.gender_multiplier = 1.0 if gender == 'm' else 0.8
+        self.frequency_multiplier = min(frequency_score * 3 / 3, 1.25)
+        self.volume_intensity_multiplier = min((volume_score * 20 * intensity_score) / (10 * 0.7), 1.25)
+        self.protein_intake = daily_protein_intake
+        self.ped_boost = is_bodybuilder and experience_level in PED_EXPERIENCE_LEVELS
+        self.muscle_gain_age = None
+        self.muscle_gain_terms = None
+
+    # First day in `year` on which calculate_age counts the birthday (1 March for 29 February outside leap years)
+    def _birthday_ordinal(self, year):
+        try:
+            return datetime.date(year, self.dob.month, self.dob.day).toordinal()
+        except ValueError:
+            return datetime.date(year, 3, 1).toordinal()
+
+    # calculate_age(dob, start_date + week weeks); weeks must be visited in increasing order
+    def age_at_week(self, week):
+        ordinal = self.start_ordinal + 7 * week
+        while ordinal >= self.next_birthday_ordinal:
+            self.age += 1
+            self.next_birthday_ordinal = self._birthday_ordinal(datetime.date.fromordinal(self.next_birthday_ordinal).year + 1)
+        return self.age
+
+    # calculate_age(dob, start_date + week weeks) for any week, in any order
+    def age_at(self, week):
+        return calculate_age(self.dob, datetime.date.fromordinal(self.start_ordinal + 7 * week))
+
+    # body_fat is only read by equations based on lean mass
+    def rmr(self, weight, age, body_fat=None):
+        return self.rmr_function(weight, body_fat, age, self.gender, self.height_cm, self.is_athlete)
+
+    def tdee(self, rmr):
+        tdee = rmr * self.activity_factor
+        tdee += self.tef
+        tdee += self.neat
+        return tdee
+
+    def muscle_gain(self, current_weight, age):
+        if age != self.muscle_gain_age:
+            age_multiplier = 1.0 if age < 30 else (0.8 if age < 40 else 0.6)
+            self.muscle_gain_age = age
+            self.muscle_gain_terms = self.gain_rate * age_multiplier * self.gender_multiplier * self.frequency_multiplier * self.volume_intensity_multiplier
+        monthly_gain_percentage = self.muscle_gain_terms * min(self.protein_intake / (current_weight * 1.6), 1.25)
+        if self.ped_boost:
+            monthly_gain_percentage *= 2.5
+        return (monthly_gain_percentage * current_weight) / 4
+
+# Run the weekly simulation, yielding one tuple per week in PROGRESSION_FIELDS order as soon as it is computed.
+# With resume_week > 0, current_weight/current_bf are the state after that week (see checkpoints.py):
+# no initial entry is produced and the rows start at resume_week + 1.
+# With calorie_offset set, intake is adapted TDEE plus that many calories a day (0 for maintenance, positive
+# for a surplus) instead of the deficit that reaches goal_bf by end_date, and reaching the goal does not stop
+# the run (see phases.py). rmr_equation is as for predict_weight_loss.
+def _iter_weight_loss_rows(current_weight, current_bf, goal_weight, goal_bf, start_date, end_date, dob, gender, activity_level, height_cm, is_athlete, resistance_training, daily_protein_intake, volume_score, intensity_score, frequency_score, job_activity, leisure_activity, experience_level, is_bodybuilder, resume_week=0, initial_weight=None, calorie_offset=None, rmr_equation=DEFAULT_RMR_EQUATION):
+    weeks = (end_date - start_date).days // 7
+    profile = ClientProfile(start_date, dob, gender, activity_level, height_cm, is_athlete, daily_protein_intake, volume_score, intensity_score, frequency_score, job_activity, leisure_activity, experience_level, is_bodybuilder, rmr_equation)
+
+    chase_goal = calorie_offset is None
+    if resume_week:
+        if chase_goal and current_bf <= goal_bf and current_weight <= goal_weight:
+            return
+    else:
+        initial_weight = current_weight
+
+        # Add initial entry
+        rmr = profile.rmr(current_weight, profile.age, current_bf)
+        tdee = profile.tdee(rmr)
+        initial_daily_calorie_intake = calculate_initial_daily_calories(tdee, rmr)
+
+        yield (current_weight, current_bf, initial_daily_calorie_intake, tdee, 0, 0, current_weight * (1 - current_bf / 100), current_weight * (current_bf / 100), 0, rmr)
+
+    for week in range(resume_week + 1, weeks + 1):
+        age = profile.age_at_week(week)
+        rmr = profile.rmr(current_weight, age, current_bf)
+        tdee = profile.tdee(rmr)
+        metabolic_adaptation = calculate_metabolic_adaptation(week, current_bf, is_bodybuilder)
+        adapted_tdee = tdee * metabolic_adaptation
+
+        min_calories = max(adapted_tdee / 3, 1000)  # Ensure not below 1/3 of TDEE or 1000 calories
+        if chase_goal:
+            remaining_weeks = max(1, weeks - week)
+            current_fat_mass = current_weight * (current_bf / 100)
+            current_lean_mass = current_weight - current_fat_mass
+            goal_fat_mass = (goal_bf / 100) * current_lean_mass / (1 - (goal_bf / 100))
+            remaining_fat_to_lose = max(current_fat_mass - goal_fat_mass, 0)
+            weekly_fat_loss_required = remaining_fat_to_lose / remaining_weeks
+            weekly_deficit_required = weekly_fat_loss_required * 3500
+            daily_deficit_required = weekly_deficit_required / 7
+            daily_calorie_intake = max(adapted_tdee - daily_deficit_required, min_calories)
+        else:
+            daily_calorie_intake = max(adapted_tdee + calorie_offset, min_calories)
+
+        weekly_caloric_output = calculate_weekly_caloric_output(adapted_tdee, daily_calorie_intake)
+        weekly_weight_loss = weekly_caloric_output / 3500
+        fat_loss, lean_loss = distribute_weight_loss(weekly_weight_loss, current_bf, resistance_training, daily_protein_intake, current_weight, goal_bf, is_bodybuilder)
+
+        if resistance_training:
+            muscle_gain = profile.muscle_gain(current_weight, age)
+        else:
+            muscle_gain = 0
+
+        current_fat_mass = max(0, current_weight * (current_bf / 100) - fat_loss)
+        current_lean_mass = max(current_weight * (1 - current_bf / 100) - lean_loss + muscle_gain, current_weight * 0.05)
+        current_weight = current_fat_mass + current_lean_mass
+        current_bf = (current_fat_mass / current_weight) * 100
+        total_weight_lost = initial_weight - current_weight
+
+        yield (current_weight, current_bf, daily_calorie_intake, adapted_tdee, weekly_caloric_output, total_weight_lost, current_lean_mass, current_fat_mass, muscle_gain, rmr)
+
+        if chase_goal and current_bf <= goal_bf and current_weight <= goal_weight:
+            break
+
+# Yield the same weekly entries as predict_weight_loss one at a time, as each week is simulated.
+# Stop iterating (e.g. itertools.islice, or break once a goal is crossed) to skip the remaining weeks.
+def iter_weight_loss(current_weight, current_bf, goal_weight, goal_bf, start_date, end_date, dob, gender, activity_level, height_cm, is_athlete, resistance_training, daily_protein_intake, volume_score, intensity_score, frequency_score, job_activity, leisure_activity, experience_level, is_bodybuilder, rmr_equation=DEFAULT_RMR_EQUATION):
+    rows = _iter_weight_loss_rows(current_weight, current_bf, goal_weight, goal_bf, start_date, end_date, dob, gender, activity_level, height_cm, is_athlete, resistance_training, daily_protein_intake, volume_score, intensity_score, frequency_score, job_activity, leisure_activity, experience_level, is_bodybuilder, rmr_equation=rmr_equation)
+    start_ordinal = start_date.toordinal()
+    for week, row in enumerate(rows):
+        date = datetime.date.fromordinal(start_ordinal + 7 * week)
+        entry = {'date': f"{date.month:02d}{date.day:02d}{date.year % 100:02d}"}  # strftime("%m%d%y"), without its per-call overhead
+        entry.update(zip(PROGRESSION_FIELDS, row))
+        yield entry
+
+# Predict weight loss progression over time based on initial parameters.
+# rmr_equation picks the RMR equation from energy_equations.RMR_EQUATIONS (Mifflin-St Jeor by default).
+def predict_weight_loss(current_weight, current_bf, goal_weight, goal_bf, start_date, end_date, dob, gender, activity_level, height_cm, is_athlete, resistance_training, daily_protein_intake, volume_score, intensity_score, frequency_score, job_activity, leisure_activity, experience_level, is_bodybuilder, rmr_equation=DEFAULT_RMR_EQUATION):
+    return list(iter_weight_loss(current_weight, current_bf, goal_weight, goal_bf, start_date, end_date, dob, gender, activity_level, height_cm, is_athlete, resistance_training, daily_protein_intake, volume_score, intensity_score, frequency_score, job_activity, leisure_activity, experience_level, is_bodybuilder, rmr_equation=rmr_equation))
+
+# Same forecast as predict_weight_loss, returned as a column-oriented Progression
+def predict_weight_loss_columns(current_weight, current_bf, goal_weight, goal_bf, start_date, end_date, dob, gender, activity_level, height_cm, is_athlete, resistance_training, daily_protein_intake, volume_score, intensity_score, frequency_score, job_activity, leisure_activity, experience_level, is_bodybuilder, rmr_equation=DEFAULT_RMR_EQUATION):
+    from progression import Progression  # needs NumPy; keep it off the import path of scalar callers
+    rows = list(_iter_weight_loss_rows(current_weight, current_bf, goal_weight, goal_bf, start_date, end_date, dob, gender, activity_level, height_cm, is_athlete, resistance_training, daily_protein_intake, volume_score, intensity_score, frequency_score, job_activity, leisure_activity, experience_level, is_bodybuilder, rmr_equation=rmr_equation))
+    return Progression.from_rows(start_date, rows)
+
+# One week of the weekly loop's arithmetic at `week` from the given state, plus the regime the week runs in:
+# the age band and which side of each threshold or clamp applies. A multi-week step must not cross a regime change.
+def _adaptive_week(profile, week, weeks, current_weight, current_bf, goal_weight, goal_bf, resistance_training, daily_protein_intake, is_bodybuilder):
+    age = profile.age_at(week)
+    rmr = profile.rmr(current_weight, age, current_bf)
+    adapted_tdee = profile.tdee(rmr) * calculate_metabolic_adaptation(week, current_bf, is_bodybuilder)
+
+    remaining_weeks = max(1, weeks - week)
+    current_fat_mass = current_weight * (current_bf / 100)
+    current_lean_mass = current_weight - current_fat_mass
+    goal_fat_mass = (goal_bf / 100) * current_lean_mass / (1 - (goal_bf / 100))
+    remaining_fat_to_lose = max(current_fat_mass - goal_fat_mass, 0)
+    daily_deficit_required = remaining_fat_to_lose / remaining_weeks * 3500 / 7
+    min_calories = max(adapted_tdee / 3, 1000)
+    daily_calorie_intake = max(adapted_tdee - daily_deficit_required, min_calories)
+
+    weekly_caloric_output = calculate_weekly_caloric_output(adapted_tdee, daily_calorie_intake)
+    fat_loss, lean_loss = distribute_weight_loss(weekly_caloric_output / 3500, current_bf, resistance_training, daily_protein_intake, current_weight, goal_bf, is_bodybuilder)
+    muscle_gain = profile.muscle_gain(current_weight, age) if resistance_training else 0
+
+    regime = (
+        age < 30, age < 40,
+        1 - week / (200 if is_bodybuilder else 300) <= (0.80 if is_bodybuilder else 0.85),
+        1 - (30 - current_bf) / 100 <= 0.9,
+        current_bf > 30, current_bf < 15,
+        daily_protein_intake / (current_weight * 0.8) >= 1,
+        daily_protein_intake / (current_weight * 1.6) >= 1.25,
+        remaining_fat_to_lose == 0, remaining_weeks == 1,
+        daily_calorie_intake == min_calories, min_calories == 1000,
+        current_bf <= goal_bf and current_weight <= goal_weight
+    )
+    return (daily_calorie_intake, adapted_tdee, weekly_caloric_output, fat_loss, lean_loss, muscle_gain, rmr), regime
+
+# Advance the state by `step` weeks at the given weekly rates
+def _adaptive_advance(current_weight, current_bf, rates, step):
+    fat_loss, lean_loss, muscle_gain = rates[3], rates[4], rates[5]
+    current_fat_mass = max(0, current_weight * (current_bf / 100) - step * fat_loss)
+    current_lean_mass = max(current_weight * (1 - current_bf / 100) - step * lean_loss + step * muscle_gain, current_weight * 0.05)
+    current_weight = current_fat_mass + current_lean_mass
+    return current_weight, (current_fat_mass / current_weight) * 100, current_lean_mass, current_fat_mass
+
+# Richardson extrapolation of one full step and two half steps; falls back to the half steps near the zero clamps
+def _extrapolate(full, halves):
+    lean = 2 * halves[2] - full[2]
+    fat = 2 * halves[3] - full[3]
+    if fat < 0 or lean < 0:
+        return halves
+    weight = lean + fat
+    return weight, fat / weight * 100, lean, fat
+
+# Same forecast as predict_weight_loss, taking multi-week steps where the weekly change is small.
+# Only for maintenance and recomposition plans: plans still chasing a fat-loss goal are slower here than
+# with predict_weight_loss (see the step counts below), so use that for them.
+# A step of k weeks is checked against two k/2 steps and accepted when they agree within a share of
+# `tolerance` (lbs of weight and BF% points over the whole horizon) proportional to k. Steps never span
+# a regime change: a muscle-gain age band, an adaptation or calorie floor, a BF% band, or crossing the goal; near
+# those it falls back to single weeks, which reproduce predict_weight_loss exactly. Entries carry
+# 'week' and 'step_weeks'; muscle_gain and weekly_caloric_output stay per-week rates, so a total over
+# the forecast is sum(entry[field] * entry['step_weeks']). Once the state is within the error spent on
+# multi-week steps of the goal, the weeks since the last exact state are replayed one at a time, so the
+# forecast stops on the same week as predict_weight_loss. On random five-year plans at the default tolerance,
+# maintenance plans take about 20 steps of 260 and recomposition plans about 28. Goal-chasing plans take a
+# median of about 110 and often all 260: the chase deficit is the remaining fat over the remaining weeks,
+# which forces single-week steps towards the end, and plans that meet their weight goal finish within
+# hundredths of a BF% point of the goal, so the stopping week needs the weekly replay.
+def predict_weight_loss_adaptive(current_weight, current_bf, goal_weight, goal_bf, start_date, end_date, dob, gender, activity_level, height_cm, is_athlete, resistance_training, daily_protein_intake, volume_score, intensity_score, frequency_score, job_activity, leisure_activity, experience_level, is_bodybuilder, tolerance=0.1, max_step_weeks=52, rmr_equation=DEFAULT_RMR_EQUATION):
+    weeks = (end_date - start_date).days // 7
+    profile = ClientProfile(start_date, dob, gender, activity_level, height_cm, is_athlete, daily_protein_intake, volume_score, intensity_score, frequency_score, job_activity, leisure_activity, experience_level, is_bodybuilder, rmr_equation)
+    initial_weight = current_weight
+    start_ordinal = start_date.toordinal()
+
+    def entry(week, step_weeks, values):
+        date = datetime.date.fromordinal(start_ordinal + 7 * week)
+        return dict({'date': f"{date.month:02d}{date.day:02d}{date.year % 100:02d}", 'week': week, 'step_weeks': step_weeks}, **dict(zip(PROGRESSION_FIELDS, values)))
+
+    rmr = profile.rmr(current_weight, profile.age, current_bf)
+    tdee = profile.tdee(rmr)
+    progression = [entry(0, 0, (current_weight, current_bf, calculate_initial_daily_calories(tdee, rmr), tdee, 0, 0, current_weight * (1 - current_bf / 100), current_weight * (current_bf / 100), 0, rmr))]
+
+    context = (goal_weight, goal_bf, resistance_training, daily_protein_intake, is_bodybuilder)
+    week = 0
+    step = 1
+    # Last week whose state is exact (only single-week steps since), and the error allowance spent after it
+    anchor = (0, current_weight, current_bf)
+    drift = 0.0
+    rates, regime = _adaptive_week(profile, 1, weeks, current_weight, current_bf, *context) if weeks else (None, None)
+    while week < weeks:
+        step = min(step, weeks - week)
+        resume_step = None
+        while True:
+            state = _adaptive_advance(current_weight, current_bf, rates, step)
+            error = 0.0
+            if step == 1:
+                break
+            half = step // 2
+            middle = _adaptive_advance(current_weight, current_bf, rates, half)
+            middle_rates, middle_regime = _adaptive_week(profile, week + 1 + half, weeks, middle[0], middle[1], *context)
+            halves = _adaptive_advance(middle[0], middle[1], middle_rates, step - half)
+            error = max(abs(state[0] - halves[0]), abs(state[1] - halves[1]))
+            end_regime = _adaptive_week(profile, week + 1 + step, weeks, halves[0], halves[1], *context)[1]
+            if middle_regime == regime == end_regime:
+                if error <= tolerance * step / weeks:
+                    state = _extrapolate(state, halves)
+                    break
+            elif resume_step is None:
+                resume_step = step  # back to this step size once past the regime change
+            step = half
+
+        current_weight, current_bf, current_lean_mass, current_fat_mass = state
+        week += step
+        daily_calorie_intake, adapted_tdee, weekly_caloric_output, _, _, muscle_gain, rmr = rates
+        progression.append(entry(week, step, (current_weight, current_bf, daily_calorie_intake, adapted_tdee, weekly_caloric_output, initial_weight - current_weight, current_lean_mass, current_fat_mass, muscle_gain, rmr)))
+        if step > 1:
+            drift += tolerance * step / weeks
+
+        # Within the error allowance of the goal the approximate state cannot tell whether the weekly model
+        # has stopped yet, so replay the weeks since the last exact state one at a time
+        if drift and not (current_bf > goal_bf + drift or current_weight > goal_weight + drift) and not (current_bf <= goal_bf - drift and current_weight <= goal_weight - drift):
+            anchor_week, anchor_weight, anchor_bf = anchor
+            rows = _iter_weight_loss_rows(anchor_weight, anchor_bf, goal_weight, goal_bf, start_date, end_date, dob, gender, activity_level, height_cm, is_athlete, resistance_training, daily_protein_intake, volume_score, intensity_score, frequency_score, job_activity, leisure_activity, experience_level, is_bodybuilder, resume_week=anchor_week, initial_weight=initial_weight, rmr_equation=rmr_equation)
+            del progression[next(index for index, previous in enumerate(progression) if previous['week'] > anchor_week):]
+            for week, row in enumerate(itertools.islice(rows, week - anchor_week), anchor_week + 1):
+                progression.append(entry(week, 1, row))
+            current_weight, current_bf = progression[-1]['weight'], progression[-1]['body_fat_percentage']
+            drift = 0.0
+        if not drift:
+            anchor = (week, current_weight, current_bf)
+
+        if current_bf <= goal_bf and current_weight <= goal_weight:
+            break
+        rates, next_regime = _adaptive_week(profile, week + 1, weeks, current_weight, current_bf, *context)
+        if resume_step is not None and next_regime != regime:
+            step = resume_step
+        elif tolerance > 0 and error <= tolerance * step / weeks / 4:
+            step = min(step * 2, max_step_weeks)
+        regime = next_regime
+    return progression
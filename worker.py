@@ -0,0 +1,165 @@
+#worker.py (Long-lived forecast worker speaking line-delimited JSON over stdin/stdout or a Unix socket)
+# Usage: python worker.py [--socket PATH]     (or: python grimore_test.py --worker [--socket PATH])
+#
+# Each request is one JSON object per line:
+#   {"id": 7, "client": {...roster fields...}, "report": ["data", "text", "pdf"], "progression": "records"}
+# "op" defaults to "forecast"; "ping" and "stats" are also understood. Every request gets exactly one
+# response line, in request order, echoing "id":
+#   {"id": 7, "ok": true, "progression": [...], "report_data": {...}, "report_text": "...", "pdf_base64": "..."}
+#   {"id": 8, "ok": false, "error": {"type": "ClientInputError", "field": "goal_bf", "message": "..."}}
+# Requests can be pipelined: the worker reads the next line as soon as the previous response is written.
+import argparse
+import base64
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+
+from client_inputs import ClientInputError, normalize_client, model_args, model_options
+from weight_loss_model import predict_weight_loss
+from warmup import warm_up
+
+REPORT_KINDS = ('data', 'text', 'pdf')
+PROGRESSION_FORMATS = ('records', 'columns', 'none')
+
+# Raised for a malformed request; reported back to the caller like an input error
+class WorkerRequestError(ValueError):
+    pass
+
+# Request counters shared by every connection of this process
+class WorkerStats:
+    def __init__(self):
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, ok):
+        with self._lock:
+            self.requests += 1
+            if not ok:
+                self.errors += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {'pid': os.getpid(), 'uptime_seconds': time.time() - self.started, 'requests': self.requests, 'errors': self.errors}
+
+def progression_columns(progression):
+    return {key: [entry[key] for entry in progression] for key in progression[0]}
+
+def _forecast(request):
+    if not isinstance(request.get('client'), dict):
+        raise WorkerRequestError("'client' must be an object with the client's fields")
+    reports = request.get('report') or []
+    reports = [reports] if isinstance(reports, str) else list(reports)
+    unknown = [kind for kind in reports if kind not in REPORT_KINDS]
+    if unknown:
+        raise WorkerRequestError(f"unknown report kinds: {', '.join(map(str, unknown))} (expected {', '.join(REPORT_KINDS)})")
+    progression_format = request.get('progression', 'records')
+    if progression_format not in PROGRESSION_FORMATS:
+        raise WorkerRequestError(f"'progression' must be one of {', '.join(PROGRESSION_FORMATS)}")
+
+    client = normalize_client(request['client'])
+    progression = predict_weight_loss(*model_args(client), **model_options(client))
+    response = {}
+    if progression_format == 'records':
+        response['progression'] = progression
+    elif progression_format == 'columns':
+        response['progression'] = progression_columns(progression)
+
+    if reports:
+        from report import build_initial_data, generate_report_data
+        initial_data = build_initial_data(progression, client)
+        report_data = generate_report_data(progression, initial_data, client['gender'])
+        if 'data' in reports:
+            response['report_data'] = report_data
+        if 'text' in reports:
+            from grimore_test import generate_comprehensive_report
+            response['report_text'] = generate_comprehensive_report(progression, dict(client, protein_intake=client['daily_protein_intake']))
+        if 'pdf' in reports:
+            from report import generate_pdf
+            from client_inputs import client_label
+            pdf_bytes = generate_pdf(progression, report_data, client['gender'], client_label(client))
+            response['pdf_base64'] = base64.b64encode(pdf_bytes).decode('ascii')
+    return response
+
+# Answer one decoded request; never raises, failures become {"ok": false, "error": {...}}
+def handle_request(request, stats=None):
+    request_id = request.get('id') if isinstance(request, dict) else None
+    try:
+        if not isinstance(request, dict):
+            raise WorkerRequestError("each request must be a JSON object")
+        op = request.get('op', 'forecast')
+        if op == 'forecast':
+            response = _forecast(request)
+        elif op == 'ping':
+            response = {}
+        elif op == 'stats':
+            response = {'stats': stats.snapshot() if stats is not None else {}}
+        else:
+            raise WorkerRequestError(f"unknown op {op!r}")
+        response = dict({'id': request_id, 'ok': True}, **response)
+    except ClientInputError as error:
+        response = {'id': request_id, 'ok': False, 'error': {'type': 'ClientInputError', 'field': error.field, 'message': str(error)}}
+    except Exception as error:
+        response = {'id': request_id, 'ok': False, 'error': {'type': type(error).__name__, 'message': str(error)}}
+    if stats is not None:
+        stats.record(response['ok'])
+    return response
+
+# Answer requests from a binary line stream until EOF, one response line per request line
+def serve_stream(infile, outfile, stats=None):
+    for line in infile:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError as error:
+            response = {'id': None, 'ok': False, 'error': {'type': 'JSONDecodeError', 'message': str(error)}}
+            if stats is not None:
+                stats.record(False)
+        else:
+            response = handle_request(request, stats)
+        outfile.write(json.dumps(response, default=str, separators=(',', ':')).encode('utf-8') + b"\n")
+        outfile.flush()
+
+class _ConnectionHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        serve_stream(self.rfile, self.wfile, self.server.stats)
+
+# One thread per connection; each connection is its own ordered request/response stream
+class WorkerSocketServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, stats=None):
+        if os.path.exists(path):
+            os.remove(path)
+        super().__init__(path, _ConnectionHandler)
+        self.stats = stats if stats is not None else WorkerStats()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve forecasts as line-delimited JSON on stdin/stdout or a Unix socket.")
+    parser.add_argument('--socket', help="listen on this Unix socket path instead of stdin/stdout")
+    parser.add_argument('--no-warmup', action='store_true', help="skip the start-up warm-up (see warmup.py)")
+    args = parser.parse_args(argv)
+
+    if not args.no_warmup:
+        warm_up(log=sys.stderr)
+    stats = WorkerStats()
+    if args.socket:
+        with WorkerSocketServer(args.socket, stats) as server:
+            print(f"worker {os.getpid()} listening on {args.socket}", file=sys.stderr)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                os.remove(args.socket)
+    else:
+        serve_stream(sys.stdin.buffer, sys.stdout.buffer, stats)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())